@@ -0,0 +1,280 @@
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional
+
+from langchain_core.messages import AIMessageChunk
+
+
+# 답변 캐시 사용 여부 (기본 사용 안 함)
+ANSWER_CACHE_ENABLED = os.getenv('CHATBOT_ANSWER_CACHE', 'false').lower() in ('1', 'true', 'yes')
+
+# 같은 질문으로 볼 최소 코사인 유사도
+ANSWER_CACHE_THRESHOLD = float(os.getenv('CHATBOT_ANSWER_CACHE_THRESHOLD', 0.8))
+
+# 캐시된 답변 유지 시간 (초)과 최대 개수
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv('CHATBOT_ANSWER_CACHE_TTL_SECONDS', 24 * 3600))
+ANSWER_CACHE_SIZE = int(os.getenv('CHATBOT_ANSWER_CACHE_SIZE', 2000))
+
+# 이보다 긴 질문은 개인 상황이 섞여 있을 가능성이 커서 캐시하지 않음
+MAX_QUESTION_LENGTH = 200
+
+# 글자 n-gram 크기
+NGRAM_SIZES = (2, 3)
+
+# 앞선 대화를 가리키는 표현 (있으면 맥락 없는 질문으로 보지 않음)
+CONTEXT_MARKERS = (
+    '그거', '그것', '그건', '그게', '그럼', '그러면', '그렇다면', '아까', '방금', '위에', '이전', '앞에서',
+    '말씀하신', '말한', '더 자세히', '다른 거', '또 ', '이거', '이것', '저거',
+)
+
+# 항목이 이보다 많으면 절반 이상의 질문에 들어 있는 흔한 n-gram은 점수 계산에서 건너뜀 (idf가 작아 영향이 적음)
+COMMON_GRAM_MIN_ENTRIES = 200
+
+_PUNCT_PATTERN = re.compile(r'[^\w\s]')
+_SPACE_PATTERN = re.compile(r'\s+')
+# 질문 끝의 존댓말/요청 어미와 조사 (같은 질문의 표현 차이)
+_ENDING_PATTERN = re.compile(r'(인가요|나요|까요|해주세요|해줘|알려주세요|알려줘|은|는|요)$')
+
+
+def normalize_question(text: str) -> str:
+    """비교용 질문 정규화 (유니코드 정규화, 소문자, 문장부호와 끝 어미 제거, 공백 정리)"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    text = _SPACE_PATTERN.sub(' ', _PUNCT_PATTERN.sub(' ', text)).strip()
+    return _ENDING_PATTERN.sub('', text).strip()
+
+
+def char_ngrams(normalized: str) -> Counter:
+    """띄어쓰기 차이를 무시한 글자 n-gram 빈도"""
+    padded = f" {normalized.replace(' ', '')} "
+    grams: Counter = Counter()
+    for n in NGRAM_SIZES:
+        for i in range(len(padded) - n + 1):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+
+def is_context_free(message: str) -> bool:
+    """앞선 대화 없이도 답할 수 있는 질문인지 (지시어/이어 묻기 표현이 없는 질문)"""
+    return not any(marker in message for marker in CONTEXT_MARKERS)
+
+
+class CachedAnswer(NamedTuple):
+    question: str
+    answer: str
+    created_at: float
+
+
+class _Entry:
+    __slots__ = ('key', 'answer', 'weights', 'created_at')
+
+    def __init__(self, key: str, answer: CachedAnswer, weights: Dict[str, float]):
+        self.key = key
+        self.answer = answer
+        self.weights = weights
+        self.created_at = answer.created_at
+
+
+class AnswerCache:
+    """
+    자주 묻는 질문의 답변 캐시
+
+    정규화한 질문이 같으면 바로 찾고, 아니면 글자 n-gram TF-IDF 벡터의 코사인 유사도가
+    threshold 이상인 가장 가까운 질문의 답변을 쓴다. n-gram 역색인으로 질문과 n-gram을 공유하는
+    항목만 점수를 계산하며, 외부 임베딩 서비스는 쓰지 않는다.
+    항목은 TTL이 지나면 버리고, 개수가 max_size를 넘으면 가장 오래 쓰이지 않은 것부터 제거한다.
+    """
+
+    def __init__(self, enabled: bool = ANSWER_CACHE_ENABLED, threshold: float = ANSWER_CACHE_THRESHOLD,
+                 ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS, max_size: int = ANSWER_CACHE_SIZE):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # n-gram -> {질문 키: 항목 내 n-gram 가중치 (1 + log tf)}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        # 항목별 벡터 크기 (idf는 항목 수에 따라 바뀌므로 항목 수가 10% 이상 바뀌면 다시 계산)
+        self._norms: Dict[str, float] = {}
+        self._norm_size = 0
+        self._lock = threading.Lock()
+
+        # 통계
+        self.lookups = 0
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lookup_seconds = 0.0
+
+    def _idf(self, gram: str) -> float:
+        return math.log((1 + len(self._entries)) / (1 + len(self._postings.get(gram, ())))) + 1
+
+    def _norm(self, weights: Dict[str, float]) -> float:
+        return math.sqrt(sum((w * self._idf(g)) ** 2 for g, w in weights.items())) or 1.0
+
+    def _refresh_norms(self):
+        size = len(self._entries)
+        if abs(size - self._norm_size) > max(1, self._norm_size // 10) or len(self._norms) != size:
+            self._norms = {key: self._norm(entry.weights) for key, entry in self._entries.items()}
+            self._norm_size = size
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._norms.pop(key, None)
+        for gram in entry.weights:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self._postings[gram]
+
+    def lookup(self, question: str) -> Optional[CachedAnswer]:
+        """캐시된 답변 (없거나 유사한 질문이 없으면 None)"""
+        if not self.enabled:
+            return None
+        started = time.perf_counter()
+        key = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            try:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if now - entry.created_at <= self.ttl_seconds:
+                        self._entries.move_to_end(key)
+                        self.exact_hits += 1
+                        return entry.answer
+                    self._remove(key)
+                    self.expirations += 1
+
+                best_key = self._most_similar(key)
+                if best_key is None:
+                    return None
+                entry = self._entries[best_key]
+                if now - entry.created_at > self.ttl_seconds:
+                    self._remove(best_key)
+                    self.expirations += 1
+                    return None
+                self._entries.move_to_end(best_key)
+                self.similar_hits += 1
+                return entry.answer
+            finally:
+                self._lookup_seconds += time.perf_counter() - started
+
+    def _most_similar(self, key: str) -> Optional[str]:
+        """threshold 이상으로 가장 유사한 캐시 질문 키 (lock 안에서 호출)"""
+        if not self._entries:
+            return None
+        query = {g: 1 + math.log(tf) for g, tf in char_ngrams(key).items()}
+        idf = {g: self._idf(g) for g in query}
+        query_norm = math.sqrt(sum((w * idf[g]) ** 2 for g, w in query.items())) or 1.0
+
+        self._refresh_norms()
+        common = len(self._entries) // 2 if len(self._entries) >= COMMON_GRAM_MIN_ENTRIES else len(self._entries)
+        scores: Dict[str, float] = {}
+        for gram, weight in query.items():
+            posting = self._postings.get(gram)
+            if not posting or len(posting) > common:
+                continue
+            w = weight * idf[gram] * idf[gram]
+            for candidate, candidate_weight in posting.items():
+                scores[candidate] = scores.get(candidate, 0.0) + w * candidate_weight
+
+        best_key, best_score = None, self.threshold
+        for candidate, dot in scores.items():
+            score = dot / (query_norm * self._norms[candidate])
+            if score >= best_score:
+                best_key, best_score = candidate, score
+        return best_key
+
+    def store(self, question: str, answer: str):
+        """질문의 답변 저장"""
+        if not self.enabled or not answer:
+            return
+        key = normalize_question(question)
+        if not key:
+            return
+        with self._lock:
+            self._remove(key)
+            weights = {g: 1 + math.log(tf) for g, tf in char_ngrams(key).items()}
+            entry = _Entry(key, CachedAnswer(question, answer, time.time()), weights)
+            self._entries[key] = entry
+            for gram, weight in weights.items():
+                self._postings.setdefault(gram, {})[key] = weight
+            self._norms[key] = self._norm(weights)
+            self.stores += 1
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+            self._norms.clear()
+            self._norm_size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl_seconds,
+                "lookups": self.lookups,
+                "hits": hits,
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.lookups - hits,
+                "hit_rate": round(hits / self.lookups, 4) if self.lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "avg_lookup_ms": round(self._lookup_seconds / self.lookups * 1000, 3) if self.lookups else 0.0,
+            }
+
+
+def cacheable_turn(session_data: Dict[str, Any], message: str) -> bool:
+    """
+    답변 캐시를 쓸 수 있는 턴인지
+
+    기본 시스템 프롬프트를 쓰는 세션의 첫 질문이거나, 앞선 대화를 가리키지 않는 질문만 해당한다.
+    """
+    if session_data.get("system_prompt"):
+        return False
+    if len(message) > MAX_QUESTION_LENGTH:
+        return False
+    return not session_data["message_history"] or is_context_free(message)
+
+
+def storable_turn(session_data: Dict[str, Any], message: str) -> bool:
+    """
+    이 턴의 답변을 캐시에 저장해도 되는지
+
+    대화 중간의 질문은 앞선 대화(임신 주차, 건강 상태 등)와 요약이 함께 프롬프트에 들어가 답변이
+    그 사용자에게 맞춰지므로, 다른 사용자에게 돌려줄 수 있는 기록 없는 첫 턴의 답변만 저장한다.
+    """
+    return (cacheable_turn(session_data, message)
+            and not session_data["message_history"] and not session_data.get("summary"))
+
+
+class CachedAnswerModel:
+    """캐시된 답변을 LLM 스트림과 같은 형태(astream)로 돌려주는 객체"""
+
+    def __init__(self, answer: str, chunk_size: int = 32):
+        self.answer = answer
+        self.chunk_size = chunk_size
+
+    async def astream(self, messages: List) -> AsyncIterator[AIMessageChunk]:
+        for i in range(0, len(self.answer), self.chunk_size):
+            yield AIMessageChunk(content=self.answer[i:i + self.chunk_size])
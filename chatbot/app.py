@@ -1,32 +1,52 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Dict, Any, Tuple
+import asyncio
+import anyio
 import os
 import json
 import uuid
+import weakref
 from datetime import datetime
 from dotenv import load_dotenv
 
 # LangChain imports
-from langchain_openai import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
-from langchain.chains import ConversationChain
-from langchain.prompts import PromptTemplate
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
 # Image processing
-from PIL import Image
-import io
 import base64
 
 load_dotenv()
 
+# .env 값을 읽은 뒤 설정 상수를 불러오도록 load_dotenv 다음에 import
+from session_store import SESSION_TTL_SECONDS, SessionStore
+from session_backend import SESSION_BACKEND, create_backend
+from llm_pool import CHAT_MODEL, VISION_MODEL, llm_pool
+from conversation_memory import ConversationMemory
+from answer_cache import AnswerCache, CachedAnswerModel, cacheable_turn, storable_turn
+from image_pipeline import image_pipeline
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 만료/초과 세션은 요청 경로 밖의 백그라운드 스레드에서 정리
+    session_manager.sessions.start()
+    yield
+    session_manager.sessions.stop()
+    await session_manager.memory.aclose()
+    await llm_pool.aclose()
+    image_pipeline.shutdown()
+
+
 app = FastAPI(
     title="CloudBread ChatBot API",
     version="1.0.0",
-    root_path="/api/chatbot"
+    root_path="/api/chatbot",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -59,76 +79,212 @@ class MultiModalRequest(BaseModel):
     session_id: Optional[str] = None
     image_base64: Optional[str] = None
 
+# 기본 시스템 프롬프트
+DEFAULT_SYSTEM_PROMPT = """
+당신은 CloudBread의 친근하고 도움이 되는 AI 어시스턴트입니다.
+사용자의 질문에 정확하고 유용한 답변을 제공하며, 
+이미지가 포함된 경우 이미지의 내용을 분석하여 관련된 정보를 제공합니다.
+항상 한국어로 대답하며, 예의 바르고 친근한 톤을 유지합니다.
+당신의 역할은 임산부 맞춤 음식, 영양, 건강 관리 전문가입니다. 
+사용자는 임산부이며 임산부의 건강과 영양에 최적화된 맞춤형 답변을 제공해야 합니다.
+"""
+
+# 모든 세션이 공유하는 프롬프트 템플릿 (세션에는 대화 기록만 저장)
+CHAT_PROMPT = ChatPromptTemplate.from_messages([
+    MessagesPlaceholder(variable_name="system"),
+    MessagesPlaceholder(variable_name="chat_history"),
+    ("human", "{input}")
+])
+
 # 세션 기반 메모리 관리
 class SessionManager:
     def __init__(self):
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+        # 유휴 TTL, 최대 세션 수(LRU), 세션별 크기 예산이 있는 저장소
+        # (CHATBOT_SESSION_BACKEND를 지정하면 레플리카 간 공유 저장소 앞의 캐시로 동작)
+        self.sessions = SessionStore(
+            backend=create_backend(SESSION_BACKEND, SESSION_TTL_SECONDS),
+            message_factory=ChatMessage
+        )
+        # 프롬프트에 넣을 대화 맥락 (최근 턴 + 백그라운드 누적 요약)
+        self.memory = ConversationMemory()
+        # 세션별 대화 순서 보장용 lock (대기/사용 중인 요청이 없으면 자동으로 사라짐)
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
     
-    def get_or_create_session(self, session_id: Optional[str] = None) -> str:
+    async def get_or_create_session(self, session_id: Optional[str] = None) -> str:
         if session_id is None:
             session_id = str(uuid.uuid4())
         
-        if session_id not in self.sessions:
-            # OpenAI LLM 초기화
-            llm = ChatOpenAI(
-                model="gpt-5-nano",
-                temperature=0.7,
-                openai_api_key=os.getenv("OPENAI_API_KEY")
-            )
-            
-            # 대화 히스토리 관리를 위한 메모리
-            memory = ConversationBufferMemory(
-                return_messages=True,
-                memory_key="chat_history"
-            )
-            
-            # 프롬프트 템플릿 설정
-            prompt = ChatPromptTemplate.from_messages([
-                SystemMessage(content="""
-당신은 CloudBread의 친근하고 도움이 되는 AI 어시스턴트입니다.
-사용자의 질문에 정확하고 유용한 답변을 제공하며, 
-이미지가 포함된 경우 이미지의 내용을 분석하여 관련된 정보를 제공합니다.
-항상 한국어로 대답하며, 예의 바르고 친근한 톤을 유지합니다.
-당신의 역할은 임산부 맞춤 음식, 영양, 건강 관리 전문가입니다. 
-사용자는 임산부이며 임산부의 건강과 영양에 최적화된 맞춤형 답변을 제공해야 합니다.
-"""),
-                MessagesPlaceholder(variable_name="chat_history"),
-                ("human", "{input}")
-            ])
-            
-            # 대화 체인 생성
-            conversation = ConversationChain(
-                llm=llm,
-                memory=memory,
-                prompt=prompt,
-                verbose=True
-            )
-            
-            self.sessions[session_id] = {
-                "conversation": conversation,
-                "memory": memory,
-                "llm": llm,
+        if await self.sessions.aget(session_id) is None:
+            # LLM 클라이언트는 llm_pool에서 공유하므로 세션에는 대화 기록만 둠
+            self.sessions.put(session_id, {
                 "created_at": datetime.now(),
-                "message_history": []
-            }
+                "message_history": [],
+                "system_prompt": None,
+                "summary": "",
+                "summarized_count": 0
+            })
         
         return session_id
     
-    def get_session(self, session_id: str):
-        return self.sessions.get(session_id)
+    async def get_session(self, session_id: str):
+        # 공유 저장소 조회가 필요하면 워커 스레드에서 (이벤트 루프를 막지 않음)
+        return await self.sessions.aget(session_id)
+    
+    def lock(self, session_id: str) -> asyncio.Lock:
+        """
+        세션의 대화 lock
+        
+        같은 세션에 동시에 들어온 요청이 이전 턴의 응답까지 포함된 기록으로 순서대로 처리되도록
+        기록 읽기부터 응답 저장까지 이 lock을 잡는다. 이벤트 루프 스레드에서만 호출한다.
+        """
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+    
+    def build_messages(self, session_data: Dict[str, Any], user_input: str) -> List:
+        """대화 맥락(요약 + 최근 턴)과 새 입력으로 LLM에 보낼 메시지 목록 구성"""
+        chat_history = self.memory.context_messages(session_data)
+        system_prompt = session_data.get("system_prompt") or DEFAULT_SYSTEM_PROMPT
+        return CHAT_PROMPT.format_messages(
+            system=[SystemMessage(content=system_prompt)],
+            chat_history=chat_history,
+            input=user_input
+        )
+    
+    def add_message_to_history(self, session_id: str, session_data: Dict[str, Any], role: str, content: str):
+        message = ChatMessage(
+            role=role,
+            content=content,
+            timestamp=datetime.now().isoformat()
+        )
+        self.sessions.record_message(session_id, session_data, message)
     
-    def add_message_to_history(self, session_id: str, role: str, content: str):
-        if session_id in self.sessions:
-            message = ChatMessage(
-                role=role,
-                content=content,
-                timestamp=datetime.now().isoformat()
-            )
-            self.sessions[session_id]["message_history"].append(message)
+    def finish_turn(self, session_id: str, session_data: Dict[str, Any]):
+        """턴 저장 후 호출: 오래된 턴의 요약을 백그라운드로 갱신"""
+        self.memory.after_turn(
+            session_id, session_data, self.lock(session_id),
+            on_update=lambda: self.sessions.mark_dirty(session_id)
+        )
 
 # 세션 매니저 인스턴스
 session_manager = SessionManager()
 
+# 자주 묻는 질문 답변 캐시 (CHATBOT_ANSWER_CACHE=true일 때만 사용)
+answer_cache = AnswerCache()
+
+async def prepare_multimodal_turn(session_data: Dict[str, Any], message: str,
+                                  image_content: Optional[bytes]) -> Tuple[str, Any, List]:
+    """
+    멀티모달 요청의 (히스토리에 남길 사용자 메시지, 사용할 LLM, 보낼 메시지 목록) 구성
+    """
+    # 이미지 처리
+    image_description = ""
+    image_base64 = None
+    image_mime_type = "image/jpeg"
+    if image_content is not None:
+        # 이미지 축소/재압축 (스레드 풀에서 처리해 이벤트 루프를 막지 않음)
+        try:
+            prepared = await image_pipeline.prepare(image_content)
+            
+            # 이미지를 base64로 인코딩
+            image_base64 = base64.b64encode(prepared.data).decode('utf-8')
+            image_mime_type = prepared.mime_type
+            
+            # 이미지 정보 추출 (원본 기준)
+            image_description = f"\\n[업로드된 이미지 정보: 크기 {prepared.original_size}, 포맷 {prepared.original_format}]\\n"
+            
+        except Exception as img_error:
+            image_description = f"이미지 처리 중 오류가 발생했습니다: {str(img_error)}"
+    
+    # 메시지에 이미지 정보 포함
+    full_message = message
+    if image_description:
+        full_message += image_description
+    
+    # 이미지가 있는 경우 Vision 모델 사용
+    if image_base64:
+        # 이미지와 함께 분석 요청
+        vision_message = HumanMessage(
+            content=[
+                {"type": "text", "text": message},
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:{image_mime_type};base64,{image_base64}"
+                    }
+                }
+            ]
+        )
+        # 이미지 분석 가능한 모델 (공유 LLM 클라이언트)
+        return full_message, llm_pool.get(VISION_MODEL), [vision_message]
+    
+    # 텍스트만 있는 경우 이전 대화 기록과 함께 대화 모델 사용
+    return full_message, llm_pool.get(CHAT_MODEL), session_manager.build_messages(session_data, full_message)
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Server-Sent Events 메시지 한 개"""
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+async def stream_turn(session_id: str,
+                      prepare: Callable[[Dict[str, Any]], Awaitable[Tuple[str, Any, List]]],
+                      on_complete: Optional[Callable[[str], None]] = None) -> AsyncIterator[str]:
+    """
+    모델의 비동기 스트림을 토큰 단위 SSE로 전달
+    
+    세션 lock을 잡은 뒤 세션을 읽어 prepare(세션)에 넘기므로, prepare가 만드는
+    (히스토리에 남길 사용자 메시지, LLM, 보낼 메시지 목록)은 앞선 턴이 끝난 기록을 본다. 사용자 메시지와 AI 응답은 스트림이 끝까지 완료된 경우에만
+    히스토리에 함께 반영하고(이어서 on_complete(응답) 호출), 클라이언트가 중간에 끊으면
+    모델 스트림(OpenAI 요청)도 닫고 대화 기록은 남기지 않는다.
+    """
+    yield sse_event({"session_id": session_id}, "session")
+    
+    async with session_manager.lock(session_id):
+        chunks: List[str] = []
+        stream = None
+        try:
+            session_data = await session_manager.get_session(session_id)
+            if not session_data:
+                raise RuntimeError("세션을 찾을 수 없습니다.")
+            user_message, llm, messages = await prepare(session_data)
+            stream = llm.astream(messages)
+            async for chunk in stream:
+                token = chunk.content
+                if isinstance(token, str) and token:
+                    chunks.append(token)
+                    yield sse_event({"token": token})
+        except asyncio.CancelledError:
+            print(f"🔌 스트리밍 중 클라이언트 연결 종료 (세션 {session_id}, {len(chunks)}개 토큰 전송)")
+            raise
+        except Exception as e:
+            yield sse_event({"detail": f"채팅 처리 중 오류가 발생했습니다: {str(e)}"}, "error")
+            return
+        finally:
+            # 취소된 상태에서도 모델 HTTP 스트림을 정리하도록 보호
+            if stream is not None:
+                with anyio.CancelScope(shield=True):
+                    await stream.aclose()
+        
+        response = "".join(chunks)
+        session_manager.add_message_to_history(session_id, session_data, "user", user_message)
+        session_manager.add_message_to_history(session_id, session_data, "assistant", response)
+        session_manager.finish_turn(session_id, session_data)
+        if on_complete is not None:
+            on_complete(response)
+    yield sse_event({"session_id": session_id, "response": response}, "done")
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # 프록시(ingress)가 버퍼링하지 않도록
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/")
 async def root():
     return {"message": "CloudBread ChatBot API is running!"}
@@ -144,34 +300,47 @@ async def chat(request: ChatRequest):
     """
     try:
         # 세션 생성 또는 가져오기
-        session_id = session_manager.get_or_create_session(request.session_id)
-        session_data = session_manager.get_session(session_id)
-        
-        if not session_data:
-            raise HTTPException(status_code=500, detail="세션을 생성할 수 없습니다.")
+        session_id = await session_manager.get_or_create_session(request.session_id)
         
-        # 사용자 메시지를 히스토리에 추가
-        session_manager.add_message_to_history(session_id, "user", request.message)
-        
-        # LangChain 대화 체인을 통해 응답 생성
-        conversation = session_data["conversation"]
-        
-        # 시스템 프롬프트가 제공된 경우 업데이트
-        if request.system_prompt:
-            # 새로운 시스템 메시지로 프롬프트 업데이트
-            system_message = SystemMessage(content=request.system_prompt)
-            conversation.prompt.messages[0] = system_message
-        
-        # AI 응답 생성
-        response = conversation.predict(input=request.message)
-        
-        # AI 응답을 히스토리에 추가
-        session_manager.add_message_to_history(session_id, "assistant", response)
+        # 같은 세션의 요청은 순서대로 처리 (다른 세션은 기다리지 않음)
+        async with session_manager.lock(session_id):
+            # lock을 잡은 뒤 세션을 읽어야 앞선 턴(다른 레플리카에서 저장된 턴 포함)이 반영된 기록으로 진행
+            session_data = await session_manager.get_session(session_id)
+            if not session_data:
+                raise HTTPException(status_code=500, detail="세션을 생성할 수 없습니다.")
+            
+            # 시스템 프롬프트가 제공된 경우 이후 대화에도 사용하도록 세션에 저장
+            if request.system_prompt:
+                session_data["system_prompt"] = request.system_prompt
+            
+            # 자주 묻는 질문은 캐시된 답변 사용 (첫 질문이거나 앞선 대화와 무관한 질문만)
+            cached = answer_cache.lookup(request.message) if cacheable_turn(session_data, request.message) else None
+            # 저장은 대화 기록 없이 만든 답변만 (대화 중간 답변은 그 사용자에게 맞춰져 있음)
+            storable = storable_turn(session_data, request.message)
+            
+            # 이전 대화 기록과 함께 프롬프트 구성
+            messages = None if cached is not None else session_manager.build_messages(session_data, request.message)
+            
+            # 사용자 메시지를 히스토리에 추가
+            session_manager.add_message_to_history(session_id, session_data, "user", request.message)
+            
+            if cached is not None:
+                response = cached.answer
+            else:
+                # AI 응답 생성 (공유 LLM 클라이언트, 이벤트 루프를 막지 않는 비동기 호출)
+                response = (await llm_pool.get(CHAT_MODEL).ainvoke(messages)).content
+                if storable:
+                    answer_cache.store(request.message, response)
+            
+            # AI 응답을 히스토리에 추가
+            session_manager.add_message_to_history(session_id, session_data, "assistant", response)
+            session_manager.finish_turn(session_id, session_data)
+            message_history = list(session_data["message_history"])
         
         return ChatResponse(
             response=response,
             session_id=session_id,
-            message_history=session_data["message_history"]
+            message_history=message_history
         )
         
     except Exception as e:
@@ -188,92 +357,108 @@ async def multimodal_chat(
     """
     try:
         # 세션 생성 또는 가져오기
-        session_id = session_manager.get_or_create_session(session_id)
-        session_data = session_manager.get_session(session_id)
+        session_id = await session_manager.get_or_create_session(session_id)
         
-        if not session_data:
-            raise HTTPException(status_code=500, detail="세션을 생성할 수 없습니다.")
+        # 이미지 파일 읽기
+        image_content = await image.read() if image else None
         
-        # 이미지 처리
-        image_description = ""
-        image_base64 = None
-        if image:
-            # 이미지 파일 읽기
-            image_content = await image.read()
+        # 같은 세션의 요청은 순서대로 처리 (다른 세션은 기다리지 않음)
+        async with session_manager.lock(session_id):
+            session_data = await session_manager.get_session(session_id)
+            if not session_data:
+                raise HTTPException(status_code=500, detail="세션을 생성할 수 없습니다.")
             
-            # PIL로 이미지 처리
-            try:
-                pil_image = Image.open(io.BytesIO(image_content))
-                
-                # 이미지를 base64로 인코딩
-                import base64
-                image_base64 = base64.b64encode(image_content).decode('utf-8')
-                
-                # 이미지 정보 추출
-                image_description = f"\\n[업로드된 이미지 정보: 크기 {pil_image.size}, 포맷 {pil_image.format}]\\n"
-                
-            except Exception as img_error:
-                image_description = f"이미지 처리 중 오류가 발생했습니다: {str(img_error)}"
-        
-        # 메시지에 이미지 정보 포함
-        full_message = message
-        if image_description:
-            full_message += image_description
-        
-        # 사용자 메시지를 히스토리에 추가
-        session_manager.add_message_to_history(session_id, "user", full_message)
-        
-        # 이미지가 있는 경우 Vision 모델 사용
-        if image_base64:
-            from langchain_openai import ChatOpenAI
+            # 이미지 처리 및 프롬프트 구성
+            full_message, llm, messages = await prepare_multimodal_turn(session_data, message, image_content)
             
-            # GPT-4 Vision 모델 사용
-            vision_llm = ChatOpenAI(
-                model="gpt-4o",  # 이미지 분석 가능한 모델
-                temperature=0.7,
-                openai_api_key=os.getenv("OPENAI_API_KEY")
-            )
+            # 사용자 메시지를 히스토리에 추가
+            session_manager.add_message_to_history(session_id, session_data, "user", full_message)
             
-            # 이미지와 함께 분석 요청
-            from langchain.schema import HumanMessage
+            # AI 응답 생성 (이미지가 있으면 Vision 모델, 비동기 호출)
+            response = (await llm.ainvoke(messages)).content
             
-            vision_message = HumanMessage(
-                content=[
-                    {"type": "text", "text": message},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{image_base64}"
-                        }
-                    }
-                ]
-            )
-            
-            response = vision_llm.invoke([vision_message]).content
-        else:
-            # 텍스트만 있는 경우 기존 대화 체인 사용
-            conversation = session_data["conversation"]
-            response = conversation.predict(input=full_message)
-        
-        # AI 응답을 히스토리에 추가
-        session_manager.add_message_to_history(session_id, "assistant", response)
+            # AI 응답을 히스토리에 추가
+            session_manager.add_message_to_history(session_id, session_data, "assistant", response)
+            session_manager.finish_turn(session_id, session_data)
+            message_history = list(session_data["message_history"])
         
         return {
             "response": response,
             "session_id": session_id,
-            "message_history": session_data["message_history"],
+            "message_history": message_history,
             "image_processed": image is not None
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"멀티모달 채팅 처리 중 오류가 발생했습니다: {str(e)}")
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    텍스트 기반 채팅 스트리밍 엔드포인트 (Server-Sent Events)
+    
+    session 이벤트(세션 ID), 토큰별 data 이벤트, 마지막에 done 이벤트(전체 응답) 순서로 전송한다.
+    """
+    try:
+        # 세션 생성 또는 가져오기
+        session_id = await session_manager.get_or_create_session(request.session_id)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"채팅 처리 중 오류가 발생했습니다: {str(e)}")
+    
+    storable = False
+    
+    async def prepare(session_data: Dict[str, Any]):
+        nonlocal storable
+        # 시스템 프롬프트가 제공된 경우 이후 대화에도 사용하도록 세션에 저장
+        if request.system_prompt:
+            session_data["system_prompt"] = request.system_prompt
+        
+        # 자주 묻는 질문은 캐시된 답변을 스트림으로 전송
+        cached = answer_cache.lookup(request.message) if cacheable_turn(session_data, request.message) else None
+        if cached is not None:
+            return request.message, CachedAnswerModel(cached.answer), []
+        # 대화 기록 없이 만든 답변만 저장
+        storable = storable_turn(session_data, request.message)
+        return (request.message, llm_pool.get(CHAT_MODEL),
+                session_manager.build_messages(session_data, request.message))
+    
+    def on_complete(response: str):
+        if storable:
+            answer_cache.store(request.message, response)
+    
+    return sse_response(stream_turn(session_id, prepare, on_complete))
+
+@app.post("/chat/multimodal/stream")
+async def multimodal_chat_stream(
+    message: str = Form(...),
+    session_id: Optional[str] = Form(None),
+    image: Optional[UploadFile] = File(None)
+):
+    """
+    멀티모달 채팅 스트리밍 엔드포인트 (텍스트 + 이미지, Server-Sent Events)
+    """
+    try:
+        # 세션 생성 또는 가져오기
+        session_id = await session_manager.get_or_create_session(session_id)
+        
+        # 응답 스트리밍 전에 업로드 파일을 읽어 둠
+        image_content = await image.read() if image else None
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"멀티모달 채팅 처리 중 오류가 발생했습니다: {str(e)}")
+    
+    async def prepare(session_data: Dict[str, Any]):
+        return await prepare_multimodal_turn(session_data, message, image_content)
+    
+    return sse_response(stream_turn(session_id, prepare))
+
 @app.get("/chat/history/{session_id}")
 async def get_chat_history(session_id: str):
     """
     특정 세션의 채팅 히스토리 조회
     """
-    session_data = session_manager.get_session(session_id)
+    session_data = await session_manager.get_session(session_id)
     if not session_data:
         raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다.")
     
@@ -288,8 +473,7 @@ async def clear_session(session_id: str):
     """
     특정 세션 삭제
     """
-    if session_id in session_manager.sessions:
-        del session_manager.sessions[session_id]
+    if await session_manager.sessions.adelete(session_id):
         return {"message": f"세션 {session_id}가 삭제되었습니다."}
     else:
         raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다.")
@@ -299,15 +483,42 @@ async def list_sessions():
     """
     활성 세션 목록 조회
     """
-    sessions_info = []
-    for session_id, session_data in session_manager.sessions.items():
-        sessions_info.append({
-            "session_id": session_id,
-            "created_at": session_data["created_at"].isoformat(),
-            "message_count": len(session_data["message_history"])
-        })
-    
-    return {"active_sessions": sessions_info}
+    return {"active_sessions": await session_manager.sessions.alist_sessions()}
+
+@app.get("/chat/sessions/stats")
+async def session_stats():
+    """
+    세션 저장소 통계 (세션 수, 대략적인 메모리 사용량, 만료/제거 횟수)
+    """
+    return session_manager.sessions.stats()
+
+@app.get("/llm/stats")
+async def llm_stats():
+    """
+    공유 LLM 클라이언트와 HTTP 연결 풀 설정
+    """
+    return llm_pool.stats()
+
+@app.get("/chat/cache/stats")
+async def answer_cache_stats():
+    """
+    답변 캐시 적중률과 크기
+    """
+    return answer_cache.stats()
+
+@app.get("/chat/image/stats")
+async def image_stats():
+    """
+    이미지 전처리 통계 (줄어든 바이트 수, 처리 시간)
+    """
+    return image_pipeline.stats()
+
+@app.get("/chat/memory/stats")
+async def memory_stats():
+    """
+    대화 메모리 설정과 요약 통계
+    """
+    return session_manager.memory.stats()
 
 if __name__ == "__main__":
     import uvicorn
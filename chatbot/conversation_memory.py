@@ -0,0 +1,178 @@
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from llm_pool import CHAT_MODEL, llm_pool
+
+
+# 대화 메모리 방식: summary (최근 턴 + 누적 요약, 토큰 예산) 또는 buffer (전체 기록 재전송)
+MEMORY_MODE = os.getenv('CHATBOT_MEMORY_MODE', 'summary')
+
+# 프롬프트에 넣을 대화 맥락(요약 + 최근 턴)의 토큰 예산
+MEMORY_TOKEN_BUDGET = int(os.getenv('CHATBOT_MEMORY_TOKEN_BUDGET', 2000))
+
+# 요약하지 않고 그대로 보낼 최근 턴 수 (턴 = 사용자 메시지 + 응답)
+MEMORY_RECENT_TURNS = int(os.getenv('CHATBOT_MEMORY_RECENT_TURNS', 4))
+
+# 요약 생성 모델과 요약 길이 상한 (토큰)
+SUMMARY_MODEL = os.getenv('CHATBOT_SUMMARY_MODEL', CHAT_MODEL)
+SUMMARY_MAX_TOKENS = int(os.getenv('CHATBOT_SUMMARY_MAX_TOKENS', 400))
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """
+다음은 임산부 사용자와 CloudBread 어시스턴트의 대화입니다.
+기존 요약에 새 대화 내용을 합쳐 {max_tokens} 토큰 이내의 한국어 요약으로 갱신하세요.
+임신 주차, 건강 상태, 알레르기, 식습관과 선호, 이미 안내한 내용처럼 이후 답변에 필요한 사실은 빠뜨리지 말고,
+인사말이나 반복되는 표현은 생략하세요. 요약문만 출력하세요.
+"""),
+    ("human", "기존 요약:\n{summary}\n\n새 대화:\n{conversation}")
+])
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    대략적인 토큰 수
+
+    토크나이저 파일 없이 계산하기 위해 한글 등 비ASCII 문자는 글자당 1토큰,
+    ASCII는 4글자당 1토큰으로 추정한다.
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii + 3) // 4 + 4
+
+
+def to_langchain_message(message: Any):
+    """히스토리의 ChatMessage를 LangChain 메시지로 변환"""
+    if message.role == "user":
+        return HumanMessage(content=message.content)
+    return AIMessage(content=message.content)
+
+
+class ConversationMemory:
+    """
+    토큰 예산이 있는 대화 메모리
+
+    최근 MEMORY_RECENT_TURNS 턴은 원문 그대로, 그보다 오래된 턴은 누적 요약 하나로 프롬프트에 넣는다.
+    요약은 턴이 끝난 뒤 백그라운드 작업으로 갱신하므로 사용자 요청은 요약 생성을 기다리지 않고,
+    요약이 늦어져도 예산을 넘는 오래된 원문은 프롬프트에서 빠지므로 턴마다 보내는 양이 일정하다.
+
+    세션에는 summary(요약문)와 summarized_count(message_history 중 요약에 반영된 앞쪽 메시지 수)만 저장한다.
+    """
+
+    def __init__(self, mode: str = MEMORY_MODE, token_budget: int = MEMORY_TOKEN_BUDGET,
+                 recent_turns: int = MEMORY_RECENT_TURNS):
+        self.mode = mode
+        self.token_budget = token_budget
+        self.recent_messages = max(1, recent_turns) * 2
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        # 통계
+        self.summaries = 0
+        self.summary_failures = 0
+        self.dropped_from_prompt = 0
+
+    @property
+    def summarizing(self) -> bool:
+        return self.mode == 'summary'
+
+    def context_messages(self, session_data: Dict[str, Any]) -> List:
+        """프롬프트에 넣을 대화 맥락 (요약 시스템 메시지 + 요약되지 않은 최근 메시지)"""
+        history = session_data["message_history"]
+        if not self.summarizing:
+            return [to_langchain_message(m) for m in history]
+
+        summary = session_data.get("summary") or ""
+        recent = history[session_data.get("summarized_count", 0):]
+
+        # 최근 메시지부터 예산 안에 들어가는 만큼만 포함
+        budget = self.token_budget - (estimate_tokens(summary) if summary else 0)
+        kept = 0
+        for m in reversed(recent):
+            budget -= estimate_tokens(m.content)
+            if budget < 0:
+                break
+            kept += 1
+        self.dropped_from_prompt += len(recent) - kept
+
+        messages = [SystemMessage(content=f"이전 대화 요약:\n{summary}")] if summary else []
+        messages.extend(to_langchain_message(m) for m in recent[len(recent) - kept:])
+        return messages
+
+    def after_turn(self, session_id: str, session_data: Dict[str, Any], lock: asyncio.Lock,
+                   on_update: Optional[Callable[[], None]] = None):
+        """턴 저장 후 호출: 요약할 오래된 메시지가 쌓였으면 백그라운드 요약 예약 (반영 후 on_update 호출)"""
+        if not self.summarizing:
+            return
+        unsummarized = len(session_data["message_history"]) - session_data.get("summarized_count", 0)
+        if unsummarized <= self.recent_messages:
+            return
+        if session_id in self._tasks:
+            # 진행 중인 요약 작업이 끝나기 전에 새로 쌓인 메시지까지 이어서 요약
+            return
+        task = asyncio.get_running_loop().create_task(self._summarize(session_id, session_data, lock, on_update))
+        self._tasks[session_id] = task
+
+    async def _summarize(self, session_id: str, session_data: Dict[str, Any], lock: asyncio.Lock,
+                         on_update: Optional[Callable[[], None]]):
+        try:
+            while True:
+                history = session_data["message_history"]
+                start = session_data.get("summarized_count", 0)
+                end = len(history) - self.recent_messages
+                if end <= start:
+                    break
+                folded = history[start:end]
+                previous = session_data.get("summary") or ""
+
+                summary = await self._generate(previous, folded)
+
+                # 요약하는 동안 추가/정리된 메시지가 있을 수 있으므로 lock을 잡고 위치를 다시 찾아 반영
+                async with lock:
+                    history = session_data["message_history"]
+                    last = folded[-1]
+                    position = next((i for i in range(len(history) - 1, -1, -1) if history[i] is last), -1)
+                    session_data["summary"] = summary
+                    session_data["summarized_count"] = position + 1
+                    if on_update is not None:
+                        on_update()
+                self.summaries += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.summary_failures += 1
+            print(f"⚠️  대화 요약 실패 (세션 {session_id}, 최근 메시지만 사용): {e}")
+        finally:
+            self._tasks.pop(session_id, None)
+
+    async def _generate(self, previous: str, messages: List) -> str:
+        conversation = "\n".join(
+            f"{'사용자' if m.role == 'user' else '어시스턴트'}: {m.content}" for m in messages
+        )
+        prompt = SUMMARY_PROMPT.format_messages(
+            max_tokens=SUMMARY_MAX_TOKENS,
+            summary=previous or "(없음)",
+            conversation=conversation
+        )
+        response = await llm_pool.get(SUMMARY_MODEL).ainvoke(prompt)
+        return response.content.strip()
+
+    async def aclose(self):
+        """진행 중인 요약 작업 취소 (서버 종료 시)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "token_budget": self.token_budget,
+            "recent_turns": self.recent_messages // 2,
+            "summary_model": SUMMARY_MODEL,
+            "summaries": self.summaries,
+            "summary_failures": self.summary_failures,
+            "summarizing_sessions": len(self._tasks),
+            "dropped_from_prompt": self.dropped_from_prompt,
+        }
@@ -0,0 +1,163 @@
+import asyncio
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from PIL import ExifTags, Image, ImageOps
+
+
+# Vision 모델에 보낼 이미지의 최대 긴 변 (픽셀)
+IMAGE_MAX_EDGE = int(os.getenv('CHATBOT_IMAGE_MAX_EDGE', 1536))
+
+# 재압축 JPEG 품질
+IMAGE_JPEG_QUALITY = int(os.getenv('CHATBOT_IMAGE_JPEG_QUALITY', 85))
+
+# 이미지 전처리 스레드 수
+IMAGE_WORKERS = int(os.getenv('CHATBOT_IMAGE_WORKERS', 4))
+
+# 원본 그대로 보낼 수 있는 포맷과 MIME 타입
+MIME_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+    'GIF': 'image/gif',
+}
+
+
+class PreparedImage(NamedTuple):
+    data: bytes
+    mime_type: str
+    size: Tuple[int, int]
+    original_size: Tuple[int, int]
+    original_format: Optional[str]
+    original_bytes: int
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def preprocess_image(content: bytes, max_edge: int = IMAGE_MAX_EDGE,
+                     quality: int = IMAGE_JPEG_QUALITY) -> PreparedImage:
+    """
+    Vision 모델에 보낼 이미지로 변환
+
+    JPEG는 draft 모드로 필요한 크기에 가까운 1/2~1/8 배율로 바로 디코딩하고, EXIF 회전 정보를 반영한 뒤
+    긴 변이 max_edge를 넘으면 줄여서 JPEG(투명 배경이 있으면 PNG)로 다시 압축한다.
+    줄이거나 회전할 필요가 없고 다시 압축해도 작아지지 않으면 원본을 실제 포맷의 MIME 타입으로 보낸다.
+    """
+    image = Image.open(io.BytesIO(content))
+    original_format = image.format
+    original_size = image.size
+
+    if original_format == 'JPEG' and max(original_size) > max_edge:
+        # 목표 크기(비율 유지) 이상을 유지하는 가장 작은 배율로 디코딩
+        ratio = max_edge / max(original_size)
+        image.draft('RGB', (int(original_size[0] * ratio), int(original_size[1] * ratio)))
+
+    orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+    transformed = orientation != 1 or image.size != original_size
+    image = ImageOps.exif_transpose(image)
+    if max(image.size) > max_edge:
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        transformed = True
+
+    output = io.BytesIO()
+    if _has_alpha(image):
+        image.save(output, format='PNG')
+        mime_type = 'image/png'
+    else:
+        image.convert('RGB').save(output, format='JPEG', quality=quality, optimize=True)
+        mime_type = 'image/jpeg'
+    data = output.getvalue()
+
+    if not transformed and original_format in MIME_TYPES and len(content) <= len(data):
+        data, mime_type = content, MIME_TYPES[original_format]
+
+    return PreparedImage(data, mime_type, image.size, original_size, original_format, len(content))
+
+
+class ImagePipeline:
+    """
+    업로드 이미지 전처리 (스레드 풀)
+
+    디코딩/리사이즈/압축은 CPU를 쓰는 작업이라 이벤트 루프를 막지 않도록 전용 스레드 풀에서 실행하고,
+    줄어든 바이트 수와 처리 시간을 통계로 남긴다.
+    """
+
+    def __init__(self, max_edge: int = IMAGE_MAX_EDGE, quality: int = IMAGE_JPEG_QUALITY,
+                 workers: int = IMAGE_WORKERS):
+        self.max_edge = max_edge
+        self.quality = quality
+        self.workers = max(1, workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # 통계
+        self.processed = 0
+        self.failures = 0
+        self.resized = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='image')
+            return self._executor
+
+    def _run(self, content: bytes) -> PreparedImage:
+        started = time.perf_counter()
+        try:
+            prepared = preprocess_image(content, self.max_edge, self.quality)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.processed += 1
+            if max(prepared.size) != max(prepared.original_size):
+                self.resized += 1
+            self.bytes_in += prepared.original_bytes
+            self.bytes_out += len(prepared.data)
+            self._total_seconds += elapsed
+            self._max_seconds = max(self._max_seconds, elapsed)
+        return prepared
+
+    async def prepare(self, content: bytes) -> PreparedImage:
+        """전처리된 이미지 (스레드 풀에서 실행)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self._run, content)
+
+    def shutdown(self):
+        """스레드 풀 종료 (서버 종료 시)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_edge": self.max_edge,
+                "jpeg_quality": self.quality,
+                "workers": self.workers,
+                "processed": self.processed,
+                "failures": self.failures,
+                "resized": self.resized,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+                "savings_ratio": round(1 - self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+                "avg_ms": round(self._total_seconds / self.processed * 1000, 2) if self.processed else 0.0,
+                "max_ms": round(self._max_seconds * 1000, 2),
+            }
+
+
+image_pipeline = ImagePipeline()
@@ -0,0 +1,91 @@
+import os
+import threading
+from typing import Dict, Tuple
+import httpx
+from langchain_openai import ChatOpenAI
+
+
+# 기본 대화 모델과 이미지 분석 모델
+CHAT_MODEL = os.getenv('CHATBOT_CHAT_MODEL', 'gpt-5-nano')
+VISION_MODEL = os.getenv('CHATBOT_VISION_MODEL', 'gpt-4o')
+
+# OpenAI API HTTP 연결 풀 설정
+HTTP_MAX_CONNECTIONS = int(os.getenv('OPENAI_HTTP_MAX_CONNECTIONS', 100))
+HTTP_MAX_KEEPALIVE = int(os.getenv('OPENAI_HTTP_MAX_KEEPALIVE', 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('OPENAI_HTTP_KEEPALIVE_EXPIRY', 60))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('OPENAI_HTTP_CONNECT_TIMEOUT', 5))
+HTTP_TIMEOUT = float(os.getenv('OPENAI_HTTP_TIMEOUT', 120))
+LLM_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', 2))
+
+
+class LLMPool:
+    """
+    프로세스 전체가 공유하는 LLM 클라이언트
+
+    모델(과 temperature)별 ChatOpenAI를 한 번만 만들고, 모든 클라이언트가 keep-alive HTTP 연결 풀
+    하나를 같이 쓴다. 같은 API 호스트로 가는 요청이므로 모델이 달라도 TLS 연결을 재사용한다.
+    """
+
+    def __init__(self):
+        self._llms: Dict[Tuple[str, float], ChatOpenAI] = {}
+        self._lock = threading.Lock()
+        self._http_client = None
+        self._http_async_client = None
+        self.created = 0
+
+    def _http_clients(self) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        if self._http_client is None:
+            limits = httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            )
+            timeout = httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+            self._http_client = httpx.Client(limits=limits, timeout=timeout)
+            self._http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        return self._http_client, self._http_async_client
+
+    def get(self, model: str = CHAT_MODEL, temperature: float = 0.7) -> ChatOpenAI:
+        """모델별 공유 ChatOpenAI (없으면 생성)"""
+        key = (model, temperature)
+        llm = self._llms.get(key)
+        if llm is not None:
+            return llm
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is None:
+                http_client, http_async_client = self._http_clients()
+                llm = ChatOpenAI(
+                    model=model,
+                    temperature=temperature,
+                    openai_api_key=os.getenv("OPENAI_API_KEY"),
+                    max_retries=LLM_MAX_RETRIES,
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                )
+                self._llms[key] = llm
+                self.created += 1
+            return llm
+
+    async def aclose(self):
+        """HTTP 연결 풀 종료 (서버 종료 시)"""
+        with self._lock:
+            http_client, http_async_client = self._http_client, self._http_async_client
+            self._llms.clear()
+            self._http_client = self._http_async_client = None
+        if http_client is not None:
+            http_client.close()
+        if http_async_client is not None:
+            await http_async_client.aclose()
+
+    def stats(self) -> Dict:
+        return {
+            "models": [{"model": model, "temperature": temperature} for model, temperature in self._llms],
+            "clients_created": self.created,
+            "max_connections": HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": HTTP_MAX_KEEPALIVE,
+            "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+        }
+
+
+llm_pool = LLMPool()
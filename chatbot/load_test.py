@@ -0,0 +1,206 @@
+"""
+챗봇 처리량 부하 테스트
+
+OpenAI 대신 지연 시간을 흉내 내는 가짜 모델 서버를 띄우고, 챗봇 서버에 동시 요청을 보내
+처리량, 지연 시간 분위수(스트리밍은 첫 토큰까지 시간 포함)와 세션별 대화 순서를 확인한다.
+
+    python load_test.py fake-server --port 9100 --latency 1.0
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=test uvicorn app:app --port 8000
+    python load_test.py run --url http://127.0.0.1:8000 --concurrency 64 --requests 512 --sessions 32
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+
+def create_fake_model_app(latency: float, tokens: int) -> FastAPI:
+    """OpenAI chat completions 형식으로 응답하는 가짜 모델 서버 (latency초 동안 tokens개 토큰 생성)"""
+    fake = FastAPI()
+    token_delay = latency / max(tokens, 1)
+
+    @fake.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake")
+
+        if body.get("stream"):
+            async def events():
+                for i in range(tokens):
+                    await asyncio.sleep(token_delay)
+                    chunk = {
+                        "id": "fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                        "choices": [{"index": 0, "delta": {"content": f"토큰{i} "}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency)
+        return {
+            "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": " ".join(f"토큰{i}" for i in range(tokens))},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": tokens, "total_tokens": tokens},
+        }
+
+    return fake
+
+
+def fake_server(args):
+    print(f"🤖 가짜 모델 서버: http://{args.host}:{args.port}/v1 (지연 {args.latency}s, 토큰 {args.tokens}개)")
+    uvicorn.run(create_fake_model_app(args.latency, args.tokens), host=args.host, port=args.port, log_level="warning")
+
+
+async def send_chat(client: httpx.AsyncClient, url: str, session_id: Optional[str], message: str) -> Dict:
+    started = time.perf_counter()
+    response = await client.post(f"{url}/chat", json={"message": message, "session_id": session_id})
+    response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return {"session_id": response.json()["session_id"], "latency": elapsed, "ttft": elapsed}
+
+
+async def send_stream(client: httpx.AsyncClient, url: str, session_id: Optional[str], message: str) -> Dict:
+    started = time.perf_counter()
+    ttft = None
+    result_session = session_id
+    async with client.stream("POST", f"{url}/chat/stream", json={"message": message, "session_id": session_id}) as response:
+        response.raise_for_status()
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+                if event == "session":
+                    result_session = data["session_id"]
+                elif event == "error":
+                    raise RuntimeError(data.get("detail"))
+                elif event is None and ttft is None:
+                    ttft = time.perf_counter() - started
+            elif not line:
+                event = None
+    elapsed = time.perf_counter() - started
+    return {"session_id": result_session, "latency": elapsed, "ttft": ttft if ttft is not None else elapsed}
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(v * 1000 for v in values)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+    return {"p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": round(ordered[-1], 1)}
+
+
+async def check_ordering(client: httpx.AsyncClient, url: str, session_ids: List[str]) -> int:
+    """세션 히스토리가 user/assistant 순서로 번갈아 쌓였는지 확인하고 어긋난 세션 수 반환"""
+    broken = 0
+    for session_id in session_ids:
+        response = await client.get(f"{url}/chat/history/{session_id}")
+        if response.status_code != 200:
+            continue
+        roles = [m["role"] for m in response.json()["message_history"]]
+        if any(role != ("user" if i % 2 == 0 else "assistant") for i, role in enumerate(roles)):
+            broken += 1
+    return broken
+
+
+async def run_load(args) -> Dict:
+    send = send_stream if args.stream else send_chat
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        # 세션을 먼저 만들어 두고 요청을 세션에 고르게 나눔 (같은 세션에 동시 요청이 겹치도록)
+        session_ids = [(await send_chat(client, args.url, None, "안녕하세요"))["session_id"]
+                       for _ in range(args.sessions)]
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(args.requests):
+            queue.put_nowait(i)
+        results: List[Dict] = []
+        errors: List[str] = []
+
+        async def worker():
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results.append(await send(client, args.url, session_ids[i % len(session_ids)], f"질문 {i}"))
+                except Exception as e:
+                    errors.append(str(e))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        broken = await check_ordering(client, args.url, session_ids)
+
+    return {
+        "endpoint": "/chat/stream" if args.stream else "/chat",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "sessions": args.sessions,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "errors": len(errors),
+        "latency": percentiles([r["latency"] for r in results]),
+        "ttft": percentiles([r["ttft"] for r in results]) if args.stream else {},
+        "sessions_out_of_order": broken,
+    }
+
+
+def run(args):
+    report = asyncio.run(run_load(args))
+    print(f"🚀 {report['endpoint']}: {report['requests']}건, 동시 {report['concurrency']}, 세션 {report['sessions']}")
+    print(f"  처리량 {report['throughput_rps']} req/s ({report['elapsed_s']}s), 오류 {report['errors']}건")
+    print(f"  지연 {report['latency']}")
+    if report['ttft']:
+        print(f"  첫 토큰 {report['ttft']}")
+    print(f"  순서가 어긋난 세션 {report['sessions_out_of_order']}개")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="챗봇 처리량 부하 테스트")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    fake_parser = sub.add_parser('fake-server', help="가짜 OpenAI 모델 서버 실행")
+    fake_parser.add_argument('--host', default='127.0.0.1')
+    fake_parser.add_argument('--port', type=int, default=9100)
+    fake_parser.add_argument('--latency', type=float, default=1.0, help="응답 하나의 생성 시간 (초)")
+    fake_parser.add_argument('--tokens', type=int, default=40)
+
+    run_parser = sub.add_parser('run', help="챗봇 서버에 부하 전송")
+    run_parser.add_argument('--url', default='http://127.0.0.1:8000')
+    run_parser.add_argument('--requests', type=int, default=256)
+    run_parser.add_argument('--concurrency', type=int, default=32)
+    run_parser.add_argument('--sessions', type=int, default=16)
+    run_parser.add_argument('--stream', action='store_true', help="/chat/stream으로 전송")
+    run_parser.add_argument('--timeout', type=float, default=120)
+    run_parser.add_argument('--output', help="결과 JSON 경로")
+
+    args = parser.parse_args()
+    if args.command == 'fake-server':
+        fake_server(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+
+# 세션 공유 저장소: memory (프로세스 내부), sqlite, redis / 비어 있으면 사용 안 함 (세션 저장소 메모리에만 보관)
+SESSION_BACKEND = os.getenv('CHATBOT_SESSION_BACKEND', '')
+
+# SQLite 파일 경로 (여러 프로세스가 같은 파일을 쓰면 세션 공유)
+SESSION_SQLITE_PATH = os.getenv('CHATBOT_SESSION_SQLITE_PATH', 'chatbot_sessions.db')
+
+# Redis 프로토콜 서버 주소와 키 접두사
+SESSION_REDIS_URL = os.getenv('CHATBOT_SESSION_REDIS_URL', 'redis://localhost:6379/0')
+SESSION_REDIS_PREFIX = os.getenv('CHATBOT_SESSION_REDIS_PREFIX', 'chatbot:session:')
+
+# 이 크기 이상인 세션만 압축
+COMPRESS_MIN_BYTES = 1024
+
+_ROLE_CODES = {"user": 0, "assistant": 1}
+_ROLE_NAMES = {code: role for role, code in _ROLE_CODES.items()}
+
+
+class SessionRecord(NamedTuple):
+    """저장소에 쓰는 세션 한 건 (목록 조회용 요약 + 직렬화된 본문)"""
+    session_id: str
+    version: int
+    created_at: str
+    message_count: int
+    data: bytes
+    # 쓰기 기준 version: 저장소 version이 이 값일 때만 쓴다 (0이면 새 세션)
+    base_version: int = 0
+
+
+def encode_session(session: Dict[str, Any]) -> bytes:
+    """세션을 짧은 키의 JSON으로 직렬화 (1KB 이상이면 zlib 압축, 첫 바이트로 구분)"""
+    payload = {
+        "c": session["created_at"].isoformat(),
+        "p": session.get("system_prompt"),
+        "s": session.get("summary") or "",
+        "k": session.get("summarized_count", 0),
+        "m": [[_ROLE_CODES.get(m.role, m.role), m.content, m.timestamp] for m in session["message_history"]],
+    }
+    raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return b'z' + zlib.compress(raw, 1)
+    return b'j' + raw
+
+
+def decode_session(data: bytes, message_factory: Callable[..., Any]) -> Dict[str, Any]:
+    """encode_session의 역변환 (메시지는 message_factory(role=, content=, timestamp=)로 생성)"""
+    raw = zlib.decompress(data[1:]) if data[:1] == b'z' else data[1:]
+    payload = json.loads(raw)
+    return {
+        "created_at": datetime.fromisoformat(payload["c"]),
+        "system_prompt": payload.get("p"),
+        "summary": payload.get("s", ""),
+        "summarized_count": payload.get("k", 0),
+        "message_history": [
+            message_factory(role=_ROLE_NAMES.get(role, role), content=content, timestamp=timestamp)
+            for role, content, timestamp in payload["m"]
+        ],
+    }
+
+
+class SessionBackend(ABC):
+    """
+    세션 공유 저장소 인터페이스
+
+    SessionStore가 캐시에 없는 세션을 읽어 오고(load), 변경된 세션을 모아서 쓴다(save_many).
+    version은 캐시된 세션이 다른 레플리카에서 갱신되었는지 확인하는 가벼운 조회다.
+
+    save_many는 세션마다 compare-and-set으로 쓴다: 저장소의 version이 record.base_version과 같거나
+    세션이 없을 때만 쓰고, 다른 레플리카가 먼저 써서 version이 다른 세션 id 목록을 돌려준다.
+    """
+
+    # 다른 프로세스와 공유되는 저장소인지 (False면 캐시 적중 시 version 확인 생략)
+    shared = True
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        ...
+
+    @abstractmethod
+    def version(self, session_id: str) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    def save_many(self, records: List[SessionRecord]) -> List[str]:
+        """세션 쓰기 (compare-and-set), 충돌로 쓰지 못한 세션 id 목록 반환"""
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def list_index(self) -> List[Dict[str, Any]]:
+        """세션 목록 (본문을 읽지 않고 요약만)"""
+        ...
+
+    def expire(self, ttl_seconds: float) -> int:
+        """ttl_seconds 동안 쓰이지 않은 세션 삭제, 삭제한 수 반환"""
+        return 0
+
+    def close(self):
+        pass
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__}
+
+
+class MemoryBackend(SessionBackend):
+    """
+    프로세스 내부 저장소
+
+    레플리카 간 공유는 되지 않지만, 세션 캐시에서 밀려난 세션을 압축된 형태로 보관한다.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._records: Dict[str, SessionRecord] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        return self._records.get(session_id)
+
+    def version(self, session_id: str) -> Optional[int]:
+        record = self._records.get(session_id)
+        return record.version if record is not None else None
+
+    def save_many(self, records: List[SessionRecord]) -> List[str]:
+        now = time.time()
+        conflicts = []
+        with self._lock:
+            for record in records:
+                current = self._records.get(record.session_id)
+                if current is not None and current.version != record.base_version:
+                    conflicts.append(record.session_id)
+                    continue
+                self._records[record.session_id] = record
+                self._updated_at[record.session_id] = now
+        return conflicts
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._records.pop(session_id, None)
+            self._updated_at.pop(session_id, None)
+
+    def list_index(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"session_id": r.session_id, "created_at": r.created_at, "message_count": r.message_count}
+                for r in self._records.values()
+            ]
+
+    def expire(self, ttl_seconds: float) -> int:
+        cutoff = time.time() - ttl_seconds
+        with self._lock:
+            expired = [sid for sid, updated_at in self._updated_at.items() if updated_at < cutoff]
+            for session_id in expired:
+                self._records.pop(session_id, None)
+                self._updated_at.pop(session_id, None)
+        return len(expired)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "sessions": len(self._records),
+            "bytes": sum(len(r.data) for r in self._records.values()),
+        }
+
+
+class SQLiteBackend(SessionBackend):
+    """
+    SQLite(WAL) 저장소
+
+    WAL 모드라 한 프로세스가 쓰는 동안에도 다른 프로세스가 읽을 수 있어, 같은 볼륨을 마운트한
+    워커/레플리카가 세션을 공유한다. 쓰기는 write-behind 배치 하나를 한 트랜잭션으로 처리한다.
+    읽기(load/version/목록)는 쓰기 연결과 별도의 연결을 써서 쓰기 트랜잭션이 끝나기를 기다리지 않는다.
+    """
+
+    def __init__(self, path: str = SESSION_SQLITE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS chat_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    message_count INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    data BLOB NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated_at ON chat_sessions (updated_at)")
+        self._read_conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._read_lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT session_id, version, created_at, message_count, data FROM chat_sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        return SessionRecord(*row, base_version=row[1]) if row else None
+
+    def version(self, session_id: str) -> Optional[int]:
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT version FROM chat_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_many(self, records: List[SessionRecord]) -> List[str]:
+        now = time.time()
+        conflicts = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for r in records:
+                    # 저장소 version이 기준 version과 다르면 UPDATE가 일어나지 않아 변경 행 수가 0
+                    cursor = self._conn.execute("""
+                        INSERT INTO chat_sessions (session_id, version, created_at, message_count, updated_at, data)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(session_id) DO UPDATE SET
+                            version = excluded.version,
+                            message_count = excluded.message_count,
+                            updated_at = excluded.updated_at,
+                            data = excluded.data
+                        WHERE chat_sessions.version = ?
+                    """, (r.session_id, r.version, r.created_at, r.message_count, now, r.data, r.base_version))
+                    if cursor.rowcount == 0:
+                        conflicts.append(r.session_id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return conflicts
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+
+    def list_index(self) -> List[Dict[str, Any]]:
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                "SELECT session_id, created_at, message_count FROM chat_sessions ORDER BY created_at"
+            ).fetchall()
+        return [{"session_id": sid, "created_at": created_at, "message_count": count} for sid, created_at, count in rows]
+
+    def expire(self, ttl_seconds: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM chat_sessions WHERE updated_at < ?", (time.time() - ttl_seconds,))
+        return cursor.rowcount
+
+    def close(self):
+        with self._read_lock:
+            self._read_conn.close()
+        with self._lock:
+            self._conn.close()
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": "sqlite", "path": self.path}
+
+
+# 세션 해시의 version이 기준 version과 같거나 해시가 없을 때만 쓰는 compare-and-set (1: 씀, 0: 충돌)
+_REDIS_SAVE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if current and tonumber(current) ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'version', ARGV[2], 'created_at', ARGV[3], 'message_count', ARGV[4], 'data', ARGV[5])
+if tonumber(ARGV[6]) > 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[6])
+end
+redis.call('ZADD', KEYS[2], ARGV[7], ARGV[8])
+return 1
+"""
+
+
+class RedisBackend(SessionBackend):
+    """
+    Redis 프로토콜 저장소 (Redis, Valkey, KeyDB 등)
+
+    세션마다 해시 하나(version, created_at, message_count, data)를 두고 키 만료(EXPIRE)로 TTL을 맡긴다.
+    목록 조회용으로 마지막 저장 시각을 점수로 한 세션 id 정렬 집합(sorted set)을 따로 유지해,
+    만료된 id 정리는 점수 범위 삭제 한 번으로 끝난다 (세션 수에 비례하는 조회 없음).
+    """
+
+    def __init__(self, url: str = SESSION_REDIS_URL, prefix: str = SESSION_REDIS_PREFIX,
+                 ttl_seconds: float = 0, client: Any = None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("CHATBOT_SESSION_BACKEND=redis를 쓰려면 redis 패키지가 필요합니다.") from e
+            client = redis.Redis.from_url(url)
+        self.url = url
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+        self._index_key = f"{prefix}index:updated_at"
+        self._save_script = client.register_script(_REDIS_SAVE_SCRIPT)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        version, created_at, count, data = self._client.hmget(
+            self._key(session_id), "version", "created_at", "message_count", "data"
+        )
+        if data is None:
+            return None
+        return SessionRecord(session_id, int(version), created_at.decode('utf-8'), int(count), data, int(version))
+
+    def version(self, session_id: str) -> Optional[int]:
+        version = self._client.hget(self._key(session_id), "version")
+        return int(version) if version is not None else None
+
+    def save_many(self, records: List[SessionRecord]) -> List[str]:
+        now = time.time()
+        pipe = self._client.pipeline(transaction=False)
+        for r in records:
+            self._save_script(
+                keys=[self._key(r.session_id), self._index_key],
+                args=[r.base_version, r.version, r.created_at, r.message_count, r.data,
+                      int(self.ttl_seconds), now, r.session_id],
+                client=pipe,
+            )
+        results = pipe.execute()
+        return [r.session_id for r, saved in zip(records, results) if not saved]
+
+    def delete(self, session_id: str):
+        pipe = self._client.pipeline(transaction=False)
+        pipe.delete(self._key(session_id))
+        pipe.zrem(self._index_key, session_id)
+        pipe.execute()
+
+    def list_index(self) -> List[Dict[str, Any]]:
+        session_ids = [sid.decode('utf-8') for sid in self._client.zrange(self._index_key, 0, -1)]
+        pipe = self._client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.hmget(self._key(session_id), "created_at", "message_count")
+        entries = []
+        for session_id, (created_at, count) in zip(session_ids, pipe.execute()):
+            if created_at is not None:
+                entries.append({
+                    "session_id": session_id, "created_at": created_at.decode('utf-8'), "message_count": int(count),
+                })
+        return sorted(entries, key=lambda e: e["created_at"])
+
+    def expire(self, ttl_seconds: float) -> int:
+        # 세션 키는 EXPIRE로 사라지므로 목록 집합에서 같은 기준으로 만료된 id만 점수 범위로 정리
+        return self._client.zremrangebyscore(self._index_key, '-inf', f"({time.time() - ttl_seconds}")
+
+    def close(self):
+        self._client.close()
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": "redis", "prefix": self.prefix}
+
+
+def create_backend(name: str = SESSION_BACKEND, ttl_seconds: float = 0) -> Optional[SessionBackend]:
+    """설정 이름으로 저장소 생성 (비어 있으면 None)"""
+    if not name:
+        return None
+    if name == 'memory':
+        return MemoryBackend()
+    if name == 'sqlite':
+        return SQLiteBackend()
+    if name == 'redis':
+        return RedisBackend(ttl_seconds=ttl_seconds)
+    raise ValueError(f"지원하지 않는 세션 저장소입니다: {name}")
@@ -0,0 +1,535 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import anyio
+
+from session_backend import SessionBackend, SessionRecord, decode_session, encode_session
+
+
+# 마지막 사용 후 세션을 유지할 시간 (초, 0이면 만료 없음)
+SESSION_TTL_SECONDS = float(os.getenv('CHATBOT_SESSION_TTL_SECONDS', 3600))
+
+# 동시에 유지할 최대 세션 수 (넘으면 가장 오래 사용하지 않은 세션부터 제거)
+MAX_SESSIONS = int(os.getenv('CHATBOT_MAX_SESSIONS', 1000))
+
+# 세션 하나의 대화 기록 크기 상한 (바이트, 넘으면 오래된 메시지부터 제거)
+SESSION_MAX_BYTES = int(os.getenv('CHATBOT_SESSION_MAX_BYTES', 256 * 1024))
+
+# 백그라운드 정리 주기 (초)
+SESSION_SWEEP_SECONDS = float(os.getenv('CHATBOT_SESSION_SWEEP_SECONDS', 60))
+
+# 변경된 세션을 공유 저장소에 모아서 쓰는 주기 (초, write-behind)
+SESSION_FLUSH_SECONDS = float(os.getenv('CHATBOT_SESSION_FLUSH_SECONDS', 0.2))
+
+# 캐시된 세션이 다른 레플리카에서 갱신되었는지 다시 확인하기까지의 간격 (초)
+SESSION_REVALIDATE_SECONDS = 0.5
+
+# 메시지 하나의 고정 부가 비용 추정치 (역할, 시각, 객체 헤더 등)
+MESSAGE_OVERHEAD_BYTES = 200
+
+
+def message_bytes(content: Any) -> int:
+    """메시지 하나의 대략적인 메모리 크기"""
+    if isinstance(content, str):
+        return len(content.encode('utf-8')) + MESSAGE_OVERHEAD_BYTES
+    if isinstance(content, list):
+        # 멀티모달 메시지 (텍스트/이미지 조각 목록)
+        return sum(message_bytes(part.get("text") or part.get("image_url", {}).get("url", ""))
+                   for part in content if isinstance(part, dict))
+    return MESSAGE_OVERHEAD_BYTES
+
+
+def trim_messages(messages: List, max_bytes: int, size_of: Callable[[Any], int]) -> int:
+    """오래된 메시지부터 지워 max_bytes 이하로 맞추고 남은 크기 반환 (마지막 메시지는 유지)"""
+    sizes = [size_of(m) for m in messages]
+    total = sum(sizes)
+    drop = 0
+    while total > max_bytes and drop < len(messages) - 1:
+        total -= sizes[drop]
+        drop += 1
+    if drop:
+        del messages[:drop]
+    return total
+
+
+def _message_key(message: Any) -> tuple:
+    return (message.role, message.content, message.timestamp)
+
+
+def _split_turns(messages: List) -> List[List]:
+    """대화 기록을 턴(사용자 메시지 + 이어지는 응답) 단위로 나눔"""
+    turns: List[List] = []
+    for message in messages:
+        if message.role == "user" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def merge_sessions(local: Dict[str, Any], remote: Dict[str, Any]):
+    """
+    저장소의 세션(remote)과 이 레플리카의 세션(local)을 합쳐 local에 반영
+
+    같은 세션을 두 레플리카가 동시에 이어 쓴 경우(쓰기 충돌)에 쓴다. 턴 단위로 합쳐 사용자 메시지와
+    응답이 섞이지 않게 하고, 같은 턴은 메시지가 더 많은 쪽을 쓴다. 저장소 기록의 첫 턴보다 오래된
+    로컬 전용 턴은 저장소에서 크기 예산 때문에 지워진 것으로 보고 다시 넣지 않는다.
+    다른 코드가 참조하는 메시지 목록 객체는 유지한다 (lock 안에서 호출).
+    """
+    local_history, remote_history = local["message_history"], remote["message_history"]
+    local_turns = {_message_key(turn[0]): turn for turn in _split_turns(local_history)}
+    remote_turns = _split_turns(remote_history)
+    oldest = (remote_turns[0][0].timestamp or "") if remote_turns else ""
+
+    turns = []
+    for turn in remote_turns:
+        mine = local_turns.pop(_message_key(turn[0]), None)
+        turns.append(mine if mine is not None and len(mine) >= len(turn) else turn)
+    turns.extend(turn for turn in local_turns.values() if (turn[0].timestamp or "") >= oldest)
+    # 같은 시각이면 저장소 순서 유지 (stable sort)
+    turns.sort(key=lambda turn: turn[0].timestamp or "")
+    merged = [message for turn in turns for message in turn]
+
+    # 요약은 더 많은 메시지를 요약한 쪽을 쓰고, 합친 기록에서 그 요약에 포함된 앞부분만 요약된 것으로 봄
+    base = remote if remote.get("summarized_count", 0) > local.get("summarized_count", 0) else local
+    summarized = {_message_key(m) for m in base["message_history"][:base.get("summarized_count", 0)]}
+    count = 0
+    while count < len(merged) and _message_key(merged[count]) in summarized:
+        count += 1
+
+    local_history[:] = merged
+    local["summary"] = base.get("summary") or ""
+    local["summarized_count"] = count
+    local["system_prompt"] = local.get("system_prompt") or remote.get("system_prompt")
+    local["created_at"] = min(local["created_at"], remote["created_at"])
+
+
+class SessionStore:
+    """
+    크기 제한이 있는 세션 저장소
+
+    세션은 마지막 사용 순서(LRU)로 보관하고, 유휴 시간(TTL) 만료와 최대 세션 수 초과분은
+    백그라운드 스레드가 제거한다. 요청 경로는 조회/추가와 순서 갱신만 하므로 O(1)이다.
+    세션 목록 조회용 요약(생성 시각, 메시지 수)은 별도 인덱스로 유지해 세션 전체를 훑지 않는다.
+
+    공유 저장소(backend)를 지정하면 이 저장소는 레플리카별 캐시가 된다.
+    - 캐시에 없는 세션은 요청될 때 저장소에서 읽어 복원한다 (lazy hydration).
+    - 변경된 세션은 표시만 해 두고 백그라운드 스레드가 모아서 한 번에 쓴다 (write-behind).
+    - 캐시 적중 시에는 version만 조회해 다른 레플리카가 더 최신이면 다시 읽는다.
+    - 세션의 version은 이 사본이 기반한 저장소 version이다. 쓰기는 저장소 version이 그대로일 때만
+      성공하고(compare-and-set), 다른 레플리카가 먼저 썼으면 저장소 세션을 읽어 합친 뒤 다시 쓴다.
+    """
+
+    def __init__(self, ttl_seconds: float = SESSION_TTL_SECONDS, max_sessions: int = MAX_SESSIONS,
+                 max_bytes: int = SESSION_MAX_BYTES, sweep_seconds: float = SESSION_SWEEP_SECONDS,
+                 backend: Optional[SessionBackend] = None, message_factory: Optional[Callable[..., Any]] = None,
+                 flush_seconds: float = SESSION_FLUSH_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max(1, max_sessions)
+        self.max_bytes = max_bytes
+        self.sweep_seconds = sweep_seconds
+        self.backend = backend
+        self.message_factory = message_factory
+        self.flush_seconds = flush_seconds
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._validated_at: Dict[str, float] = {}
+        self._index: Dict[str, Dict[str, Any]] = {}
+        # 저장소에 아직 쓰지 않은 세션 id, 캐시에서는 밀려났지만 아직 쓰지 않은 세션
+        self._dirty: Set[str] = set()
+        self._unflushed: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # 통계
+        self.expired = 0
+        self.evicted = 0
+        self.trimmed_messages = 0
+        self.hydrated = 0
+        self.reloaded = 0
+        self.flushes = 0
+        self.flushed_sessions = 0
+        self.flush_failures = 0
+        self.conflicts = 0
+        self.last_flush_ms = 0.0
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def start(self):
+        """백그라운드 정리(및 저장소 쓰기) 스레드 시작"""
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._background_loop, name="chatbot-session-sweep", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """백그라운드 스레드 중지 (남은 변경은 저장소에 쓰고 닫음)"""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.backend is not None:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️  종료 전 세션 저장 실패: {e}")
+            self.backend.close()
+
+    def _insert(self, session_id: str, session: Dict[str, Any]):
+        """캐시에 세션 추가 (lock 안에서 호출)"""
+        now = time.monotonic()
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        self._last_used[session_id] = now
+        self._validated_at[session_id] = now
+        self._index[session_id] = {
+            "session_id": session_id,
+            "created_at": session["created_at"].isoformat(),
+            "message_count": len(session["message_history"]),
+        }
+
+    def _remove(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """캐시에서 세션 제거 (lock 안에서 호출)"""
+        self._last_used.pop(session_id, None)
+        self._validated_at.pop(session_id, None)
+        self._index.pop(session_id, None)
+        return self._sessions.pop(session_id, None)
+
+    def _hydrate(self, record: SessionRecord) -> Dict[str, Any]:
+        session = decode_session(record.data, self.message_factory)
+        session["version"] = record.version
+        session["bytes"] = sum(message_bytes(m.content) for m in session["message_history"])
+        return session
+
+    def _lookup(self, session_id: str, now: float) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """캐시에서만 세션 조회 (저장소 I/O 없음), (세션, 저장소 확인 필요 여부) 반환"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                self._last_used[session_id] = now
+                fresh = (
+                    self.backend is None or not self.backend.shared or session_id in self._dirty
+                    or now - self._validated_at.get(session_id, 0) < SESSION_REVALIDATE_SECONDS
+                )
+                return session, not fresh
+            if self.backend is None:
+                return None, False
+            session = self._unflushed.pop(session_id, None)
+            if session is not None:
+                # 밀려났지만 아직 쓰지 않은 세션은 그대로 되살림
+                self._insert(session_id, session)
+                return session, False
+            return None, True
+
+    def _resolve(self, session_id: str, session: Optional[Dict[str, Any]], now: float) -> Optional[Dict[str, Any]]:
+        """캐시된 세션을 저장소 version으로 확인하거나 저장소에서 복원 (네트워크/디스크 I/O)"""
+        if session is not None:
+            # 다른 레플리카가 갱신/삭제했는지 version만 확인
+            remote = self.backend.version(session_id)
+            if remote is not None and remote == session["version"]:
+                with self._lock:
+                    self._validated_at[session_id] = now
+                return session
+            if remote is None:
+                with self._lock:
+                    if session_id not in self._dirty:
+                        self._remove(session_id)
+                        return None
+                return session
+            self.reloaded += 1
+
+        record = self.backend.load(session_id)
+        if record is None:
+            return None
+        session = self._hydrate(record)
+        with self._lock:
+            current = self._sessions.get(session_id)
+            if current is not None and (session_id in self._dirty or current.get("version", 0) >= record.version):
+                # 그사이 이 레플리카에서 바뀐 세션은 덮어쓰지 않음 (저장 시 합침)
+                return current
+            self._insert(session_id, session)
+            self.hydrated += 1
+            overflow = len(self._sessions) > self.max_sessions
+        if overflow:
+            self._request_sweep()
+        return session
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """세션 조회 (사용 시각과 LRU 순서 갱신, 캐시에 없으면 공유 저장소에서 복원)"""
+        now = time.monotonic()
+        session, check = self._lookup(session_id, now)
+        if not check:
+            return session
+        return self._resolve(session_id, session, now)
+
+    async def aget(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        이벤트 루프용 get
+
+        캐시 적중은 바로 돌려주고, 저장소 조회(version 확인, 복원)가 필요할 때만 워커 스레드에서 실행해
+        느린 저장소 호출 하나가 다른 세션의 요청까지 막지 않게 한다.
+        """
+        now = time.monotonic()
+        session, check = self._lookup(session_id, now)
+        if not check:
+            return session
+        return await anyio.to_thread.run_sync(self._resolve, session_id, session, now)
+
+    def put(self, session_id: str, session: Dict[str, Any]):
+        """세션 추가 (최대 수를 넘으면 정리 스레드를 깨움)"""
+        session.setdefault("bytes", 0)
+        session.setdefault("version", 0)
+        with self._lock:
+            self._insert(session_id, session)
+            self._mark_dirty(session_id, session)
+            overflow = len(self._sessions) > self.max_sessions
+        if overflow:
+            self._request_sweep()
+
+    def _request_sweep(self):
+        if self._thread is None:
+            # 정리 스레드 없이 쓰는 경우(스크립트 등)에는 바로 제거
+            self.sweep()
+        else:
+            self._wakeup.set()
+
+    def _mark_dirty(self, session_id: str, session: Dict[str, Any]):
+        if self.backend is not None:
+            self._dirty.add(session_id)
+
+    def mark_dirty(self, session_id: str):
+        """세션이 바뀌었음을 표시 (다음 write-behind 때 저장소에 씀)"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._mark_dirty(session_id, session)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            existed = self._remove(session_id) is not None
+            existed |= self._unflushed.pop(session_id, None) is not None
+            self._dirty.discard(session_id)
+        if self.backend is not None:
+            existed |= self.backend.version(session_id) is not None
+            self.backend.delete(session_id)
+        return existed
+
+    async def adelete(self, session_id: str) -> bool:
+        """이벤트 루프용 delete (저장소 삭제는 워커 스레드에서)"""
+        if self.backend is None:
+            return self.delete(session_id)
+        return await anyio.to_thread.run_sync(self.delete, session_id)
+
+    def record_message(self, session_id: str, session: Dict[str, Any], message: Any):
+        """세션에 메시지 추가: 크기를 누적하고 예산을 넘으면 오래된 메시지 제거"""
+        with self._lock:
+            if self._sessions.get(session_id) is not session:
+                # 턴 도중 캐시에서 밀려났거나 다시 읽힌 경우 이 턴이 이어 쓴 세션을 캐시에 둠
+                self._unflushed.pop(session_id, None)
+                self._insert(session_id, session)
+            history = session["message_history"]
+            # 쓰기 충돌 병합과 겹치지 않도록 lock 안에서 추가
+            history.append(message)
+            session["bytes"] += message_bytes(message.content)
+            if self.max_bytes > 0 and session["bytes"] > self.max_bytes:
+                before = len(history)
+                session["bytes"] = trim_messages(history, self.max_bytes, lambda m: message_bytes(m.content))
+                dropped = before - len(history)
+                self.trimmed_messages += dropped
+                # 요약에 반영된 메시지 수도 지워진 만큼 줄임
+                if "summarized_count" in session:
+                    session["summarized_count"] = max(0, session["summarized_count"] - dropped)
+            entry = self._index.get(session_id)
+            if entry is not None:
+                entry["message_count"] = len(history)
+            self._mark_dirty(session_id, session)
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        """세션 요약 목록 (인덱스 복사본, 공유 저장소가 있으면 다른 레플리카의 세션 포함)"""
+        entries: Dict[str, Dict[str, Any]] = {}
+        if self.backend is not None:
+            entries = {entry["session_id"]: entry for entry in self.backend.list_index()}
+        with self._lock:
+            for session_id, entry in self._index.items():
+                # 저장소에 없거나 아직 쓰지 않은 변경이 있는 세션만 캐시 값으로 (그 외에는 저장소 값이 최신)
+                if session_id not in entries or session_id in self._dirty:
+                    entries[session_id] = dict(entry)
+        return list(entries.values())
+
+    async def alist_sessions(self) -> List[Dict[str, Any]]:
+        """이벤트 루프용 list_sessions (저장소 목록 조회는 워커 스레드에서)"""
+        if self.backend is None:
+            return self.list_sessions()
+        return await anyio.to_thread.run_sync(self.list_sessions)
+
+    def flush(self, max_attempts: int = 3) -> int:
+        """변경된 세션을 공유 저장소에 한 번에 쓰고 쓴 수 반환 (쓰기 충돌은 합친 뒤 다시 씀)"""
+        if self.backend is None:
+            return 0
+        started = time.perf_counter()
+        written = 0
+        for _ in range(max_attempts):
+            count, conflicts = self._flush_once()
+            written += count
+            if not conflicts:
+                break
+            for session_id in conflicts:
+                self._merge_remote(session_id)
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        return written
+
+    def _flush_once(self) -> Tuple[int, List[str]]:
+        with self._lock:
+            if not self._dirty:
+                return 0, []
+            dirty, self._dirty = self._dirty, set()
+            snapshots = []
+            for session_id in dirty:
+                session = self._sessions.get(session_id) or self._unflushed.get(session_id)
+                if session is None:
+                    continue
+                # 직렬화는 lock 밖에서 하도록 바뀔 수 있는 값만 복사
+                snapshots.append((session_id, session, dict(session, message_history=list(session["message_history"]))))
+
+        try:
+            records = [
+                SessionRecord(session_id, copy["version"] + 1, copy["created_at"].isoformat(),
+                              len(copy["message_history"]), encode_session(copy), copy["version"])
+                for session_id, _, copy in snapshots
+            ]
+            conflicts = set(self.backend.save_many(records))
+        except Exception:
+            self.flush_failures += 1
+            with self._lock:
+                # 다음 주기에 다시 씀
+                self._dirty |= {session_id for session_id, _, _ in snapshots}
+            raise
+
+        with self._lock:
+            for session_id, session, copy in snapshots:
+                if session_id in conflicts:
+                    self._dirty.add(session_id)
+                    continue
+                if session["version"] == copy["version"]:
+                    session["version"] = copy["version"] + 1
+                    self._validated_at[session_id] = time.monotonic()
+                if session_id not in self._dirty:
+                    self._unflushed.pop(session_id, None)
+        self.flushes += 1
+        self.flushed_sessions += len(records) - len(conflicts)
+        self.conflicts += len(conflicts)
+        return len(records) - len(conflicts), list(conflicts)
+
+    def _merge_remote(self, session_id: str):
+        """쓰기 충돌: 저장소의 최신 세션을 읽어 이 레플리카의 변경과 합침 (다음 쓰기의 기준 version 갱신)"""
+        record = self.backend.load(session_id)
+        remote = self._hydrate(record) if record is not None else None
+        with self._lock:
+            session = self._sessions.get(session_id) or self._unflushed.get(session_id)
+            if session is None:
+                return
+            if remote is None:
+                # 그사이 삭제/만료됨: 새 세션으로 씀
+                session["version"] = 0
+            else:
+                merge_sessions(session, remote)
+                session["version"] = remote["version"]
+                history = session["message_history"]
+                session["bytes"] = sum(message_bytes(m.content) for m in history)
+                if self.max_bytes > 0 and session["bytes"] > self.max_bytes:
+                    before = len(history)
+                    session["bytes"] = trim_messages(history, self.max_bytes, lambda m: message_bytes(m.content))
+                    session["summarized_count"] = max(0, session.get("summarized_count", 0) - (before - len(history)))
+            entry = self._index.get(session_id)
+            if entry is not None:
+                entry["message_count"] = len(session["message_history"])
+            self._dirty.add(session_id)
+
+    def sweep(self) -> int:
+        """만료된 세션과 최대 수 초과분 제거, 제거한 수 반환"""
+        removed: List[Dict[str, Any]] = []
+        now = time.monotonic()
+        with self._lock:
+            # LRU 순서이므로 앞에서부터 만료되지 않은 세션을 만나면 멈춤
+            while self._sessions:
+                session_id = next(iter(self._sessions))
+                expired = self.ttl_seconds > 0 and now - self._last_used[session_id] > self.ttl_seconds
+                if not expired and len(self._sessions) <= self.max_sessions:
+                    break
+                session = self._remove(session_id)
+                if session_id in self._dirty:
+                    # 저장소에 쓰기 전이면 쓸 때까지 보관
+                    self._unflushed[session_id] = session
+                else:
+                    removed.append(session)
+                if expired:
+                    self.expired += 1
+                else:
+                    self.evicted += 1
+        # 대화 기록 해제는 lock 밖에서
+        count = len(removed)
+        removed.clear()
+        if self.backend is not None and self.ttl_seconds > 0:
+            self.backend.expire(self.ttl_seconds)
+        return count
+
+    def _background_loop(self):
+        interval = min(self.flush_seconds, self.sweep_seconds) if self.backend is not None else self.sweep_seconds
+        next_sweep = time.monotonic() + self.sweep_seconds
+        while not self._stop_event.is_set():
+            woken = self._wakeup.wait(interval)
+            self._wakeup.clear()
+            if self._stop_event.is_set():
+                break
+            if self.backend is not None:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"⚠️  세션 저장 실패 (다음 주기에 재시도): {e}")
+            if not woken and time.monotonic() < next_sweep:
+                continue
+            next_sweep = time.monotonic() + self.sweep_seconds
+            try:
+                removed = self.sweep()
+                if removed:
+                    print(f"🧹 세션 {removed}개 정리 (남은 세션 {len(self._sessions)}개)")
+            except Exception as e:
+                print(f"⚠️  세션 정리 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total_bytes = sum(session["bytes"] for session in self._sessions.values())
+            stats = {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "session_max_bytes": self.max_bytes,
+                "approx_bytes": total_bytes,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "trimmed_messages": self.trimmed_messages,
+            }
+            if self.backend is not None:
+                stats.update({
+                    "store": self.backend.describe(),
+                    "dirty": len(self._dirty),
+                    "hydrated": self.hydrated,
+                    "reloaded": self.reloaded,
+                    "flushes": self.flushes,
+                    "flushed_sessions": self.flushed_sessions,
+                    "flush_failures": self.flush_failures,
+                    "write_conflicts": self.conflicts,
+                    "last_flush_ms": round(self.last_flush_ms, 2),
+                })
+            return stats
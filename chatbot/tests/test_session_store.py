@@ -0,0 +1,180 @@
+"""
+공유 저장소 앞의 SessionStore 동작 확인
+
+레플리카 두 개를 같은 저장소(MemoryBackend 객체 공유, 같은 SQLite 파일, 같은 가짜 Redis 서버)에 붙여
+write-behind 쓰기, lazy hydration, compare-and-set 쓰기 충돌과 병합 결과를 확인한다.
+"""
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import pytest
+
+import session_store
+from session_backend import (
+    MemoryBackend, RedisBackend, SessionBackend, SessionRecord, SQLiteBackend, create_backend, encode_session
+)
+from session_store import SessionStore, merge_sessions
+
+
+@dataclass
+class Message:
+    role: str
+    content: str
+    timestamp: Optional[str] = None
+
+
+def msg(role: str, content: str, second: int) -> Message:
+    return Message(role, content, datetime(2026, 10, 18, 12, 0, second).isoformat())
+
+
+def new_session(*messages: Message) -> dict:
+    return {
+        "created_at": datetime(2026, 10, 18, 12, 0, 0),
+        "message_history": list(messages),
+        "system_prompt": None,
+        "summary": "",
+        "summarized_count": 0,
+    }
+
+
+def contents(session: dict):
+    return [m.content for m in session["message_history"]]
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backends(request, tmp_path):
+    """같은 저장소를 보는 레플리카별 backend 두 개"""
+    if request.param == "memory":
+        backend = MemoryBackend()
+        yield backend, backend
+    elif request.param == "sqlite":
+        path = str(tmp_path / "sessions.db")
+        first, second = SQLiteBackend(path), SQLiteBackend(path)
+        yield first, second
+        first.close()
+        second.close()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")  # compare-and-set Lua 스크립트 실행용
+        server = fakeredis.FakeServer()
+        yield (RedisBackend(client=fakeredis.FakeRedis(server=server)),
+               RedisBackend(client=fakeredis.FakeRedis(server=server)))
+
+
+@pytest.fixture(autouse=True)
+def no_revalidate_delay(monkeypatch):
+    # 캐시 적중 시에도 매번 저장소 version을 확인
+    monkeypatch.setattr(session_store, "SESSION_REVALIDATE_SECONDS", 0)
+
+
+def make_store(backend) -> SessionStore:
+    return SessionStore(ttl_seconds=0, max_bytes=0, backend=backend, message_factory=Message)
+
+
+def test_write_behind_and_hydration(backends):
+    backend_a, backend_b = backends
+    replica_a, replica_b = make_store(backend_a), make_store(backend_b)
+
+    replica_a.put("s1", new_session())
+    session = replica_a.get("s1")
+    replica_a.record_message("s1", session, msg("user", "안녕", 1))
+    replica_a.record_message("s1", session, msg("assistant", "안녕하세요", 2))
+
+    # 쓰기는 flush 때 한 번에
+    assert backend_a.load("s1") is None
+    assert replica_a.flush() == 1
+    assert replica_a.flush() == 0
+    assert backend_a.version("s1") == 1
+
+    hydrated = replica_b.get("s1")
+    assert contents(hydrated) == ["안녕", "안녕하세요"]
+    assert hydrated["version"] == 1
+    assert replica_b.stats()["hydrated"] == 1
+    assert [e["message_count"] for e in replica_b.list_sessions()] == [2]
+
+
+def test_conflicting_writes_are_merged(backends):
+    backend_a, backend_b = backends
+    replica_a, replica_b = make_store(backend_a), make_store(backend_b)
+
+    replica_a.put("s1", new_session(msg("user", "질문1", 1), msg("assistant", "답변1", 2)))
+    replica_a.flush()
+    session_a = replica_a.get("s1")
+    session_b = replica_b.get("s1")
+    assert session_b is not session_a
+
+    # 두 레플리카가 같은 version에서 각자 턴을 이어 씀
+    replica_a.record_message("s1", session_a, msg("user", "질문2", 3))
+    replica_a.record_message("s1", session_a, msg("assistant", "답변2", 4))
+    replica_b.record_message("s1", session_b, msg("user", "질문3", 5))
+    replica_b.record_message("s1", session_b, msg("assistant", "답변3", 6))
+
+    assert replica_a.flush() == 1
+    # B는 충돌 -> 저장소 세션과 합쳐 다시 씀
+    assert replica_b.flush() == 1
+    assert replica_b.stats()["write_conflicts"] == 1
+
+    expected = ["질문1", "답변1", "질문2", "답변2", "질문3", "답변3"]
+    assert contents(session_b) == expected
+    assert backend_a.version("s1") == 3
+    # 새 레플리카는 합친 기록을 복원하고, 공유 저장소면 A도 version 확인 후 다시 읽음
+    assert contents(make_store(backend_a).get("s1")) == expected
+    if backend_a.shared:
+        assert contents(replica_a.get("s1")) == expected
+
+
+def test_compare_and_set_rejects_stale_base_version(backends):
+    backend, _ = backends
+    data = encode_session(new_session(msg("user", "질문1", 1)))
+    created_at = datetime(2026, 10, 18).isoformat()
+
+    assert backend.save_many([SessionRecord("s1", 1, created_at, 1, data, 0)]) == []
+    assert backend.save_many([SessionRecord("s1", 2, created_at, 1, data, 1)]) == []
+    # 이미 version 2인데 version 1을 기준으로 쓰면 충돌
+    assert backend.save_many([
+        SessionRecord("s1", 2, created_at, 1, data, 1),
+        SessionRecord("s2", 1, created_at, 1, data, 0),
+    ]) == ["s1"]
+    assert backend.version("s1") == 2
+    assert backend.version("s2") == 1
+
+
+def test_merge_sessions_keeps_longer_turn_and_drops_trimmed_turns():
+    remote = new_session(
+        msg("user", "질문2", 3), msg("assistant", "답변2", 4),
+        msg("user", "질문3", 5),
+    )
+    remote["summary"] = "요약"
+    remote["summarized_count"] = 2
+    local = new_session(
+        msg("user", "질문1", 1), msg("assistant", "답변1", 2),
+        msg("user", "질문2", 3), msg("assistant", "답변2", 4),
+        msg("user", "질문3", 5), msg("assistant", "답변3", 6),
+        msg("user", "질문4", 7),
+    )
+    history = local["message_history"]
+
+    merge_sessions(local, remote)
+
+    # 질문1 턴은 저장소에서 크기 예산으로 지워진 것으로 보고 제외, 질문3 턴은 응답이 있는 로컬 쪽 사용
+    assert contents(local) == ["질문2", "답변2", "질문3", "답변3", "질문4"]
+    assert local["message_history"] is history
+    assert local["summary"] == "요약"
+    assert local["summarized_count"] == 2
+
+
+def test_redis_backend_requires_redis_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+    with pytest.raises(RuntimeError, match="redis"):
+        create_backend("redis")
+
+
+def test_backend_must_implement_every_method():
+    class LoadOnly(SessionBackend):
+        def load(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        LoadOnly()
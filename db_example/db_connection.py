@@ -1,11 +1,22 @@
 import os
+import threading
+import time
+from typing import Callable, Dict, List
 import pymysql
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# 커넥션 풀 설정
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
 
-def get_connection():
+
+class PoolTimeoutError(Exception):
+    """풀에서 제한 시간 안에 연결을 얻지 못함"""
+
+
+def create_connection():
     """MySQL DB 연결 생성"""
     return pymysql.connect(
         host=os.getenv('DB_HOST', '192.168.1.8'),
@@ -18,6 +29,128 @@ def get_connection():
     )
 
 
+class PooledConnection:
+    """풀에서 빌린 연결 (close() 하면 실제로 닫지 않고 풀에 반납)"""
+
+    def __init__(self, pool: "ConnectionPool", raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError("이미 풀에 반납된 연결입니다.")
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    스크립트용 간단한 커넥션 풀 (스레드 안전)
+
+    반납된 연결을 재사용하고, 체크아웃 시 ping으로 끊긴 연결을 다시 연결하며, 반납 시 트랜잭션을 롤백한다.
+    유휴 연결 정리와 대기 시간 통계가 있는 서버용 풀은 food_recommend/db_pool.py에 있다.
+    """
+
+    def __init__(self, factory: Callable = create_connection,
+                 max_size: int = DB_POOL_MAX_SIZE, timeout: float = DB_POOL_TIMEOUT):
+        self._factory = factory
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._idle: List = []
+        self._size = 0
+        self._cond = threading.Condition()
+
+        # 통계
+        self._checkouts = 0
+        self._created = 0
+        self._discarded = 0
+
+    def acquire(self) -> PooledConnection:
+        """연결 체크아웃 (풀이 가득 차 있으면 timeout까지 대기)"""
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(f"{self.timeout}초 안에 DB 연결을 얻지 못했습니다.")
+                self._cond.wait(remaining)
+            raw = self._idle.pop() if self._idle else None
+            if raw is None:
+                self._size += 1
+            self._checkouts += 1
+
+        try:
+            if raw is None:
+                raw = self._factory()
+                with self._cond:
+                    self._created += 1
+            else:
+                raw.ping(reconnect=True)
+        except Exception:
+            self._discard(raw)
+            raise
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        """연결 반납 (진행 중인 트랜잭션은 롤백)"""
+        try:
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        with self._cond:
+            self._idle.append(raw)
+            self._cond.notify()
+
+    def _discard(self, raw):
+        """연결을 닫고 풀 크기에서 제외"""
+        if raw is not None:
+            try:
+                raw.close()
+            except Exception:
+                pass
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def metrics(self) -> Dict:
+        """풀 상태 통계"""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+                "checkouts": self._checkouts,
+                "created": self._created,
+                "discarded": self._discarded,
+            }
+
+
+_pool = ConnectionPool()
+
+
+def get_connection() -> PooledConnection:
+    """풀에서 MySQL DB 연결 체크아웃 (close() 시 풀에 반납)"""
+    return _pool.acquire()
+
+
+def pool_metrics() -> Dict:
+    """커넥션 풀 통계"""
+    return _pool.metrics()
+
+
 def test_connection():
     """DB 연결 테스트"""
     try:
@@ -35,4 +168,3 @@ def test_connection():
 
 if __name__ == "__main__":
     test_connection()
-
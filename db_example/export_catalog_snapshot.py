@@ -0,0 +1,187 @@
+"""
+음식 카탈로그 스냅샷 내보내기
+
+foods / nutrients / food_nutrients 테이블을 한 트랜잭션(일관된 읽기)으로 조회하여
+버전이 붙은 컬럼 형식 .npz 파일로 저장한다. food_recommend는 FOOD_CATALOG_SNAPSHOT_PATH로
+이 파일을 지정하면 DB 없이 바로 기동하고, 백그라운드에서 DB와 맞춘다.
+
+    python export_catalog_snapshot.py --output-dir snapshots
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from db_connection import get_connection
+
+
+# 스냅샷 파일 형식 버전 (food_recommend/catalog_file.py와 같아야 함)
+SCHEMA_VERSION = 1
+
+# 변경 감지용 id 구간 크기 (food_recommend의 FOOD_CATALOG_BUCKET_SIZE와 같아야 체크섬을 재사용)
+BUCKET_SIZE = int(os.getenv('FOOD_CATALOG_BUCKET_SIZE', 1000))
+
+# food_recommend/service.py의 변경 감지 쿼리와 같은 행 체크섬
+FOOD_ROW_CHECKSUM = "CRC32(CONCAT_WS('|', id, name, calories, category, source_name))"
+NUTRIENT_ROW_CHECKSUM = "CRC32(CONCAT_WS('|', food_id, nutrient_id, value))"
+
+
+def encode_strings(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """문자열 목록을 (UTF-8 바이트, 시작 위치) 배열로 변환 (None은 빈 문자열)"""
+    encoded = [(v or '').encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def encode_labels(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """문자열 열을 사전 + 행별 코드로 변환 (같은 값은 한 번만 저장, None은 코드 -1)"""
+    labels: Dict[str, int] = {}
+    codes = np.fromiter(
+        (-1 if v is None else labels.setdefault(v, len(labels)) for v in values), dtype=np.int32, count=len(values)
+    )
+    blob, offsets = encode_strings(list(labels))
+    return blob, offsets, codes
+
+
+def fetch_catalog(bucket_size: int) -> Dict:
+    """카탈로그 테이블과 변경 감지용 체크섬을 일관된 시점으로 조회"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+            cursor.execute("""
+                SELECT id, name, calories, category, source_name
+                FROM foods
+                WHERE calories IS NOT NULL AND calories > 0
+                ORDER BY id
+            """)
+            foods = cursor.fetchall()
+            cursor.execute("SELECT id, name FROM nutrients ORDER BY id")
+            nutrients = cursor.fetchall()
+            cursor.execute("SELECT food_id, nutrient_id, value FROM food_nutrients")
+            food_nutrients = cursor.fetchall()
+
+            cursor.execute(f"""
+                SELECT COUNT(*) AS row_count, COALESCE(MAX(id), 0) AS max_id,
+                       BIT_XOR({FOOD_ROW_CHECKSUM}) AS checksum
+                FROM foods
+                WHERE calories IS NOT NULL AND calories > 0
+            """)
+            food_probe = cursor.fetchone()
+            cursor.execute(f"""
+                SELECT COUNT(*) AS row_count, BIT_XOR({NUTRIENT_ROW_CHECKSUM}) AS checksum
+                FROM food_nutrients
+            """)
+            nutrient_probe = cursor.fetchone()
+            cursor.execute(f"""
+                SELECT id DIV %s AS bucket, COUNT(*) AS row_count, BIT_XOR({FOOD_ROW_CHECKSUM}) AS checksum
+                FROM foods
+                WHERE calories IS NOT NULL AND calories > 0
+                GROUP BY bucket
+            """, (bucket_size,))
+            food_buckets = {r['bucket']: (r['row_count'], r['checksum']) for r in cursor.fetchall()}
+            cursor.execute(f"""
+                SELECT food_id DIV %s AS bucket, COUNT(*) AS row_count, BIT_XOR({NUTRIENT_ROW_CHECKSUM}) AS checksum
+                FROM food_nutrients
+                GROUP BY bucket
+            """, (bucket_size,))
+            nutrient_buckets = {r['bucket']: (r['row_count'], r['checksum']) for r in cursor.fetchall()}
+        conn.commit()
+    finally:
+        conn.close()
+
+    buckets = [
+        (int(b),) + food_buckets.get(b, (0, 0)) + nutrient_buckets.get(b, (0, 0))
+        for b in sorted(food_buckets.keys() | nutrient_buckets.keys())
+    ]
+    return {
+        "foods": foods,
+        "nutrients": nutrients,
+        "food_nutrients": food_nutrients,
+        "probe": [food_probe['row_count'], food_probe['max_id'], food_probe['checksum'],
+                  nutrient_probe['row_count'], nutrient_probe['checksum']],
+        "buckets": buckets,
+    }
+
+
+def build_arrays(data: Dict, version: str, bucket_size: int) -> Dict[str, np.ndarray]:
+    """조회 결과를 .npz에 저장할 컬럼 배열로 변환 (object 배열 없이 pickle 불필요)"""
+    foods: List[Dict] = data["foods"]
+    nutrients: List[Dict] = data["nutrients"]
+    food_nutrients: List[Dict] = data["food_nutrients"]
+
+    name_blob, name_offsets, name_codes = encode_labels([f['name'] for f in foods])
+    category_blob, category_offsets, category_codes = encode_labels([f.get('category') for f in foods])
+    portion_blob, portion_offsets, portion_codes = encode_labels([f.get('source_name') for f in foods])
+    nutrient_name_blob, nutrient_name_offsets = encode_strings([n['name'] for n in nutrients])
+
+    meta = {
+        "schema_version": SCHEMA_VERSION,
+        "version": version,
+        "exported_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "counts": {"foods": len(foods), "nutrients": len(nutrients), "food_nutrients": len(food_nutrients)},
+        "bucket_size": bucket_size,
+        "probe": [int(v) for v in data["probe"]],
+    }
+    return {
+        "meta": np.frombuffer(json.dumps(meta, ensure_ascii=False).encode('utf-8'), dtype=np.uint8),
+        "foods_id": np.fromiter((f['id'] for f in foods), dtype=np.int64, count=len(foods)),
+        "foods_calories": np.fromiter((int(f['calories']) for f in foods), dtype=np.int32, count=len(foods)),
+        "foods_name_blob": name_blob,
+        "foods_name_offsets": name_offsets,
+        "foods_name_codes": name_codes,
+        "foods_category_blob": category_blob,
+        "foods_category_offsets": category_offsets,
+        "foods_category_codes": category_codes,
+        "foods_source_name_blob": portion_blob,
+        "foods_source_name_offsets": portion_offsets,
+        "foods_source_name_codes": portion_codes,
+        "nutrients_id": np.fromiter((n['id'] for n in nutrients), dtype=np.int64, count=len(nutrients)),
+        "nutrients_name_blob": nutrient_name_blob,
+        "nutrients_name_offsets": nutrient_name_offsets,
+        "food_nutrients_food_id": np.fromiter(
+            (r['food_id'] for r in food_nutrients), dtype=np.int64, count=len(food_nutrients)
+        ),
+        "food_nutrients_nutrient_id": np.fromiter(
+            (r['nutrient_id'] for r in food_nutrients), dtype=np.int64, count=len(food_nutrients)
+        ),
+        "food_nutrients_value": np.fromiter(
+            (float(r['value']) if r['value'] is not None else np.nan for r in food_nutrients),
+            dtype=np.float64, count=len(food_nutrients)
+        ),
+        "buckets": np.asarray(data["buckets"], dtype=np.int64).reshape(-1, 5),
+    }
+
+
+def export_snapshot(output_dir: str, bucket_size: int = BUCKET_SIZE) -> str:
+    """스냅샷을 output_dir/catalog-<버전>.npz로 저장하고 경로 반환"""
+    version = time.strftime('%Y%m%d%H%M%S')
+    data = fetch_catalog(bucket_size)
+    arrays = build_arrays(data, version, bucket_size)
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"catalog-{version}.npz")
+    tmp_path = f"{path}.tmp.npz"
+    # 압축하지 않아야 기동 시 로드가 빠름
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="음식 카탈로그 스냅샷(.npz) 내보내기")
+    parser.add_argument('--output-dir', default='snapshots')
+    parser.add_argument('--bucket-size', type=int, default=BUCKET_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    path = export_snapshot(args.output_dir, args.bucket_size)
+    print(f"💾 스냅샷 저장: {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MiB, "
+          f"{time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from db_connection import get_connection
+from db_connection import get_connection, pool_metrics
 
 TABLES = [
     "food_nutrients",
@@ -29,3 +29,4 @@ def print_table_rows(table_name, limit=5):
 if __name__ == "__main__":
     for table in TABLES:
         print_table_rows(table, 5)
+    print(f"\n🔌 커넥션 풀: {pool_metrics()}")
@@ -1,13 +1,45 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from models import RecommendRequest, RecommendResponse
-from service import generate_food_recommendation
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from models import (
+    RecommendRequest, RecommendResponse, MultiDayRecommendRequest, MultiDayRecommendResponse,
+    SubstituteRequest, SubstituteResponse
+)
+from service import (
+    FoodNotFoundError, generate_food_recommendation, generate_multi_day_recommendation, generate_substitutes,
+    catalog_cache, recommendation_cache, meal_template_store
+)
+from batch import shutdown_executor, stream_batch_recommendations
+from meal_templates import template_exhausted, template_rejected, template_served
+from db_connection import get_pool, pool_metrics
+from metrics import (
+    SERVER_TIMING_ENABLED, end_request_timing, render_prometheus, server_timing_header, start_request_timing
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # DB 연결을 DB_POOL_MIN_SIZE개 미리 만들어 둠 (실패해도 첫 조회 때 다시 연결)
+    try:
+        get_pool().warm()
+    except Exception as e:
+        print(f"⚠️  DB 커넥션 풀 미리 연결 실패: {e}")
+    # 시작 시 카탈로그를 미리 로드하고 백그라운드 갱신 시작
+    catalog_cache.start()
+    yield
+    shutdown_executor()
+    catalog_cache.stop()
+    get_pool().close()
+
 
 app = FastAPI(
     title="Food Recommendation API",
     description="임산부를 위한 식단 추천 API",
     version="1.0.0",
-    root_path="/api/food"
+    root_path="/api/food",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -17,9 +49,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
 
+if SERVER_TIMING_ENABLED:
+    @app.middleware("http")
+    async def add_server_timing(request: Request, call_next):
+        """요청 처리 단계별 소요 시간을 Server-Timing 헤더로 추가"""
+        token = start_request_timing()
+        try:
+            response = await call_next(request)
+        finally:
+            timings = end_request_timing(token)
+        # 스트리밍 응답은 헤더가 먼저 나가므로 그 전에 끝난 단계만 포함됨
+        if timings:
+            response.headers["Server-Timing"] = server_timing_header(timings)
+        return response
+
+
 @app.get("/")
 def root():
     return {"message": "Food Recommendation API"}
@@ -30,6 +78,44 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/catalog/stats")
+def catalog_stats():
+    """음식 카탈로그 캐시 적중/갱신 통계"""
+    return catalog_cache.stats()
+
+
+@app.get("/recommend/cache/stats")
+def recommend_cache_stats():
+    """조건별 추천 결과 캐시 통계"""
+    return recommendation_cache.stats()
+
+
+@app.get("/recommend/templates/stats")
+def recommend_template_stats():
+    """끼니 조합 템플릿 사용 통계"""
+    if meal_template_store is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        **meal_template_store.stats(),
+        "served": template_served.value,
+        "rejected": template_rejected.value,
+        "exhausted": template_exhausted.value,
+    }
+
+
+@app.get("/db/pool/stats")
+def db_pool_stats():
+    """DB 커넥션 풀 체크아웃/대기 시간 통계"""
+    return pool_metrics()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """단계별 소요 시간 히스토그램 (Prometheus text format)"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/api/v1/recommend", response_model=RecommendResponse)
 def recommend_food(request: RecommendRequest):
     """
@@ -37,3 +123,34 @@ def recommend_food(request: RecommendRequest):
     """
     return generate_food_recommendation(request)
 
+
+@app.post("/api/v1/recommend/plan", response_model=MultiDayRecommendResponse)
+def recommend_food_plan(request: MultiDayRecommendRequest):
+    """
+    여러 날(days, 기본 7일) 추천 식단을 한 번에 제공하는 엔드포인트
+    """
+    return generate_multi_day_recommendation(request)
+
+
+@app.post("/api/v1/recommend/substitute", response_model=SubstituteResponse)
+def recommend_substitute(request: SubstituteRequest):
+    """
+    식단의 음식 하나(foodId)를 대신할 비슷한 음식 k개를 제공하는 엔드포인트
+
+    알레르기/식단/건강 상태 조건은 식단 추천과 동일하게 적용된다.
+    """
+    try:
+        return generate_substitutes(request)
+    except FoodNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.post("/api/v1/recommend/batch")
+async def recommend_food_batch(requests: List[RecommendRequest]):
+    """
+    여러 유저의 추천 식단을 한 번에 생성하는 엔드포인트
+
+    같은 카탈로그 스냅샷을 공유하는 워커 프로세스에서 처리하며,
+    완료되는 순서대로 BatchRecommendItem을 NDJSON 한 줄씩 스트리밍한다 (index = 요청 순번).
+    """
+    return StreamingResponse(stream_batch_recommendations(requests), media_type="application/x-ndjson")
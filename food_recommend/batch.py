@@ -0,0 +1,162 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from catalog import CatalogSnapshot
+from catalog_file import CatalogFile
+from models import BatchRecommendItem, RecommendRequest
+from service import catalog_cache, generate_food_recommendation, profile_key, profile_mask
+
+
+# 배치 추천 워커 프로세스 수 (0이면 API 프로세스의 스레드에서 처리, 워커마다 카탈로그 사본을 가지므로 기본은 최대 4개)
+BATCH_WORKERS = int(os.getenv('RECOMMEND_BATCH_WORKERS', min(4, os.cpu_count() or 1)))
+
+# 워커에 한 번에 넘길 요청 수 (같은 조건의 요청끼리 묶음)
+BATCH_CHUNK_SIZE = int(os.getenv('RECOMMEND_BATCH_CHUNK_SIZE', 32))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_version = 0
+_executor_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+# 워커 프로세스에 한 번만 전달되는 카탈로그 스냅샷
+_worker_snapshot: Optional[CatalogSnapshot] = None
+
+
+def _init_worker(snapshot: Optional[CatalogSnapshot], path: str = '', version: int = 0):
+    """워커 시작 시 스냅샷 설정 (path가 있으면 배열을 pickle로 받지 않고 파일에서 직접 읽음)"""
+    global _worker_snapshot
+    if path:
+        catalog = CatalogFile(path)
+        snapshot = CatalogSnapshot.from_parts(version, catalog.table, catalog.nutrients)
+    _worker_snapshot = snapshot
+
+
+def _warm_up() -> bool:
+    return _worker_snapshot is not None
+
+
+def recommend_chunk(chunk: List[Tuple[int, RecommendRequest]],
+                    snapshot: Optional[CatalogSnapshot] = None) -> List[str]:
+    """같은 조건의 요청 묶음을 처리하여 NDJSON 줄 목록 반환 (조건별 필터는 한 번만 계산)"""
+    snapshot = snapshot or _worker_snapshot
+    base_masks: Dict[Tuple, object] = {}
+    lines = []
+    for index, request in chunk:
+        key = profile_key(request)
+        if key not in base_masks:
+            base_masks[key] = profile_mask(snapshot, request)
+        try:
+            response = generate_food_recommendation(request, snapshot, base_masks[key])
+            item = BatchRecommendItem(index=index, **response.model_dump())
+        except Exception as e:
+            item = _error_item(index, e)
+        lines.append(item.model_dump_json())
+    return lines
+
+
+def _error_item(index: int, error: Exception) -> BatchRecommendItem:
+    return BatchRecommendItem(
+        index=index,
+        isSuccess=False,
+        code="MEALPLAN_500",
+        message=f"식단 생성 중 오류 발생: {str(error)}"
+    )
+
+
+def chunk_requests(requests: List[RecommendRequest]) -> List[List[Tuple[int, RecommendRequest]]]:
+    """요청을 조건(profile_key)별로 묶어 BATCH_CHUNK_SIZE 단위로 분할 (원래 순번 유지)"""
+    groups: Dict[Tuple, List[Tuple[int, RecommendRequest]]] = {}
+    for index, request in enumerate(requests):
+        groups.setdefault(profile_key(request), []).append((index, request))
+
+    chunks = []
+    for group in groups.values():
+        for start in range(0, len(group), BATCH_CHUNK_SIZE):
+            chunks.append(group[start:start + BATCH_CHUNK_SIZE])
+    return chunks
+
+
+def _build_executor(snapshot: CatalogSnapshot) -> ProcessPoolExecutor:
+    """스냅샷을 넘긴 프로세스 풀을 만들고 워커를 모두 띄워 둠 (요청 경로에서 프로세스를 만들지 않도록)"""
+    if snapshot.source_path:
+        initargs = (None, snapshot.source_path, snapshot.version)
+    else:
+        initargs = (snapshot,)
+    # API 프로세스의 스레드 상태를 물려받지 않도록 spawn 사용
+    executor = ProcessPoolExecutor(
+        max_workers=BATCH_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=initargs
+    )
+    for future in [executor.submit(_warm_up) for _ in range(BATCH_WORKERS)]:
+        future.result()
+    return executor
+
+
+def get_executor(snapshot: CatalogSnapshot) -> Executor:
+    """
+    snapshot 이상 버전의 프로세스 풀 (첫 배치 요청 때 생성)
+
+    카탈로그가 갱신되면 기존 풀은 버전이 낮아 stale로 보고, 다음 배치 요청에서 새 풀로 교체한다.
+    배치 요청이 없으면 갱신돼도 워커를 띄우지 않는다.
+    프로세스 생성이 이벤트 루프를 막지 않도록 스레드에서 호출해야 한다.
+    """
+    global _executor, _executor_version
+    with _executor_lock:
+        if _executor is not None and _executor_version >= snapshot.version:
+            return _executor
+    # 동시에 들어온 요청이 풀을 여러 개 만들지 않도록 생성은 하나씩
+    with _build_lock:
+        with _executor_lock:
+            if _executor is not None and _executor_version >= snapshot.version:
+                return _executor
+        executor = _build_executor(snapshot)
+        with _executor_lock:
+            previous, _executor, _executor_version = _executor, executor, snapshot.version
+    # 이전 풀은 진행 중인 작업을 마친 뒤 종료
+    if previous is not None:
+        previous.shutdown(wait=False)
+    print(f"🔄 배치 추천 워커 {BATCH_WORKERS}개 준비 (카탈로그 버전 {snapshot.version})")
+    return executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+async def stream_batch_recommendations(requests: List[RecommendRequest]) -> AsyncIterator[str]:
+    """배치 요청을 워커에 나눠 처리하고 끝나는 순서대로 NDJSON 줄을 반환"""
+    snapshot = await asyncio.to_thread(catalog_cache.get_snapshot)
+    chunks = chunk_requests(requests)
+
+    if BATCH_WORKERS > 0:
+        loop = asyncio.get_running_loop()
+        executor = await asyncio.to_thread(get_executor, snapshot)
+        pending = {loop.run_in_executor(executor, recommend_chunk, chunk): chunk for chunk in chunks}
+    else:
+        pending = {asyncio.ensure_future(asyncio.to_thread(recommend_chunk, chunk, snapshot)): chunk for chunk in chunks}
+
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                try:
+                    lines = future.result()
+                except Exception as e:
+                    lines = [_error_item(index, e).model_dump_json() for index, _ in chunk]
+                for line in lines:
+                    yield line + "\n"
+    finally:
+        # 클라이언트가 끊긴 경우 남은 작업 취소
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,321 @@
+"""
+식단 추천 파이프라인 벤치마크
+
+DB 없이 합성 음식 카탈로그(1천~50만 건)로 만든 스냅샷을 각 단계 함수에 직접 넘기고,
+단계별 지연 시간 분위수, 메모리 할당, 처리량을 측정하여 릴리스 간 비교할 수 있는 JSON으로 저장한다.
+
+    python benchmark.py run --sizes 1000 10000 100000 --iterations 200
+    python benchmark.py compare bench_results/old.json bench_results/new.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+import service
+from catalog import CatalogSnapshot, FoodCatalogCache
+from meal_solver import CalorieSortedRows
+from food_table import SIDE
+from models import FoodHistory, RecommendRequest
+
+
+# 카테고리별 (음식명 접미사, 칼로리 범위)
+SYNTHETIC_CATEGORIES = {
+    '밥류': (['밥', '비빔밥', '볶음밥', '덮밥', '죽'], (150, 450)),
+    '국 및 탕류': (['국', '탕', '냉국'], (40, 250)),
+    '찌개 및 전골류': (['찌개', '전골'], (80, 300)),
+    '구이류': (['구이', '스테이크'], (120, 400)),
+    '볶음류': (['볶음', '두루치기'], (90, 350)),
+    '나물·숙채류': (['나물', '무침'], (20, 120)),
+    '조림류': (['조림', '장조림'], (60, 250)),
+    '김치류': (['김치', '깍두기', '겉절이'], (10, 60)),
+    '전·적 및 부침류': (['전', '부침개'], (120, 350)),
+}
+SYNTHETIC_INGREDIENTS = [
+    '김치', '된장', '순두부', '미역', '소고기', '돼지고기', '닭', '오리', '두부', '콩나물', '시금치',
+    '멸치', '고등어', '갈치', '계란', '감자', '애호박', '버섯', '우엉', '연근', '무', '배추', '어묵',
+    '새우', '오징어', '낙지', '참치', '땅콩', '호두', '잡곡', '현미', '보리', '흑미', '콩', '팥',
+]
+SYNTHETIC_VARIANTS = ['', '', '', '(돼지고기)', '(소고기)', '(해물)', '(매운맛)', '(저염)']
+SYNTHETIC_PORTIONS = ['100g', '1인분', '1공기', '1그릇', '1접시']
+
+# 요청 조건 분포
+ALLERGY_CHOICES = ['땅콩', '우유', '계란', '새우', '밀', '대두', '고등어', '호두']
+DIET_CHOICES = ['채식', '저염식', '저당식']
+HEALTH_CHOICES = ['고혈압', '임신성 당뇨']
+
+
+def generate_synthetic_foods(size: int, seed: int = 0) -> List[Dict]:
+    """foods 테이블 형태의 합성 카탈로그"""
+    rng = random.Random(seed)
+    categories = list(SYNTHETIC_CATEGORIES.items())
+    foods = []
+    for food_id in range(1, size + 1):
+        category, (suffixes, (low, high)) = rng.choice(categories)
+        name = rng.choice(SYNTHETIC_INGREDIENTS)
+        if rng.random() < 0.4:
+            name += rng.choice(SYNTHETIC_INGREDIENTS)
+        name += rng.choice(suffixes) + rng.choice(SYNTHETIC_VARIANTS)
+        foods.append({
+            'id': food_id,
+            'name': name,
+            'calories': rng.randint(low, high),
+            'category': category,
+            'source_name': rng.choice(SYNTHETIC_PORTIONS),
+        })
+    return foods
+
+
+def generate_synthetic_nutrients(foods: List[Dict], seed: int = 0) -> List[Dict]:
+    """food_nutrients JOIN nutrients 형태의 합성 영양소 (일부 누락 포함)"""
+    rng = random.Random(seed + 1)
+    rows = []
+    for food in foods:
+        for nutrient, high in (('SODIUM', 2000.0), ('SUGARS', 40.0), ('PROTEINS', 40.0)):
+            if rng.random() < 0.9:
+                rows.append({'food_id': food['id'], 'nutrient_name': nutrient, 'value': rng.uniform(0, high)})
+    return rows
+
+
+def generate_requests(foods: List[Dict], count: int, seed: int = 0) -> List[RecommendRequest]:
+    """알레르기/식단/건강 상태/섭취 이력이 섞인 요청 목록"""
+    rng = random.Random(seed + 2)
+    now = datetime.now()
+    requests = []
+    for _ in range(count):
+        history = [
+            FoodHistory(mealType='LUNCH', foodName=rng.choice(foods)['name'], intakePercent=100, createdAt=now)
+            for _ in range(rng.randint(0, 10))
+        ]
+        requests.append(RecommendRequest(
+            user={'birthDate': '1995-01-01', 'dueDate': '2026-12-01'},
+            allergies=rng.sample(ALLERGY_CHOICES, rng.randint(0, 2)),
+            diets=rng.sample(DIET_CHOICES, rng.randint(0, 1)),
+            healths=rng.sample(HEALTH_CHOICES, rng.randint(0, 1)),
+            foodHistory=history,
+        ))
+    return requests
+
+
+class StageRecorder:
+    """단계별 소요 시간(ns) 또는 최대 메모리 할당(byte) 기록"""
+
+    def __init__(self, trace_alloc: bool = False):
+        self.trace_alloc = trace_alloc
+        self.samples: Dict[str, List[int]] = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.trace_alloc:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            yield
+            self.samples[name].append(tracemalloc.get_traced_memory()[1] - base)
+        else:
+            started = time.perf_counter_ns()
+            yield
+            self.samples[name].append(time.perf_counter_ns() - started)
+
+
+def run_list_pipeline(recorder: StageRecorder, snapshot: CatalogSnapshot, foods: List[Dict],
+                      request: RecommendRequest):
+    """
+    리스트 기반 단계 함수 (filter_by_* / categorize_foods / select_meal_items)
+
+    비교 기준선이므로 filter_by_*에는 스냅샷 키워드 인덱스를 넘기지 않고 요청마다 키워드를 매칭한다.
+    """
+    with recorder.stage('filter_by_allergies'):
+        filtered = service.filter_by_allergies(foods, request.allergies)
+    with recorder.stage('filter_by_diet'):
+        filtered = service.filter_by_diet(filtered, request.diets)
+    with recorder.stage('exclude_recent_foods'):
+        filtered = service.exclude_recent_foods(filtered, request.foodHistory, snapshot)
+    with recorder.stage('categorize_foods'):
+        categorized = service.categorize_foods(filtered)
+    for target_kcal in (500, 600, 550):
+        with recorder.stage('select_meal_items'):
+            service.select_meal_items(categorized, target_kcal)
+
+
+def run_columnar_pipeline(recorder: StageRecorder, snapshot: CatalogSnapshot, request: RecommendRequest):
+    """실제 요청 경로 (mask 필터 / 카테고리 분할 / 칼로리 구간 solver)"""
+    table = snapshot.table
+    with recorder.stage('mask_by_allergies'):
+        mask = service.mask_by_allergies(table.all_rows_mask(), snapshot, request.allergies)
+    with recorder.stage('mask_by_health'):
+        service.mask_by_health(mask, snapshot, request.healths)
+    with recorder.stage('mask_by_diet'):
+        service.mask_by_diet(mask, snapshot, request.diets)
+    with recorder.stage('mask_recent_foods'):
+        service.mask_recent_foods(mask, snapshot, request.foodHistory)
+    with recorder.stage('partition'):
+        partition = service.rank_by_diet(table.partition(mask), snapshot, request.diets)
+    with recorder.stage('select_day_meals'):
+        meals = service.select_day_meals(table, partition, CalorieSortedRows(table, partition[SIDE]), set())
+    with recorder.stage('build_result'):
+        service.build_result(table, meals, datetime.now().date())
+
+
+def summarize(samples: Dict[str, List[int]], scale: float) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    for name, values in samples.items():
+        values = np.asarray(values, dtype=np.float64) / scale
+        summary[name] = {
+            'count': int(len(values)),
+            'mean': round(float(values.mean()), 4),
+            'p50': round(float(np.percentile(values, 50)), 4),
+            'p95': round(float(np.percentile(values, 95)), 4),
+            'p99': round(float(np.percentile(values, 99)), 4),
+            'max': round(float(values.max()), 4),
+        }
+    return summary
+
+
+def benchmark_size(size: int, iterations: int, alloc_iterations: int, seed: int) -> Dict:
+    foods = generate_synthetic_foods(size, seed)
+    food_nutrients = generate_synthetic_nutrients(foods, seed)
+    requests = generate_requests(foods, iterations, seed)
+
+    # fetch_foods_from_db 대신 합성 카탈로그를 로드하는 캐시 (전역 캐시는 건드리지 않고 스냅샷을 직접 전달)
+    cache = FoodCatalogCache(loader=lambda: foods, nutrient_loader=lambda: food_nutrients, ttl_seconds=0)
+    started = time.perf_counter()
+    snapshot = cache.refresh()
+    snapshot_ms = (time.perf_counter() - started) * 1000
+
+    table = snapshot.table
+    table_bytes = sum(a.nbytes for a in (
+        table.ids, table.calories, table.name_code, table.category_label_code,
+        table.portion_code, table.category_code, snapshot.nutrients.values,
+    ))
+
+    timings = StageRecorder()
+    for request in requests:
+        run_list_pipeline(timings, snapshot, foods, request)
+        run_columnar_pipeline(timings, snapshot, request)
+
+    # 처리량: 전체 generate_food_recommendation 반복
+    e2e = StageRecorder()
+    started = time.perf_counter()
+    for request in requests:
+        with e2e.stage('generate_food_recommendation'):
+            service.generate_food_recommendation(request, snapshot)
+    throughput = len(requests) / (time.perf_counter() - started)
+
+    # 메모리 할당은 tracemalloc 오버헤드 때문에 따로 측정
+    allocations = StageRecorder(trace_alloc=True)
+    tracemalloc.start()
+    try:
+        for request in requests[:alloc_iterations]:
+            run_list_pipeline(allocations, snapshot, foods, request)
+            run_columnar_pipeline(allocations, snapshot, request)
+            with allocations.stage('generate_food_recommendation'):
+                service.generate_food_recommendation(request, snapshot)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'catalog': {
+            'foods': size,
+            'snapshot_build_ms': round(snapshot_ms, 2),
+            'table_bytes': int(table_bytes),
+        },
+        'latency_ms': {**summarize(timings.samples, 1e6), **summarize(e2e.samples, 1e6)},
+        'alloc_peak_kb': summarize(allocations.samples, 1024),
+        'throughput_rps': round(throughput, 2),
+    }
+
+
+def run(args) -> Dict:
+    random.seed(args.seed)
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'iterations': args.iterations,
+            'seed': args.seed,
+        },
+        'results': {},
+    }
+    for size in args.sizes:
+        print(f"▶ {size:,}개 음식 카탈로그 측정 중...", file=sys.stderr)
+        report['results'][str(size)] = benchmark_size(size, args.iterations, args.alloc_iterations, args.seed)
+        print_size_report(size, report['results'][str(size)])
+
+    output = args.output or os.path.join(
+        'bench_results', f"benchmark-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"💾 결과 저장: {output}", file=sys.stderr)
+    return report
+
+
+def print_size_report(size: int, result: Dict):
+    print(f"\n📊 foods={size:,}  throughput={result['throughput_rps']} req/s  "
+          f"snapshot={result['catalog']['snapshot_build_ms']}ms  table={result['catalog']['table_bytes'] / 1024:.0f}KB")
+    print(f"  {'stage':<30}{'p50':>10}{'p95':>10}{'p99':>10}{'alloc(KB)':>12}")
+    for name, stats in result['latency_ms'].items():
+        alloc = result['alloc_peak_kb'].get(name, {}).get('mean', float('nan'))
+        print(f"  {name:<30}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}{alloc:>12.1f}")
+
+
+def compare(args):
+    """두 결과 파일의 단계별 p50/p95 변화율 출력"""
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding='utf-8') as f:
+        candidate = json.load(f)
+
+    for size, result in candidate['results'].items():
+        base = baseline['results'].get(size)
+        if base is None:
+            continue
+        print(f"\n📊 foods={int(size):,}  throughput {base['throughput_rps']} → {result['throughput_rps']} req/s")
+        print(f"  {'stage':<30}{'p50 (ms)':>22}{'p95 (ms)':>22}")
+        for name, stats in result['latency_ms'].items():
+            old = base['latency_ms'].get(name)
+            if old is None:
+                continue
+            cells = []
+            for q in ('p50', 'p95'):
+                change = (stats[q] - old[q]) / old[q] * 100 if old[q] else 0.0
+                cells.append(f"{old[q]:.3f}→{stats[q]:.3f} ({change:+.0f}%)")
+            print(f"  {name:<30}{cells[0]:>22}{cells[1]:>22}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="식단 추천 파이프라인 벤치마크")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="합성 카탈로그로 단계별 성능 측정")
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 500000])
+    run_parser.add_argument('--iterations', type=int, default=200)
+    run_parser.add_argument('--alloc-iterations', type=int, default=20)
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--output', help="결과 JSON 경로 (기본: bench_results/benchmark-<시각>.json)")
+
+    compare_parser = sub.add_parser('compare', help="두 결과 JSON 비교")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from catalog_file import CatalogFile
+from food_table import FoodTable
+from keyword_index import KeywordIndex
+from name_index import NameMatchIndex
+from nutrition import NutrientMatrix
+from similarity import FoodVectorIndex
+
+
+# 카탈로그 갱신 주기 (초)
+CATALOG_TTL_SECONDS = float(os.getenv('FOOD_CATALOG_TTL_SECONDS', 300))
+
+# 변경 감지용 id 구간 크기 (구간별 체크섬을 비교해 바뀐 구간만 다시 조회)
+CATALOG_BUCKET_SIZE = int(os.getenv('FOOD_CATALOG_BUCKET_SIZE', 1000))
+
+# 기동 시 DB 대신 먼저 읽을 카탈로그 스냅샷 파일 (db_example/export_catalog_snapshot.py로 생성)
+CATALOG_SNAPSHOT_PATH = os.getenv('FOOD_CATALOG_SNAPSHOT_PATH', '')
+
+# 바뀐 구간이 이 비율을 넘으면 부분 갱신 대신 전체 재로드
+INCREMENTAL_MAX_FRACTION = 0.5
+
+
+class CatalogChangeSource(ABC):
+    """
+    카탈로그 변경 감지/부분 조회 인터페이스
+
+    probe()는 카탈로그 전체를 요약하는 값(행 수, 최대 id, 체크섬 등)을 돌려주고,
+    bucket_checksums()는 id // bucket_size 구간별 요약 값을 돌려준다.
+    요약 값이 같으면 해당 구간은 바뀌지 않은 것으로 본다.
+    """
+
+    @abstractmethod
+    def probe(self) -> Tuple:
+        ...
+
+    @abstractmethod
+    def bucket_checksums(self, bucket_size: int) -> Dict[int, Tuple]:
+        ...
+
+    @abstractmethod
+    def fetch_foods(self, ranges: Sequence[Tuple[int, int]]) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def fetch_food_nutrients(self, ranges: Sequence[Tuple[int, int]]) -> List[Dict]:
+        ...
+
+
+def bucket_ranges(buckets: Sequence[int], bucket_size: int) -> List[Tuple[int, int]]:
+    """구간 번호 목록을 이어지는 구간끼리 합친 id 범위 [low, high] 목록으로 변환"""
+    ranges: List[Tuple[int, int]] = []
+    for bucket in sorted(buckets):
+        low, high = bucket * bucket_size, (bucket + 1) * bucket_size - 1
+        if ranges and ranges[-1][1] + 1 == low:
+            ranges[-1] = (ranges[-1][0], high)
+        else:
+            ranges.append((low, high))
+    return ranges
+
+
+class CatalogSnapshot:
+    """특정 시점의 음식 카탈로그 (요청 처리 중에는 변경되지 않음)"""
+
+    def __init__(self, version: int, foods: List[Dict], food_nutrients: Sequence[Dict] = ()):
+        self.version = version
+        # dict 목록 대신 컬럼 형태로 보관
+        self.table = FoodTable(foods)
+        # 알레르기/채식 키워드 매칭용 인덱스 (스냅샷마다 한 번 생성)
+        self.keyword_index = KeywordIndex.from_codes(self.table.names.values, self.table.name_code, self.table.ids)
+        # 건강 상태/식단 규칙용 영양소 행렬
+        self.nutrients = NutrientMatrix(self.table, food_nutrients)
+        self._vector_index: Optional[FoodVectorIndex] = None
+        self._name_index: Optional[NameMatchIndex] = None
+        # 스냅샷 파일을 그대로 읽은 경우 그 경로 (DB 변경이 반영되면 None)
+        self.source_path: Optional[str] = None
+        self.loaded_at = time.time()
+
+    @property
+    def foods(self) -> List[Dict]:
+        """dict 목록 형태의 카탈로그 (리스트 기반 함수 호환용, 호출마다 새로 생성)"""
+        return self.table.to_dicts()
+
+    def age_seconds(self) -> float:
+        return time.time() - self.loaded_at
+
+    @property
+    def name_index(self) -> NameMatchIndex:
+        """최근 섭취 음식명 유사 매칭용 bigram 역색인 (캐시가 교체 전에 미리 생성)"""
+        if self._name_index is None:
+            self._name_index = NameMatchIndex(self.table.row_names())
+        return self._name_index
+
+    def name_index_stats(self) -> Optional[Dict]:
+        """name_index 통계 (아직 만들지 않았으면 만들지 않고 None)"""
+        index = self._name_index
+        return index.stats() if index is not None else None
+
+    @property
+    def vector_index(self) -> FoodVectorIndex:
+        """대체 음식 검색용 벡터 인덱스 (캐시가 교체 전에 미리 생성)"""
+        if self._vector_index is None:
+            self._vector_index = FoodVectorIndex(self.table, self.nutrients)
+        return self._vector_index
+
+    @classmethod
+    def from_parts(cls, version: int, table: FoodTable, nutrients: NutrientMatrix,
+                   keyword_index: Optional[KeywordIndex] = None) -> "CatalogSnapshot":
+        """이미 만든 테이블/영양소 행렬(/키워드 인덱스)로 스냅샷 생성"""
+        snapshot = cls.__new__(cls)
+        snapshot.version = version
+        snapshot.table = table
+        snapshot.keyword_index = keyword_index or KeywordIndex.from_codes(table.names.values, table.name_code, table.ids)
+        snapshot.nutrients = nutrients
+        snapshot._vector_index = None
+        snapshot._name_index = None
+        snapshot.source_path = None
+        snapshot.loaded_at = time.time()
+        return snapshot
+
+    def apply_changes(self, version: int, ranges: Sequence[Tuple[int, int]], foods: List[Dict],
+                      food_nutrients: Sequence[Dict] = ()) -> "CatalogSnapshot":
+        """
+        id 구간 ranges의 행을 foods로 교체한 새 스냅샷 (copy-on-write)
+
+        자신은 변경하지 않으므로 이 스냅샷으로 처리 중인 요청은 끝까지 같은 데이터를 본다.
+        컬럼/카테고리 분할, 키워드 인덱스 결과, 영양소 행렬은 유지된 행을 그대로 옮겨 쓴다.
+        """
+        table, kept_rows = self.table.replace_ranges(ranges, foods)
+        return CatalogSnapshot.from_parts(
+            version, table,
+            self.nutrients.patched(table, kept_rows, food_nutrients),
+            self.keyword_index.patched(table.row_names(), table.ids, kept_rows),
+        )
+
+
+class FoodCatalogCache:
+    """
+    프로세스 전역 음식 카탈로그 캐시
+
+    시작 시 한 번 로드한 뒤 모든 요청은 메모리의 스냅샷을 사용하고,
+    TTL마다 백그라운드 스레드가 새 스냅샷으로 교체한다.
+    change_source가 있으면 먼저 probe로 변경 여부를 확인하고, 바뀐 id 구간만 다시 읽어
+    이전 스냅샷에서 파생한 새 스냅샷을 만든다.
+    snapshot_path가 있으면 DB 대신 스냅샷 파일로 먼저 기동하고, DB와는 백그라운드에서 맞춘다.
+    """
+
+    def __init__(self, loader: Callable[[], List[Dict]],
+                 nutrient_loader: Optional[Callable[[], List[Dict]]] = None,
+                 ttl_seconds: float = CATALOG_TTL_SECONDS,
+                 change_source: Optional[CatalogChangeSource] = None,
+                 bucket_size: int = CATALOG_BUCKET_SIZE,
+                 snapshot_path: str = CATALOG_SNAPSHOT_PATH):
+        self._loader = loader
+        self._nutrient_loader = nutrient_loader
+        self.ttl_seconds = ttl_seconds
+        self._source = change_source
+        self.bucket_size = max(1, bucket_size)
+        self.snapshot_path = snapshot_path
+        self._file_version: Optional[str] = None
+        self._probe: Optional[Tuple] = None
+        self._buckets: Dict[int, Tuple] = {}
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._load_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # 통계
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._refresh_failures = 0
+        self._last_refresh_ms = 0.0
+        self._last_error: Optional[str] = None
+        self._unchanged = 0
+        self._incremental_refreshes = 0
+        self._last_changed_rows = 0
+
+    def start(self):
+        """초기 로드 후 백그라운드 갱신 스레드 시작"""
+        booted_from_file = False
+        if self.snapshot_path:
+            try:
+                self.load_file(self.snapshot_path)
+                booted_from_file = True
+            except Exception as e:
+                print(f"⚠️  카탈로그 스냅샷 파일 로드 실패 (DB에서 로드): {e}")
+
+        if not booted_from_file:
+            try:
+                self.refresh()
+            except Exception as e:
+                # DB 장애 시에도 서버는 뜨고, 첫 요청 또는 다음 갱신 주기에 재시도
+                print(f"⚠️  카탈로그 초기 로드 실패: {e}")
+
+        if self._thread is None and (self.ttl_seconds > 0 or booted_from_file):
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._refresh_loop, args=(booted_from_file,), name="food-catalog-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def load_file(self, path: str) -> CatalogSnapshot:
+        """스냅샷 파일로 카탈로그 교체 (DB 조회 없음)"""
+        with self._load_lock:
+            started = time.perf_counter()
+            catalog = CatalogFile(path)
+            self._version += 1
+            snapshot = CatalogSnapshot.from_parts(self._version, catalog.table, catalog.nutrients)
+            snapshot.source_path = path
+            # 파일에 담긴 변경 감지 값을 이어받아, 이후 갱신에서 DB와 다른 구간만 다시 읽음
+            if catalog.bucket_size == self.bucket_size:
+                self._probe, self._buckets = catalog.probe, catalog.buckets
+            # refresh()와 마찬가지로 요청 경로에서 인덱스를 만들지 않도록 교체 전에 미리 생성
+            snapshot.name_index
+            snapshot.vector_index
+            self._snapshot = snapshot
+            self._file_version = catalog.version
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"📦 카탈로그 스냅샷 파일 로드: {path} (버전 {catalog.version}, "
+                  f"{len(catalog.table):,}개, {elapsed_ms:.0f}ms)")
+            return snapshot
+
+    def stop(self):
+        """백그라운드 갱신 중지"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _refresh_loop(self, reconcile_first: bool = False):
+        if reconcile_first:
+            # 파일로 기동한 경우 바로 DB와 맞춤 (실패하면 파일 스냅샷으로 계속 서비스)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  카탈로그 DB 동기화 실패 (스냅샷 파일 데이터 유지): {e}")
+        if self.ttl_seconds <= 0:
+            return
+        while not self._stop_event.wait(self.ttl_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  카탈로그 갱신 실패 (기존 스냅샷 유지): {e}")
+
+    def refresh(self) -> CatalogSnapshot:
+        """DB에서 카탈로그를 다시 읽어 스냅샷 교체 (변경이 없으면 기존 스냅샷 유지)"""
+        with self._load_lock:
+            started = time.perf_counter()
+            try:
+                snapshot = self._load()
+            except Exception as e:
+                self._refresh_failures += 1
+                self._last_error = str(e)
+                raise
+
+            # 요청 경로에서 역색인/벡터 인덱스를 만들지 않도록 교체 전에 미리 생성
+            # (변경이 없어 기존 스냅샷을 그대로 쓰면 이미 만든 인덱스를 재사용)
+            snapshot.name_index
+            snapshot.vector_index
+            # 참조 교체는 원자적이므로 진행 중인 요청은 이전 스냅샷을 그대로 사용
+            self._snapshot = snapshot
+            self._refreshes += 1
+            self._last_refresh_ms = (time.perf_counter() - started) * 1000
+            self._last_error = None
+            return snapshot
+
+    def _load(self) -> CatalogSnapshot:
+        previous = self._snapshot
+        if self._source is None:
+            return self._full_load()
+
+        probe = self._source.probe()
+        if previous is not None and probe == self._probe:
+            self._unchanged += 1
+            return previous
+
+        # 체크섬을 데이터보다 먼저 읽어, 그 사이 바뀐 구간은 다음 갱신 때 다시 조회되도록 함
+        buckets = self._source.bucket_checksums(self.bucket_size)
+        if previous is None:
+            snapshot = self._full_load()
+        else:
+            changed = [b for b in buckets.keys() | self._buckets.keys() if buckets.get(b) != self._buckets.get(b)]
+            if not changed:
+                self._unchanged += 1
+                snapshot = previous
+            elif len(changed) > max(len(buckets), 1) * INCREMENTAL_MAX_FRACTION:
+                snapshot = self._full_load()
+            else:
+                ranges = bucket_ranges(changed, self.bucket_size)
+                foods = self._source.fetch_foods(ranges)
+                food_nutrients = self._source.fetch_food_nutrients(ranges) if self._nutrient_loader else ()
+                self._version += 1
+                snapshot = previous.apply_changes(self._version, ranges, foods, food_nutrients)
+                self._incremental_refreshes += 1
+                self._last_changed_rows = len(foods)
+        self._probe = probe
+        self._buckets = buckets
+        return snapshot
+
+    def _full_load(self) -> CatalogSnapshot:
+        foods = self._loader()
+        food_nutrients = self._nutrient_loader() if self._nutrient_loader else ()
+        self._version += 1
+        self._last_changed_rows = len(foods)
+        return CatalogSnapshot(self._version, foods, food_nutrients)
+
+    def get_snapshot(self) -> CatalogSnapshot:
+        """현재 스냅샷 반환 (아직 로드되지 않았으면 동기 로드)"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            self._hits += 1
+            return snapshot
+
+        with self._load_lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            self._misses += 1
+            snapshot = self.refresh()
+        else:
+            self._hits += 1
+        return snapshot
+
+    def get_foods(self) -> List[Dict]:
+        """현재 스냅샷의 음식 목록"""
+        return self.get_snapshot().foods
+
+    def stats(self) -> Dict:
+        """캐시 적중/갱신 통계"""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else 0,
+            "snapshot_file_version": self._file_version,
+            "food_count": len(snapshot.table) if snapshot else 0,
+            "nutrients": snapshot.nutrients.names if snapshot else [],
+            "age_seconds": round(snapshot.age_seconds(), 1) if snapshot else None,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits,
+            "misses": self._misses,
+            "refreshes": self._refreshes,
+            "refresh_failures": self._refresh_failures,
+            "incremental_refreshes": self._incremental_refreshes,
+            "unchanged_probes": self._unchanged,
+            "last_changed_rows": self._last_changed_rows,
+            "last_refresh_ms": round(self._last_refresh_ms, 2),
+            "last_error": self._last_error,
+            "keyword_index": snapshot.keyword_index.stats() if snapshot else None,
+            "name_index": snapshot.name_index_stats() if snapshot else None,
+        }
@@ -0,0 +1,80 @@
+import json
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from food_table import FoodTable
+from nutrition import NutrientMatrix
+
+
+# 읽을 수 있는 스냅샷 파일 형식 버전 (db_example/export_catalog_snapshot.py가 생성)
+SCHEMA_VERSION = 1
+
+
+def decode_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """(UTF-8 바이트, 시작 위치) 배열을 문자열 목록으로 변환"""
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[start:end].decode('utf-8') for start, end in zip(bounds, bounds[1:])]
+
+
+def decode_labels(blob: np.ndarray, offsets: np.ndarray, codes: np.ndarray) -> Tuple[List[Optional[str]], np.ndarray]:
+    """사전 인코딩 열을 (값 목록, 행별 값 번호)로 변환 (코드 -1은 None)"""
+    values: List[Optional[str]] = decode_strings(blob, offsets)
+    codes = np.asarray(codes, dtype=np.intp)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(values), codes)
+        values.append(None)
+    return values, codes
+
+
+class CatalogFile:
+    """
+    카탈로그 스냅샷 파일 (.npz)
+
+    foods/nutrients/food_nutrients 컬럼과 내보낼 당시의 변경 감지 probe/구간 체크섬을 담고 있어
+    DB 없이 스냅샷을 만들고, 이후 DB와는 바뀐 구간만 맞추면 된다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with np.load(path, allow_pickle=False) as data:
+            self.meta: Dict = json.loads(data['meta'].tobytes().decode('utf-8'))
+            if self.meta.get('schema_version') != SCHEMA_VERSION:
+                raise ValueError(f"지원하지 않는 스냅샷 형식입니다: {self.meta.get('schema_version')}")
+
+            self.table = FoodTable.from_columns(
+                data['foods_id'],
+                data['foods_calories'],
+                decode_labels(data['foods_name_blob'], data['foods_name_offsets'], data['foods_name_codes']),
+                decode_labels(data['foods_category_blob'], data['foods_category_offsets'], data['foods_category_codes']),
+                decode_labels(
+                    data['foods_source_name_blob'], data['foods_source_name_offsets'], data['foods_source_name_codes']
+                ),
+            )
+
+            # food_nutrients.nutrient_id -> nutrients 행 번호 (없는 영양소는 -1, DB 조회의 JOIN과 같음)
+            nutrient_ids = data['nutrients_id']
+            fn_nutrient_ids = data['food_nutrients_nutrient_id']
+            order = np.argsort(nutrient_ids, kind='stable')
+            pos = np.minimum(np.searchsorted(nutrient_ids[order], fn_nutrient_ids), max(len(order) - 1, 0))
+            codes = np.full(len(fn_nutrient_ids), -1, dtype=np.intp)
+            if len(order):
+                found = nutrient_ids[order][pos] == fn_nutrient_ids
+                codes[found] = order[pos[found]]
+            self.nutrients = NutrientMatrix.from_columns(
+                self.table,
+                data['food_nutrients_food_id'],
+                codes,
+                decode_strings(data['nutrients_name_blob'], data['nutrients_name_offsets']),
+                data['food_nutrients_value'],
+            )
+
+            self.bucket_size: int = self.meta['bucket_size']
+            self.probe: Tuple = tuple(self.meta['probe'])
+            self.buckets: Dict[int, Tuple] = {
+                row[0]: tuple(row[1:]) for row in data['buckets'].tolist()
+            }
+
+    @property
+    def version(self) -> str:
+        return self.meta.get('version', '')
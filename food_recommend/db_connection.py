@@ -1,11 +1,16 @@
 import os
+import threading
+from typing import Dict, Optional
 import pymysql
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# 풀 구현은 db_pool.py (.env의 DB_POOL_* 값이 반영되도록 load_dotenv 뒤에 import)
+from db_pool import ConnectionPool, PooledConnection, PoolTimeoutError
 
-def get_connection():
+
+def create_connection():
     """MySQL DB 연결 생성"""
     return pymysql.connect(
         host=os.getenv('DB_HOST', '192.168.1.8'),
@@ -17,3 +22,26 @@ def get_connection():
         cursorclass=pymysql.cursors.DictCursor
     )
 
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """프로세스 전역 커넥션 풀"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(create_connection)
+    return _pool
+
+
+def get_connection() -> PooledConnection:
+    """풀에서 MySQL DB 연결 체크아웃 (close() 시 풀에 반납)"""
+    return get_pool().acquire()
+
+
+def pool_metrics() -> Dict:
+    """커넥션 풀 통계"""
+    return get_pool().metrics()
@@ -0,0 +1,247 @@
+"""
+스레드 안전한 MySQL 커넥션 풀 (db_connection.get_pool()이 프로세스 전역으로 하나 생성)
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+import pymysql
+
+# 커넥션 풀 설정
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+DB_POOL_IDLE_TIMEOUT = float(os.getenv('DB_POOL_IDLE_TIMEOUT', 300))
+# 마지막 사용 후 이 시간(초)이 지난 연결만 체크아웃 시 ping (0이면 항상)
+DB_POOL_PING_INTERVAL = float(os.getenv('DB_POOL_PING_INTERVAL', 0))
+
+
+class PoolTimeoutError(Exception):
+    """풀에서 제한 시간 안에 연결을 얻지 못함"""
+
+
+class PooledConnection:
+    """풀에서 빌린 연결 (close() 하면 실제로 닫지 않고 풀에 반납)"""
+
+    def __init__(self, pool: "ConnectionPool", raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError("이미 풀에 반납된 연결입니다.")
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    스레드 안전한 MySQL 커넥션 풀
+
+    체크아웃 시 ping으로 상태를 확인하고, 반납 시 트랜잭션을 종료한다.
+    warm()으로 min_size개를 미리 만들어 두고, idle_timeout 넘게 쓰이지 않은 연결은
+    min_size까지 백그라운드에서 정리한다.
+    """
+
+    def __init__(self, factory: Callable,
+                 min_size: int = DB_POOL_MIN_SIZE, max_size: int = DB_POOL_MAX_SIZE,
+                 timeout: float = DB_POOL_TIMEOUT, idle_timeout: float = DB_POOL_IDLE_TIMEOUT,
+                 ping_interval: float = DB_POOL_PING_INTERVAL):
+        self._factory = factory
+        self.min_size = min_size
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+
+        self._idle = deque()  # (raw, 마지막 반납 시각)
+        self._size = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stop_event = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+        # 통계
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._health_check_failures = 0
+
+    def warm(self) -> int:
+        """min_size까지 연결을 미리 만들어 idle로 둠 (서버 시작 시 첫 요청의 연결 지연 제거)"""
+        created = 0
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    break
+                self._size += 1
+            try:
+                raw = self._factory()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._created += 1
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+            created += 1
+        self._ensure_reaper()
+        return created
+
+    def acquire(self) -> PooledConnection:
+        """연결 체크아웃 (풀이 가득 차 있으면 timeout까지 대기)"""
+        started = time.perf_counter()
+        waited = False
+        while True:
+            raw, last_used = None, 0.0
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise pymysql.err.InterfaceError("커넥션 풀이 닫혔습니다.")
+                    if self._idle:
+                        # 가장 최근에 반납된 연결부터 사용
+                        raw, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = self.timeout - (time.perf_counter() - started)
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(f"{self.timeout}초 안에 DB 연결을 얻지 못했습니다.")
+                    waited = True
+                    self._cond.wait(remaining)
+
+            if raw is None:
+                try:
+                    raw = self._factory()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._created += 1
+            elif time.monotonic() - last_used >= self.ping_interval and not self._is_healthy(raw):
+                self._discard(raw)
+                with self._cond:
+                    self._health_check_failures += 1
+                continue
+
+            self._ensure_reaper()
+            elapsed = time.perf_counter() - started
+            with self._cond:
+                self._checkouts += 1
+                if waited:
+                    self._waits += 1
+                self._wait_total += elapsed
+                self._wait_max = max(self._wait_max, elapsed)
+            return PooledConnection(self, raw)
+
+    def release(self, raw):
+        """연결 반납 (진행 중인 트랜잭션은 롤백하여 다음 사용자가 최신 데이터를 보도록 함)"""
+        try:
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        with self._cond:
+            if not self._closed:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(raw)
+
+    def _is_healthy(self, raw) -> bool:
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, raw):
+        """연결을 닫고 풀 크기에서 제외"""
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def _ensure_reaper(self):
+        if self._reaper is None and self.idle_timeout > 0:
+            with self._cond:
+                if self._reaper is None:
+                    self._reaper = threading.Thread(target=self._reap_loop, name="db-pool-reaper", daemon=True)
+                    self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1.0, self.idle_timeout / 2)
+        while not self._stop_event.wait(interval):
+            self.reap_idle()
+
+    def reap_idle(self) -> int:
+        """idle_timeout 넘게 쉬고 있는 연결을 min_size까지 정리"""
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            # 왼쪽일수록 오래된 연결
+            while self._idle and self._size - len(expired) > self.min_size:
+                raw, last_used = self._idle[0]
+                if now - last_used < self.idle_timeout:
+                    break
+                self._idle.popleft()
+                expired.append(raw)
+        for raw in expired:
+            self._discard(raw)
+        return len(expired)
+
+    def close(self):
+        """풀의 idle 연결을 모두 닫음 (사용 중인 연결은 반납 시 닫힘)"""
+        with self._cond:
+            self._closed = True
+            self._stop_event.set()
+            idle = [raw for raw, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        for raw in idle:
+            self._discard(raw)
+
+    def metrics(self) -> Dict:
+        """풀 상태 및 체크아웃/대기 시간 통계"""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_ms_avg": round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                "wait_ms_max": round(self._wait_max * 1000, 3),
+                "created": self._created,
+                "discarded": self._discarded,
+                "health_check_failures": self._health_check_failures,
+            }
@@ -0,0 +1,229 @@
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+# 끼니 구성용 카테고리 코드
+CATEGORY_NAMES = ('밥류', '국/탕', '반찬')
+RICE, SOUP, SIDE = range(len(CATEGORY_NAMES))
+
+
+def category_code(category: Optional[str]) -> int:
+    """DB category 문자열을 끼니 구성용 카테고리 코드로 변환"""
+    category = category or ''
+    if '밥' in category:
+        return RICE
+    if '국' in category or '탕' in category or '찌개' in category:
+        return SOUP
+    return SIDE
+
+
+class StringTable:
+    """문자열 인터닝 테이블 (같은 값은 하나의 코드와 객체를 공유)"""
+
+    def __init__(self):
+        self.values: List[Hashable] = []
+        self._codes: Dict[Hashable, int] = {}
+
+    def intern(self, value: Hashable) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def code_of(self, value: Hashable) -> Optional[int]:
+        return self._codes.get(value)
+
+    def __getitem__(self, code: int):
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def copy(self) -> "StringTable":
+        table = StringTable()
+        table.values = list(self.values)
+        table._codes = dict(self._codes)
+        return table
+
+
+def ids_in_ranges(ids: np.ndarray, ranges: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """id가 [low, high] 구간 중 하나에 속하는지 mask (ranges는 정렬되고 겹치지 않아야 함)"""
+    if not ranges:
+        return np.zeros(len(ids), dtype=bool)
+    lows = np.fromiter((low for low, _ in ranges), dtype=np.int64, count=len(ranges))
+    highs = np.fromiter((high for _, high in ranges), dtype=np.int64, count=len(ranges))
+    pos = np.searchsorted(lows, ids, side='right') - 1
+    inside = pos >= 0
+    inside[inside] = ids[inside] <= highs[pos[inside]]
+    return inside
+
+
+class FoodTable:
+    """
+    컬럼 형태의 음식 카탈로그
+
+    id/칼로리/카테고리 코드는 NumPy 배열로, 이름·카테고리·분량 문자열은 인터닝 테이블로 보관한다.
+    필터는 모두 행 단위 boolean mask로 결합하고, 응답에 필요한 행만 dict로 만든다.
+    """
+
+    def __init__(self, foods: Sequence[Dict]):
+        n = len(foods)
+        self.names = StringTable()
+        self.categories = StringTable()
+        self.portions = StringTable()
+
+        self.ids = np.fromiter((f['id'] for f in foods), dtype=np.int64, count=n)
+        self.calories = np.fromiter((int(f['calories']) for f in foods), dtype=np.int32, count=n)
+        self.name_code = np.fromiter((self.names.intern(f['name']) for f in foods), dtype=np.int32, count=n)
+        self.category_label_code = np.fromiter(
+            (self.categories.intern(f.get('category')) for f in foods), dtype=np.int32, count=n
+        )
+        self.portion_code = np.fromiter(
+            (self.portions.intern(f.get('source_name')) for f in foods), dtype=np.int32, count=n
+        )
+        self._build_indexes()
+
+    @classmethod
+    def from_columns(cls, ids: np.ndarray, calories: np.ndarray, names: Tuple[Sequence, np.ndarray],
+                     categories: Tuple[Sequence, np.ndarray], portions: Tuple[Sequence, np.ndarray]) -> "FoodTable":
+        """
+        컬럼 배열로 바로 생성 (스냅샷 파일 로드용, dict 목록을 거치지 않음)
+
+        names/categories/portions는 (값 목록, 행별 값 번호) 형태의 사전 인코딩 열이라
+        문자열 처리는 행 수가 아니라 값 종류 수만큼만 한다.
+        """
+        table = cls.__new__(cls)
+        table.names = StringTable()
+        table.categories = StringTable()
+        table.portions = StringTable()
+
+        n = len(ids)
+        table.ids = np.asarray(ids, dtype=np.int64)
+        table.calories = np.asarray(calories, dtype=np.int32)
+        for strings, (values, codes), attr in (
+            (table.names, names, 'name_code'),
+            (table.categories, categories, 'category_label_code'),
+            (table.portions, portions, 'portion_code'),
+        ):
+            value_codes = np.fromiter((strings.intern(v) for v in values), dtype=np.int32, count=len(values))
+            setattr(table, attr, value_codes[np.asarray(codes, dtype=np.intp)] if n else np.zeros(0, dtype=np.int32))
+        table._build_indexes()
+        return table
+
+    def _build_indexes(self):
+        """컬럼에서 파생되는 카테고리 분할/정렬 순서 계산"""
+        n = len(self.ids)
+        # 카테고리 문자열 종류별로 한 번만 분류한 뒤 행에 펼침
+        label_to_category = np.fromiter(
+            (category_code(label) for label in self.categories.values), dtype=np.int8, count=len(self.categories)
+        )
+        self.category_code = label_to_category[self.category_label_code] if n else np.zeros(0, dtype=np.int8)
+        self.category_rows: Tuple[np.ndarray, ...] = tuple(
+            np.flatnonzero(self.category_code == code) for code in range(len(CATEGORY_NAMES))
+        )
+
+        # 칼로리 오름차순 행 순서 (끼니 칼로리 구간 검색용)
+        self.calorie_order = np.argsort(self.calories, kind='stable')
+
+        # foods.id -> 행 번호 조회용
+        self._id_order = np.argsort(self.ids, kind='stable')
+        self._sorted_ids = self.ids[self._id_order]
+
+    def replace_ranges(self, ranges: Sequence[Tuple[int, int]], foods: Sequence[Dict]) -> Tuple["FoodTable", np.ndarray]:
+        """
+        id 구간 [low, high]의 행을 foods로 교체한 새 테이블 (자신은 변경하지 않음)
+
+        구간 밖의 행은 컬럼을 그대로 잘라 쓰고, foods만 새로 인터닝해 뒤에 붙인다.
+        (새 테이블, 새 테이블 앞부분 각 행의 이전 행 번호)를 반환한다.
+        """
+        kept_rows = np.flatnonzero(~ids_in_ranges(self.ids, ranges))
+        table = FoodTable.__new__(FoodTable)
+        table.names = self.names.copy()
+        table.categories = self.categories.copy()
+        table.portions = self.portions.copy()
+
+        n = len(foods)
+        table.ids = np.concatenate([
+            self.ids[kept_rows], np.fromiter((f['id'] for f in foods), dtype=np.int64, count=n)
+        ])
+        table.calories = np.concatenate([
+            self.calories[kept_rows], np.fromiter((int(f['calories']) for f in foods), dtype=np.int32, count=n)
+        ])
+        table.name_code = np.concatenate([
+            self.name_code[kept_rows],
+            np.fromiter((table.names.intern(f['name']) for f in foods), dtype=np.int32, count=n),
+        ])
+        table.category_label_code = np.concatenate([
+            self.category_label_code[kept_rows],
+            np.fromiter((table.categories.intern(f.get('category')) for f in foods), dtype=np.int32, count=n),
+        ])
+        table.portion_code = np.concatenate([
+            self.portion_code[kept_rows],
+            np.fromiter((table.portions.intern(f.get('source_name')) for f in foods), dtype=np.int32, count=n),
+        ])
+        table._build_indexes()
+        return table, kept_rows
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, i: int) -> Dict:
+        """행 하나를 pymysql 조회 결과와 같은 dict로 변환"""
+        return {
+            'id': int(self.ids[i]),
+            'name': self.names[self.name_code[i]],
+            'calories': int(self.calories[i]),
+            'category': self.categories[self.category_label_code[i]],
+            'source_name': self.portions[self.portion_code[i]],
+        }
+
+    def rows(self, rows: Sequence[int]) -> List[Dict]:
+        return [self.row(i) for i in rows]
+
+    def to_dicts(self) -> List[Dict]:
+        """전체 카탈로그를 dict 목록으로 변환 (기존 리스트 기반 함수 호환용)"""
+        return self.rows(range(len(self)))
+
+    def row_names(self) -> List[str]:
+        """행 순서대로의 음식명 (인터닝된 문자열 객체 공유)"""
+        values = self.names.values
+        return [values[code] for code in self.name_code]
+
+    def lookup_ids(self, food_ids: Sequence[int]) -> np.ndarray:
+        """foods.id 목록을 같은 길이의 행 번호 배열로 변환 (없는 id는 -1)"""
+        food_ids = np.asarray(food_ids, dtype=np.int64)
+        result = np.full(len(food_ids), -1, dtype=np.intp)
+        if not len(food_ids) or not len(self):
+            return result
+        pos = np.searchsorted(self._sorted_ids, food_ids)
+        pos = np.minimum(pos, len(self._sorted_ids) - 1)
+        found = self._sorted_ids[pos] == food_ids
+        result[found] = self._id_order[pos[found]]
+        return result
+
+    def rows_for_ids(self, food_ids: Sequence[int]) -> np.ndarray:
+        """foods.id 목록에 해당하는 행 번호 (없는 id는 무시)"""
+        rows = self.lookup_ids(food_ids)
+        return rows[rows >= 0]
+
+    def all_rows_mask(self) -> np.ndarray:
+        return np.ones(len(self), dtype=bool)
+
+    def name_mask(self, names: Sequence[str]) -> np.ndarray:
+        """이름이 정확히 일치하는 행 mask"""
+        codes = [code for code in (self.names.code_of(name) for name in names) if code is not None]
+        if not codes:
+            return np.zeros(len(self), dtype=bool)
+        return np.isin(self.name_code, codes)
+
+    def sort_by_calories(self, rows: np.ndarray) -> np.ndarray:
+        """rows를 칼로리 오름차순으로 정렬 (미리 계산한 순서 재사용)"""
+        member = np.zeros(len(self), dtype=bool)
+        member[rows] = True
+        return self.calorie_order[member[self.calorie_order]]
+
+    def partition(self, mask: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """mask를 통과한 행을 카테고리 코드별 행 번호 배열로 분할"""
+        return tuple(rows[mask[rows]] for rows in self.category_rows)
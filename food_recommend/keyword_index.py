@@ -0,0 +1,194 @@
+import threading
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Tuple
+import numpy as np
+
+
+# 채식 식단에서 제외할 육류 키워드
+MEAT_KEYWORDS = ('고기', '육', '소고기', '돼지', '닭', '오리', '양고기', '삼겹살', '갈비')
+
+# 스냅샷별로 기억해 둘 키워드 조합 수
+KEYWORD_MEMO_SIZE = 256
+
+_EMPTY_ROWS = np.zeros(0, dtype=np.intp)
+
+
+def normalize_text(text: str) -> str:
+    """키워드/음식명 비교용 정규화 (대소문자 무시)"""
+    return (text or '').lower()
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick 오토마톤
+
+    여러 키워드 중 하나라도 포함되는지를 문자열 한 번 순회로 판정한다.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[bool] = [False]
+
+        for keyword in keywords:
+            node = 0
+            for ch in keyword:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(False)
+                    self._goto[node][ch] = nxt
+                node = nxt
+            self._out[node] = True
+
+        # 실패 링크 계산 (BFS)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = True
+
+    def matches(self, text: str) -> bool:
+        """text에 키워드가 하나라도 포함되어 있는지 여부"""
+        goto, fail, out = self._goto, self._fail, self._out
+        if out[0]:
+            return True
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                return True
+        return False
+
+
+@lru_cache(maxsize=KEYWORD_MEMO_SIZE)
+def compile_keywords(keywords: FrozenSet[str]) -> KeywordAutomaton:
+    """정규화된 키워드 집합을 오토마톤으로 컴파일 (조합별 메모이제이션)"""
+    return KeywordAutomaton(keywords)
+
+
+def keyword_set(keywords: Iterable[str]) -> FrozenSet[str]:
+    """요청 키워드 목록을 정규화된 집합으로 변환"""
+    return frozenset(normalize_text(k) for k in keywords)
+
+
+class KeywordIndex:
+    """
+    카탈로그 스냅샷 단위 키워드 인덱스
+
+    정규화된 음식명을 한 번만 만들어 두고, 키워드 조합별 제외 행/food id를 LRU로 기억한다.
+    """
+
+    def __init__(self, names: Sequence[str], ids: Sequence[int], memo_size: int = KEYWORD_MEMO_SIZE):
+        # 같은 이름의 음식은 한 번만 검사
+        self._rows_by_name: Dict[str, List[int]] = {}
+        for row, name in enumerate(names):
+            self._rows_by_name.setdefault(normalize_text(name), []).append(row)
+        self._ids = np.asarray(ids, dtype=np.int64)
+
+        self._memo: "OrderedDict[FrozenSet[str], Tuple[np.ndarray, FrozenSet[int]]]" = OrderedDict()
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_codes(cls, values: Sequence[str], codes: np.ndarray, ids: Sequence[int],
+                   memo_size: int = KEYWORD_MEMO_SIZE) -> "KeywordIndex":
+        """인터닝된 음식명 (값 목록, 행별 값 번호)으로 생성 (정규화는 값 종류마다 한 번)"""
+        index = cls([], ids, memo_size)
+        codes = np.asarray(codes)
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(codes) else []
+        bounds = np.r_[starts, len(codes)].astype(np.intp).tolist()
+        rows = order.tolist()
+        for start, end in zip(bounds, bounds[1:]):
+            index._rows_by_name.setdefault(normalize_text(values[sorted_codes[start]]), []).extend(rows[start:end])
+        return index
+
+    def patched(self, names: Sequence[str], ids: Sequence[int], kept_rows: np.ndarray) -> "KeywordIndex":
+        """
+        FoodTable.replace_ranges로 만든 새 테이블용 인덱스 (자신은 변경하지 않음)
+
+        기억해 둔 키워드 조합의 결과는 유지된 행은 행 번호만 옮기고, 새로 붙은 행만 다시 검사한다.
+        """
+        index = KeywordIndex(names, ids, self._memo_size)
+        old_to_new = np.full(len(self._ids), -1, dtype=np.intp)
+        old_to_new[kept_rows] = np.arange(len(kept_rows))
+        added_names = [(row, normalize_text(names[row])) for row in range(len(kept_rows), len(names))]
+
+        with self._lock:
+            memo = list(self._memo.items())
+        for key, (rows, _) in memo:
+            automaton = compile_keywords(key)
+            moved = old_to_new[rows]
+            added = [row for row, name in added_names if automaton.matches(name)]
+            rows = np.concatenate([moved[moved >= 0], np.asarray(added, dtype=np.intp)])
+            rows.sort()
+            index._memo[key] = (rows, frozenset(index._ids[rows].tolist()))
+        return index
+
+    def __getstate__(self):
+        # 프로세스 간 전달 시 lock은 제외
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _lookup(self, keywords: Iterable[str]) -> Tuple[np.ndarray, FrozenSet[int]]:
+        key = keyword_set(keywords)
+        if not key:
+            return _EMPTY_ROWS, frozenset()
+
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        automaton = compile_keywords(key)
+        rows = np.fromiter(
+            (row for name, rows in self._rows_by_name.items() if automaton.matches(name) for row in rows),
+            dtype=np.intp,
+        )
+        rows.sort()
+        entry = (rows, frozenset(self._ids[rows].tolist()))
+
+        with self._lock:
+            self.misses += 1
+            self._memo[key] = entry
+            if len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return entry
+
+    def excluded_rows(self, keywords: Iterable[str]) -> np.ndarray:
+        """키워드 중 하나라도 이름에 포함된 음식의 행 번호 (정렬됨)"""
+        return self._lookup(keywords)[0]
+
+    def excluded_ids(self, keywords: Iterable[str]) -> FrozenSet[int]:
+        """키워드 중 하나라도 이름에 포함된 음식의 id 집합"""
+        return self._lookup(keywords)[1]
+
+    def stats(self) -> Dict:
+        return {
+            "names": len(self._rows_by_name),
+            "memo_entries": len(self._memo),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,177 @@
+import os
+import random
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+
+from food_table import CATEGORY_NAMES, FoodTable
+from metrics import event_counter
+
+
+# 끼니별 목표 칼로리 구간 (RECOMMENDATION_DESIGN.md 3.2)
+MEAL_KCAL_BANDS: Dict[str, Tuple[int, int]] = {
+    'BREAKFAST': (450, 550),
+    'LUNCH': (550, 650),
+    'DINNER': (500, 600),
+}
+MEAL_TYPES = tuple(MEAL_KCAL_BANDS)
+
+# 끼니당 최대 음식 수
+MAX_MEAL_ITEMS = 4
+
+# 하루 식단에 필요한 카테고리별 최대 음식 수 (밥류, 국/탕, 반찬)
+DAY_ITEM_NEEDS = (len(MEAL_TYPES), len(MEAL_TYPES), len(MEAL_TYPES) * (MAX_MEAL_ITEMS - 2))
+
+# 요청당 solver 시간 예산 (초과 시 greedy 선택으로 대체)
+MEAL_SOLVER_BUDGET_MS = float(os.getenv('MEAL_SOLVER_BUDGET_MS', 20))
+
+# 끼니당 밥/국 조합 재시도 횟수 상한
+MAX_SOLVER_ATTEMPTS = 64
+
+# 한 칼로리 구간에서 제외 음식을 건너뛰며 시도할 횟수
+MAX_RANGE_PICKS = 8
+
+# 이미 꺼낸 위치 비율이 이 값을 넘으면 (= 다음 추첨이 버려질 확률) 남은 위치를 한 번에 섞어서 반환
+RANDOM_ROWS_SHUFFLE_RATIO = 0.5
+
+# solver 성공/greedy 대체 횟수 (요청 스레드마다 증가하므로 metrics 카운터 사용)
+solver_solved = event_counter("meal_solver_solved")
+solver_fallbacks = event_counter("meal_solver_fallback")
+
+
+def iter_random_rows(rows: np.ndarray, ids: np.ndarray, exclude_ids: Set[int],
+                     rng: Optional[random.Random] = None) -> Iterator[int]:
+    """
+    rows 중 exclude_ids에 없는 행을 중복 없이 무작위 순서로 하나씩 반환
+
+    전체를 섞는 것과 같은 분포지만, 꺼낸 개수만큼만 비용이 든다.
+    꺼낸 위치가 RANDOM_ROWS_SHUFFLE_RATIO를 넘으면 중복 추첨이 잦아지므로
+    남은 위치만 rng로 시드한 permutation으로 섞어 이어서 반환한다 (분포는 같음).
+    """
+    rng = rng or random
+    n = len(rows)
+    seen = set()
+    while len(seen) < n:
+        if len(seen) > n * RANDOM_ROWS_SHUFFLE_RATIO:
+            remaining = np.ones(n, dtype=bool)
+            remaining[list(seen)] = False
+            order = np.random.default_rng(rng.getrandbits(64)).permutation(np.flatnonzero(remaining))
+            for row in rows[order].tolist():
+                if int(ids[row]) not in exclude_ids:
+                    yield row
+            return
+        pos = rng.randrange(n)
+        if pos in seen:
+            continue
+        seen.add(pos)
+        row = int(rows[pos])
+        if int(ids[row]) not in exclude_ids:
+            yield row
+
+
+class CalorieSortedRows:
+    """칼로리 오름차순으로 정렬된 후보 행 (구간 검색용)"""
+
+    def __init__(self, table: FoodTable, rows: np.ndarray):
+        self.rows = table.sort_by_calories(rows)
+        self.kcal = table.calories[self.rows]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def pick_in_range(self, low: int, high: int, ids: np.ndarray, exclude_ids: Set[int],
+                      skip_row: int = -1, rng: Optional[random.Random] = None) -> Optional[int]:
+        """칼로리가 [low, high]인 후보 중 하나를 무작위로 선택"""
+        rng = rng or random
+        start = int(np.searchsorted(self.kcal, low, side='left'))
+        stop = int(np.searchsorted(self.kcal, high, side='right'))
+        if start >= stop:
+            return None
+        for _ in range(MAX_RANGE_PICKS):
+            row = int(self.rows[rng.randrange(start, stop)])
+            if row != skip_row and int(ids[row]) not in exclude_ids:
+                return row
+        return None
+
+
+def solve_meal(table: FoodTable, partition: Tuple[np.ndarray, ...], sides: CalorieSortedRows,
+               band: Tuple[int, int], exclude_ids: Set[int], deadline: float,
+               rng: Optional[random.Random] = None) -> Optional[List[int]]:
+    """
+    밥 1 + 국 1 + 반찬 1~2개로 칼로리 구간 [low, high]를 맞추는 끼니 구성
+
+    반찬이 최대 2개이므로 칼로리 정렬 버킷에서 이진 탐색으로 남은 칼로리 구간을 바로 찾는다
+    (반찬 2개짜리 knapsack을 구간 검색으로 푸는 것과 같음). 반찬 개수와 후보는 무작위로 고른다.
+    deadline(perf_counter 기준)이나 시도 횟수를 넘기면 None.
+    """
+    rng = rng or random
+    rice_rows, soup_rows, _ = partition
+    low, high = band
+    ids, calories = table.ids, table.calories
+    if not len(sides):
+        return None
+
+    for _ in range(MAX_SOLVER_ATTEMPTS):
+        if time.perf_counter() > deadline:
+            break
+
+        selected = []
+        rice = next(iter_random_rows(rice_rows, ids, exclude_ids, rng), None)
+        if rice is not None:
+            selected.append(rice)
+        soup = next(iter_random_rows(soup_rows, ids, exclude_ids, rng), None)
+        if soup is not None:
+            selected.append(soup)
+        base = sum(int(calories[row]) for row in selected)
+        if base >= high:
+            continue
+
+        side_counts = [1, 2]
+        rng.shuffle(side_counts)
+        for count in side_counts:
+            if count == 1:
+                dish = sides.pick_in_range(low - base, high - base, ids, exclude_ids, rng=rng)
+                if dish is not None:
+                    solver_solved.inc()
+                    return selected + [dish]
+            else:
+                first = sides.pick_in_range(0, high - base, ids, exclude_ids, rng=rng)
+                if first is None:
+                    continue
+                rest = base + int(calories[first])
+                second = sides.pick_in_range(low - rest, high - rest, ids, exclude_ids, skip_row=first, rng=rng)
+                if second is not None:
+                    solver_solved.inc()
+                    return selected + [first, second]
+
+    solver_fallbacks.inc()
+    return None
+
+
+class CategoryRotation:
+    """
+    여러 날 식단의 카테고리별 사용 음식 추적
+
+    한 번 고른 음식은 다시 쓰지 않다가, 어떤 카테고리의 남은 후보가 하루치보다 적어지면
+    그 카테고리만 처음부터 다시 순환한다.
+    """
+
+    def __init__(self, partition: Tuple[np.ndarray, ...]):
+        self.sizes = [len(rows) for rows in partition]
+        self.used_by_category: List[Set[int]] = [set() for _ in CATEGORY_NAMES]
+        self.used_ids: Set[int] = set()
+        self.rotations = 0
+
+    def start_day(self):
+        for code, needed in enumerate(DAY_ITEM_NEEDS):
+            used = self.used_by_category[code]
+            if used and self.sizes[code] - len(used) < needed:
+                self.used_ids.difference_update(used)
+                used.clear()
+                self.rotations += 1
+
+    def record(self, table: FoodTable, rows: List[int]):
+        for row in rows:
+            food_id = int(table.ids[row])
+            self.used_by_category[int(table.category_code[row])].add(food_id)
+            self.used_ids.add(food_id)
@@ -0,0 +1,222 @@
+"""
+끼니 조합 템플릿 저장소
+
+오프라인에서 끼니 유형별 칼로리 구간에 맞는 (밥, 국, 반찬 1~2개) 조합을 미리 만들어 고정 길이 레코드
+바이너리 파일로 저장하고, 서버는 이 파일을 memory-map하여 모든 워커가 같은 페이지를 공유한다.
+요청 시에는 조합을 무작위로 뽑아 후보에서 빠진 음식이 있으면 버리는 rejection sampling만 한다.
+
+    python meal_templates.py build --output meal_templates.bin --per-meal 200000
+    python meal_templates.py build --synthetic 100000 --output /tmp/meal_templates.bin  # DB 없이 합성 카탈로그
+"""
+import argparse
+import json
+import os
+import random
+import struct
+import time
+from typing import Dict, List, Optional, Set
+import numpy as np
+
+from food_table import SIDE, FoodTable
+from meal_solver import MAX_MEAL_ITEMS, MEAL_KCAL_BANDS, MEAL_TYPES, CalorieSortedRows, solve_meal
+from metrics import event_counter
+
+
+# 템플릿 파일 경로 (비어 있거나 파일이 없으면 사용 안 함)
+MEAL_TEMPLATE_PATH = os.getenv('MEAL_TEMPLATE_PATH', '')
+
+# 끼니 유형별 생성할 조합 수
+TEMPLATES_PER_MEAL = 200000
+
+# 요청당 한 번에 뽑아 볼 조합 수와 최대 반복 횟수 (넘으면 solver로 대체)
+TEMPLATE_DRAW_BATCH = 64
+MAX_TEMPLATE_DRAWS = 4
+
+FILE_MAGIC = b'CBMEAL01'
+HEADER_ALIGN = 64
+
+# 레코드: 음식 id (빈 칸은 -1) + 총 칼로리
+RECORD_DTYPE = np.dtype([('food_ids', '<i4', (MAX_MEAL_ITEMS,)), ('kcal', '<i4')])
+
+# 템플릿 사용/거절/소진 횟수 (요청 스레드마다 증가하므로 metrics 카운터 사용)
+template_served = event_counter("meal_template_served")
+template_rejected = event_counter("meal_template_rejected")
+template_exhausted = event_counter("meal_template_exhausted")
+
+
+def build_templates(table: FoodTable, per_meal: int = TEMPLATES_PER_MEAL, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    끼니 유형별로 칼로리 구간을 만족하는 서로 다른 조합 per_meal개 생성
+
+    밥 x 국 x 반찬 쌍의 전체 조합은 카탈로그 크기의 네제곱이라 모두 나열할 수 없으므로,
+    요청 경로와 같은 solver를 고정 seed로 반복 실행하여 중복 없는 조합을 모은다.
+    """
+    if len(table) and int(table.ids.max()) > np.iinfo(np.int32).max:
+        raise ValueError("food id가 int32 범위를 넘어 템플릿 파일에 저장할 수 없습니다.")
+
+    rng = random.Random(seed)
+    partition = table.category_rows
+    sides = CalorieSortedRows(table, partition[SIDE])
+    templates = {}
+    for meal_type in MEAL_TYPES:
+        band = MEAL_KCAL_BANDS[meal_type]
+        seen: Set[tuple] = set()
+        records = np.full(per_meal, -1, dtype=RECORD_DTYPE)
+        count = 0
+        for _ in range(per_meal * 4):
+            if count >= per_meal:
+                break
+            rows = solve_meal(table, partition, sides, band, set(), float('inf'), rng)
+            if rows is None:
+                continue
+            key = tuple(sorted(rows))
+            if key in seen:
+                continue
+            seen.add(key)
+            records['food_ids'][count, :len(rows)] = table.ids[rows]
+            records['kcal'][count] = int(table.calories[rows].sum())
+            count += 1
+        templates[meal_type] = records[:count]
+    return templates
+
+
+def write_templates(path: str, templates: Dict[str, np.ndarray], meta: Optional[Dict] = None):
+    """
+    템플릿 파일 저장
+
+    [magic 8B][헤더 길이 4B][JSON 헤더][0 패딩] 뒤에 끼니 유형별 레코드 배열이 64바이트 경계로 이어진다.
+    """
+    sections = {}
+    offset = 0
+    for meal_type, records in templates.items():
+        sections[meal_type] = {"offset": offset, "count": len(records)}
+        offset += -(-records.nbytes // HEADER_ALIGN) * HEADER_ALIGN
+    header = json.dumps({
+        "format": 1,
+        "record_dtype": RECORD_DTYPE.descr,
+        "sections": sections,
+        "meta": meta or {},
+    }, ensure_ascii=False).encode('utf-8')
+    data_start = -(-(len(FILE_MAGIC) + 4 + len(header)) // HEADER_ALIGN) * HEADER_ALIGN
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(FILE_MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        for meal_type, records in templates.items():
+            f.seek(data_start + sections[meal_type]["offset"])
+            f.write(records.tobytes())
+        f.truncate(data_start + offset)
+    # 서버가 읽는 도중에 반쯤 쓰인 파일을 보지 않도록 교체
+    os.replace(tmp_path, path)
+
+
+class MealTemplateStore:
+    """memory-map된 끼니 조합 템플릿 (읽기 전용, 프로세스 간 페이지 공유)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                raise ValueError(f"끼니 템플릿 파일 형식이 아닙니다: {path}")
+            header_len, = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_len))
+        data_start = -(-(len(FILE_MAGIC) + 4 + header_len) // HEADER_ALIGN) * HEADER_ALIGN
+
+        self.meta = header.get("meta", {})
+        self.sections: Dict[str, np.ndarray] = {}
+        for meal_type, section in header["sections"].items():
+            if section["count"]:
+                self.sections[meal_type] = np.memmap(
+                    path, dtype=RECORD_DTYPE, mode='r',
+                    offset=data_start + section["offset"], shape=(section["count"],)
+                )
+
+    def sample(self, table: FoodTable, meal_type: str, allowed: np.ndarray, exclude_ids: Set[int],
+               rng: Optional[random.Random] = None) -> Optional[List[int]]:
+        """
+        allowed(후보 행 mask)에 모두 포함되고 exclude_ids와 겹치지 않는 조합 하나의 행 번호
+
+        현재 카탈로그에 없거나 칼로리가 바뀌어 구간을 벗어난 조합도 버린다.
+        """
+        records = self.sections.get(meal_type)
+        if records is None:
+            return None
+        rng = rng or random
+        low, high = MEAL_KCAL_BANDS[meal_type]
+        for _ in range(MAX_TEMPLATE_DRAWS):
+            picks = records['food_ids'][[rng.randrange(len(records)) for _ in range(TEMPLATE_DRAW_BATCH)]]
+            filled = picks >= 0
+            rows = table.lookup_ids(picks.ravel()).reshape(picks.shape)
+            ok = np.where(filled, rows >= 0, True).all(axis=1)
+            ok &= np.where(filled, allowed[rows], True).all(axis=1)
+            kcal = np.where(filled, table.calories[rows], 0).sum(axis=1)
+            ok &= (kcal >= low) & (kcal <= high)
+            for i in np.flatnonzero(ok):
+                if not any(int(food_id) in exclude_ids for food_id in picks[i][filled[i]]):
+                    template_served.inc()
+                    template_rejected.inc(int(i))
+                    return rows[i][filled[i]].tolist()
+            template_rejected.inc(TEMPLATE_DRAW_BATCH)
+        template_exhausted.inc()
+        return None
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "meta": self.meta,
+            "templates": {meal_type: len(records) for meal_type, records in self.sections.items()},
+        }
+
+
+def load_template_store(path: str = MEAL_TEMPLATE_PATH) -> Optional[MealTemplateStore]:
+    """설정된 템플릿 파일이 있으면 memory-map (없거나 읽을 수 없으면 None)"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return MealTemplateStore(path)
+    except Exception as e:
+        print(f"⚠️  끼니 템플릿 로드 실패 (solver만 사용): {e}")
+        return None
+
+
+def build(args):
+    if args.synthetic:
+        from benchmark import generate_synthetic_foods
+        foods = generate_synthetic_foods(args.synthetic, args.seed)
+    else:
+        from service import fetch_foods_from_db
+        foods = fetch_foods_from_db()
+
+    started = time.perf_counter()
+    table = FoodTable(foods)
+    templates = build_templates(table, args.per_meal, args.seed)
+    meta = {
+        "built_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "food_count": len(table),
+        "seed": args.seed,
+    }
+    write_templates(args.output, templates, meta)
+    print(f"💾 템플릿 저장: {args.output} ({os.path.getsize(args.output) / 1024 / 1024:.1f} MiB, "
+          f"{time.perf_counter() - started:.1f}s)")
+    for meal_type, records in templates.items():
+        print(f"  {meal_type:10s} {len(records):>8,}개")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="끼니 조합 템플릿 파일 생성")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = sub.add_parser('build', help="카탈로그에서 끼니 조합 템플릿 생성")
+    build_parser.add_argument('--output', default='meal_templates.bin')
+    build_parser.add_argument('--per-meal', type=int, default=TEMPLATES_PER_MEAL)
+    build_parser.add_argument('--seed', type=int, default=0)
+    build_parser.add_argument('--synthetic', type=int, help="DB 대신 합성 카탈로그 크기")
+
+    args = parser.parse_args()
+    build(args)
+
+
+if __name__ == "__main__":
+    main()
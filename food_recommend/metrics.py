@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# 응답에 Server-Timing 헤더로 단계별 소요 시간 포함 여부
+SERVER_TIMING_ENABLED = os.getenv('RECOMMEND_SERVER_TIMING', 'false').lower() in ('1', 'true', 'yes')
+
+# 단계별 소요 시간 히스토그램 구간 (초)
+STAGE_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+STAGE_METRIC = "food_recommend_stage_duration_seconds"
+
+EVENT_METRIC = "food_recommend_events_total"
+
+
+class Histogram:
+    """누적 구간 카운트만 유지하는 고정 버킷 히스토그램 (관측값은 저장하지 않음)"""
+
+    def __init__(self, buckets: Sequence[float] = STAGE_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """(누적 버킷 카운트, 합계, 개수)"""
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return cumulative, total, count
+
+
+class Counter:
+    """여러 스레드에서 증가시키는 누적 카운터"""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        with self._lock:
+            return self._value
+
+
+_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+_counters: Dict[str, Counter] = {}
+_counters_lock = threading.Lock()
+
+# 요청 단위 단계 기록 (Server-Timing 헤더용, 미들웨어가 켰을 때만 존재)
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('request_timings', default=None)
+
+
+def stage_histogram(name: str) -> Histogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(name, Histogram())
+    return histogram
+
+
+def event_counter(name: str) -> Counter:
+    """이름별 이벤트 카운터 (처음 호출 시 등록, /metrics에 event 라벨로 노출)"""
+    counter = _counters.get(name)
+    if counter is None:
+        with _counters_lock:
+            counter = _counters.setdefault(name, Counter())
+    return counter
+
+
+def record_stage(name: str, seconds: float):
+    """단계 소요 시간 기록 (히스토그램 + 현재 요청의 Server-Timing)"""
+    stage_histogram(name).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+class stage:
+    """
+    with stage("filter_allergies"): ... 형태로 구간 소요 시간을 기록
+
+    hot path에서 쓰이므로 contextlib 대신 __enter__/__exit__만 구현한다.
+    """
+
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_stage(self.name, time.perf_counter() - self.started)
+
+
+def start_request_timing() -> object:
+    """현재 요청의 단계 기록 시작 (반환값은 end_request_timing에 전달)"""
+    return _request_timings.set([])
+
+
+def end_request_timing(token) -> List[Tuple[str, float]]:
+    """현재 요청의 단계 기록을 끝내고 기록된 (단계, 초) 목록 반환"""
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+
+def server_timing_header(timings: List[Tuple[str, float]]) -> str:
+    """Server-Timing 헤더 값 (같은 단계가 여러 번 실행되면 합산, 단위 ms)"""
+    totals: Dict[str, float] = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in totals.items())
+
+
+def render_prometheus() -> str:
+    """단계별 히스토그램을 Prometheus text exposition 형식으로 출력"""
+    lines = [
+        f"# HELP {STAGE_METRIC} Duration of each food recommendation stage in seconds.",
+        f"# TYPE {STAGE_METRIC} histogram",
+    ]
+    with _histograms_lock:
+        histograms = sorted(_histograms.items())
+    for name, histogram in histograms:
+        cumulative, total, count = histogram.snapshot()
+        for bound, value in zip(histogram.buckets, cumulative):
+            lines.append(f'{STAGE_METRIC}_bucket{{stage="{name}",le="{bound}"}} {value}')
+        lines.append(f'{STAGE_METRIC}_bucket{{stage="{name}",le="+Inf"}} {cumulative[-1]}')
+        lines.append(f'{STAGE_METRIC}_sum{{stage="{name}"}} {total}')
+        lines.append(f'{STAGE_METRIC}_count{{stage="{name}"}} {count}')
+
+    with _counters_lock:
+        counters = sorted(_counters.items())
+    if counters:
+        lines.append(f"# HELP {EVENT_METRIC} Number of food recommendation events.")
+        lines.append(f"# TYPE {EVENT_METRIC} counter")
+        for name, counter in counters:
+            lines.append(f'{EVENT_METRIC}{{event="{name}"}} {counter.value}')
+    return "\n".join(lines) + "\n"
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -25,6 +25,16 @@ class RecommendRequest(BaseModel):
     foodHistory: List[FoodHistory] = []
 
 
+class MultiDayRecommendRequest(RecommendRequest):
+    days: int = Field(default=7, ge=1, le=31)
+
+
+class SubstituteRequest(RecommendRequest):
+    foodId: int
+    k: int = Field(default=5, ge=1, le=50)
+    excludeFoodIds: List[int] = []
+
+
 # Response Models
 class FoodItem(BaseModel):
     foodId: int
@@ -52,3 +62,33 @@ class RecommendResponse(BaseModel):
     message: str
     result: RecommendResult
 
+
+class MultiDayRecommendResponse(BaseModel):
+    isSuccess: bool
+    code: str
+    message: str
+    result: List[RecommendResult]
+
+
+class SubstituteItem(FoodItem):
+    similarity: float
+
+
+class SubstituteResult(BaseModel):
+    foodId: int
+    candidates: List[SubstituteItem]
+
+
+class SubstituteResponse(BaseModel):
+    isSuccess: bool
+    code: str
+    message: str
+    result: SubstituteResult
+
+
+class BatchRecommendItem(BaseModel):
+    index: int
+    isSuccess: bool
+    code: str
+    message: str
+    result: Optional[RecommendResult] = None
@@ -0,0 +1,134 @@
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Sequence
+import numpy as np
+
+from keyword_index import normalize_text
+
+
+# 최근 섭취 음식명의 bigram 중 카탈로그 음식명에 포함되어야 하는 비율
+RECENT_FOOD_MATCH_THRESHOLD = float(os.getenv('RECENT_FOOD_MATCH_THRESHOLD', 0.8))
+
+# 스냅샷별로 기억해 둘 음식명 조회 결과 수
+NAME_MEMO_SIZE = 1024
+
+_PAREN_PATTERN = re.compile(r'\([^)]*\)')
+_SPACE_PATTERN = re.compile(r'\s+')
+_EMPTY_ROWS = np.zeros(0, dtype=np.intp)
+
+
+def base_name(name: str) -> str:
+    """매칭용 음식명 정규화 ("김치찌개(돼지고기)" -> "김치찌개", 공백/대소문자 무시)"""
+    return _SPACE_PATTERN.sub('', _PAREN_PATTERN.sub('', normalize_text(name)))
+
+
+def name_bigrams(name: str) -> FrozenSet[str]:
+    """앞뒤 경계 문자를 붙인 글자 bigram 집합 (한 글자 이름도 bigram이 생기도록)"""
+    padded = f" {name} "
+    return frozenset(padded[i:i + 2] for i in range(len(padded) - 1))
+
+
+class NameMatchIndex:
+    """
+    카탈로그 음식명 bigram 역색인
+
+    사진 라벨처럼 짧은 음식명("김치찌개")으로 카탈로그 행("김치찌개(돼지고기)", "돼지김치찌개")을 찾는다.
+    질의 bigram의 threshold 이상을 포함하는 이름이 매칭이며, 드문 bigram 몇 개의 posting만으로
+    후보를 모은 뒤(prefix filtering) 나머지 posting은 이진 탐색으로 확인하므로
+    카탈로그 전체를 훑지 않는다.
+    """
+
+    def __init__(self, names: Sequence[str], threshold: float = RECENT_FOOD_MATCH_THRESHOLD,
+                 memo_size: int = NAME_MEMO_SIZE):
+        self.threshold = threshold
+        rows_by_name: Dict[str, List[int]] = {}
+        for row, name in enumerate(names):
+            rows_by_name.setdefault(name, []).append(row)
+        # 같은 음식명은 한 번만 정규화
+        rows_by_base: Dict[str, List[int]] = {}
+        for name, rows in rows_by_name.items():
+            rows_by_base.setdefault(base_name(name), []).extend(rows)
+
+        # 정규화된 이름별 행 번호 (CSR: _row_start[i]부터 _row_count[i]개)
+        self._row_count = np.fromiter((len(rows) for rows in rows_by_base.values()), dtype=np.intp,
+                                      count=len(rows_by_base))
+        self._row_start = np.concatenate([[0], np.cumsum(self._row_count)[:-1]]).astype(np.intp)
+        self._rows = np.fromiter((row for rows in rows_by_base.values() for row in rows), dtype=np.intp,
+                                 count=len(names))
+
+        # bigram -> 이름 번호 (오름차순)
+        postings: Dict[str, List[int]] = {}
+        for i, base in enumerate(rows_by_base):
+            for gram in name_bigrams(base):
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.asarray(ids, dtype=np.intp) for gram, ids in postings.items()}
+
+        self._memo: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # 프로세스 간 전달 시 lock은 제외
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _match(self, grams: FrozenSet[str]) -> np.ndarray:
+        """질의 bigram의 threshold 이상을 포함하는 이름 번호"""
+        needed = max(1, math.ceil(self.threshold * len(grams)))
+        postings = sorted((self._postings.get(gram, _EMPTY_ROWS) for gram in grams), key=len)
+
+        # needed개 이상 겹치려면 드문 순으로 |q| - needed + 1개 중 하나는 반드시 공유한다
+        candidates = np.unique(np.concatenate(postings[:len(grams) - needed + 1]))
+        overlap = np.zeros(len(candidates), dtype=np.intp)
+        for ids in postings:
+            if not len(ids) or not len(candidates):
+                continue
+            pos = np.minimum(np.searchsorted(ids, candidates), len(ids) - 1)
+            overlap += ids[pos] == candidates
+        return candidates[overlap >= needed]
+
+    def matching_rows(self, name: str) -> np.ndarray:
+        """name과 매칭되는 카탈로그 행 번호"""
+        query = base_name(name)
+        if not query:
+            return _EMPTY_ROWS
+
+        with self._lock:
+            cached = self._memo.get(query)
+            if cached is not None:
+                self._memo.move_to_end(query)
+                self.hits += 1
+                return cached
+
+        matched = self._match(name_bigrams(query))
+        counts = self._row_count[matched]
+        # 매칭된 이름들의 행 구간을 한 번에 펼침
+        offsets = np.repeat(self._row_start[matched] - np.cumsum(counts) + counts, counts)
+        rows = self._rows[offsets + np.arange(int(counts.sum()))]
+
+        with self._lock:
+            self.misses += 1
+            self._memo[query] = rows
+            if len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return rows
+
+    def stats(self) -> Dict:
+        return {
+            "names": len(self._row_count),
+            "bigrams": len(self._postings),
+            "threshold": self.threshold,
+            "memo_entries": len(self._memo),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,176 @@
+import math
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from food_table import FoodTable
+
+
+# 건강 상태 키워드 -> 상한을 적용할 영양소
+HEALTH_RULES = (
+    ('고혈압', 'SODIUM'),
+    ('당뇨', 'SUGARS'),
+)
+
+# 식단 선호도 키워드 -> 낮은 순으로 우선할 영양소
+DIET_RULES = (
+    ('저염', 'SODIUM'),
+    ('저당', 'SUGARS'),
+)
+
+# 건강 상태 필터: 카테고리 내 이 분위수를 넘는 음식 제외
+NUTRIENT_LIMIT_QUANTILE = float(os.getenv('NUTRIENT_LIMIT_QUANTILE', 0.75))
+
+# 식단 선호도 정렬: 카테고리 내 하위 이 비율만 후보로 유지
+DIET_RANK_FRACTION = float(os.getenv('DIET_RANK_FRACTION', 0.5))
+
+
+def normalize_nutrient_name(name: str) -> str:
+    return (name or '').strip().upper()
+
+
+def matched_nutrients(values: Sequence[str], rules: Sequence[Tuple[str, str]]) -> List[str]:
+    """요청 값(healths/diets)에 해당하는 영양소 목록 (중복 제거, 규칙 순서 유지)"""
+    nutrients = []
+    for keyword, nutrient in rules:
+        if nutrient not in nutrients and any(keyword in value for value in values or []):
+            nutrients.append(nutrient)
+    return nutrients
+
+
+class NutrientMatrix:
+    """
+    foods x nutrients 밀집 행렬
+
+    행은 FoodTable의 행 순서와 같고, 값이 없는 칸은 NaN이다.
+    분위수 상한과 카테고리별 정렬 순서는 스냅샷당 한 번만 계산한다.
+    """
+
+    def __init__(self, table: FoodTable, food_nutrients: Sequence[Dict]):
+        self.names = sorted({normalize_nutrient_name(r['nutrient_name']) for r in food_nutrients})
+        self._columns = {name: i for i, name in enumerate(self.names)}
+        self.values = np.full((len(table), len(self.names)), np.nan, dtype=np.float32)
+        self._fill(table, food_nutrients)
+        self._reset_caches(table)
+
+    @classmethod
+    def from_columns(cls, table: FoodTable, food_ids: np.ndarray, nutrient_codes: np.ndarray,
+                     nutrient_names: Sequence[str], values: np.ndarray) -> "NutrientMatrix":
+        """
+        (food id, 영양소 번호, 값) 열 배열로 바로 생성 (스냅샷 파일 로드용)
+
+        nutrient_codes는 nutrient_names의 위치이며, -1인 행은 무시한다.
+        """
+        matrix = cls.__new__(cls)
+        nutrient_codes = np.asarray(nutrient_codes, dtype=np.intp)
+        used = np.unique(nutrient_codes[nutrient_codes >= 0])
+        normalized = [normalize_nutrient_name(name) for name in nutrient_names]
+        matrix.names = sorted({normalized[code] for code in used.tolist()})
+        matrix._columns = {name: i for i, name in enumerate(matrix.names)}
+        matrix.values = np.full((len(table), len(matrix.names)), np.nan, dtype=np.float32)
+
+        code_to_col = np.fromiter((matrix._columns.get(name, -1) for name in normalized), dtype=np.intp,
+                                  count=len(normalized))
+        rows = table.lookup_ids(food_ids)
+        known = (rows >= 0) & (nutrient_codes >= 0)
+        cols = code_to_col[nutrient_codes[known]]
+        matrix.values[rows[known], cols] = np.asarray(values, dtype=np.float32)[known]
+        matrix._reset_caches(table)
+        return matrix
+
+    def patched(self, table: FoodTable, kept_rows: np.ndarray, food_nutrients: Sequence[Dict]) -> "NutrientMatrix":
+        """
+        FoodTable.replace_ranges로 만든 새 테이블용 행렬 (자신은 변경하지 않음)
+
+        유지된 행은 이전 값을 복사하고, 새로 붙은 행만 food_nutrients로 채운다.
+        """
+        matrix = NutrientMatrix.__new__(NutrientMatrix)
+        matrix.names = sorted(set(self.names) | {normalize_nutrient_name(r['nutrient_name']) for r in food_nutrients})
+        matrix._columns = {name: i for i, name in enumerate(matrix.names)}
+        matrix.values = np.full((len(table), len(matrix.names)), np.nan, dtype=np.float32)
+
+        old_cols = [matrix._columns[name] for name in self.names]
+        matrix.values[:len(kept_rows), old_cols] = self.values[kept_rows]
+        # food_nutrients는 교체된 id 구간의 행만 담고 있으므로 유지된 행과 겹치지 않음
+        matrix._fill(table, food_nutrients)
+        matrix._reset_caches(table)
+        return matrix
+
+    def _fill(self, table: FoodTable, food_nutrients: Sequence[Dict]):
+        if food_nutrients:
+            count = len(food_nutrients)
+            rows = table.lookup_ids(np.fromiter((r['food_id'] for r in food_nutrients), dtype=np.int64, count=count))
+            cols = np.fromiter(
+                (self._columns[normalize_nutrient_name(r['nutrient_name'])] for r in food_nutrients),
+                dtype=np.intp, count=count
+            )
+            vals = np.fromiter(
+                (float(r['value']) if r['value'] is not None else np.nan for r in food_nutrients),
+                dtype=np.float32, count=count
+            )
+            known = rows >= 0
+            self.values[rows[known], cols[known]] = vals[known]
+
+    def _reset_caches(self, table: FoodTable):
+        self._category_code = table.category_code
+        self._category_rows = table.category_rows
+        self._limit_masks: Dict[Tuple[str, float], np.ndarray] = {}
+        self._rank_orders: Dict[Tuple[str, int], np.ndarray] = {}
+
+    def column(self, nutrient: str) -> Optional[np.ndarray]:
+        """영양소 한 열 (데이터가 없으면 None)"""
+        col = self._columns.get(normalize_nutrient_name(nutrient))
+        if col is None:
+            return None
+        return self.values[:, col]
+
+    def above_limit_mask(self, nutrient: str, quantile: float = NUTRIENT_LIMIT_QUANTILE) -> Optional[np.ndarray]:
+        """카테고리별 분위수 상한을 넘는 행 mask (값이 없는 음식은 통과)"""
+        key = (normalize_nutrient_name(nutrient), quantile)
+        cached = self._limit_masks.get(key)
+        if cached is not None:
+            return cached
+
+        values = self.column(nutrient)
+        if values is None:
+            return None
+
+        limits = np.full(len(self._category_rows), np.inf, dtype=np.float32)
+        for code, rows in enumerate(self._category_rows):
+            known = values[rows]
+            known = known[~np.isnan(known)]
+            if len(known):
+                limits[code] = np.quantile(known, quantile)
+
+        with np.errstate(invalid='ignore'):
+            mask = values > limits[self._category_code]
+        self._limit_masks[key] = mask
+        return mask
+
+    def rank_order(self, nutrient: str, code: int) -> Optional[np.ndarray]:
+        """카테고리 내 행 번호를 영양소 값 오름차순으로 정렬 (값이 없는 음식은 마지막)"""
+        key = (normalize_nutrient_name(nutrient), code)
+        cached = self._rank_orders.get(key)
+        if cached is not None:
+            return cached
+
+        values = self.column(nutrient)
+        if values is None:
+            return None
+
+        rows = self._category_rows[code]
+        order = rows[np.argsort(values[rows], kind='stable')]
+        self._rank_orders[key] = order
+        return order
+
+    def keep_lowest(self, nutrient: str, code: int, rows: np.ndarray,
+                    fraction: float = DIET_RANK_FRACTION) -> np.ndarray:
+        """rows 중 영양소 값이 낮은 하위 fraction만 남김"""
+        order = self.rank_order(nutrient, code)
+        if order is None or not len(rows):
+            return rows
+
+        member = np.zeros(len(self._category_code), dtype=bool)
+        member[rows] = True
+        ranked = order[member[order]]
+        return ranked[:max(1, math.ceil(len(ranked) * fraction))]
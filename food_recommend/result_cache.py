@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from models import RecommendRequest, RecommendResult
+
+
+# 추천 결과 캐시 크기 (0이면 사용 안 함)
+RESULT_CACHE_SIZE = int(os.getenv('RECOMMEND_RESULT_CACHE_SIZE', 0))
+
+
+def request_profile_key(request: RecommendRequest, catalog_version: int) -> str:
+    """
+    요청 조건의 정규화된 해시
+
+    알레르기/식단/건강 상태, 최근 섭취 음식명(순서 무관), 카탈로그 버전만 반영한다.
+    """
+    profile = {
+        "allergies": sorted(set(request.allergies)),
+        "diets": sorted(set(request.diets)),
+        "healths": sorted(set(request.healths)),
+        "history": sorted({h.foodName for h in request.foodHistory}),
+        "catalog_version": catalog_version,
+    }
+    canonical = json.dumps(profile, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def seed_for(key: str) -> int:
+    """캐시 키에서 난수 seed 생성 (같은 조건이면 같은 식단이 재현됨)"""
+    return int(key[:16], 16)
+
+
+class RecommendationCache:
+    """조건별 추천 결과 LRU 캐시"""
+
+    def __init__(self, max_size: int = RESULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, RecommendResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: str) -> Optional[RecommendResult]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: str, result: RecommendResult):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
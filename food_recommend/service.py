@@ -1,15 +1,33 @@
-from datetime import date
+from datetime import date, timedelta
+import os
 import random
-from typing import List, Dict
-from models import RecommendRequest, RecommendResponse, RecommendResult, MealSection, FoodItem
+import time
+from typing import List, Dict, Optional, Set, Tuple
+import numpy as np
+from models import (
+    RecommendRequest, RecommendResponse, RecommendResult, MealSection, FoodItem,
+    MultiDayRecommendRequest, MultiDayRecommendResponse,
+    SubstituteRequest, SubstituteResponse, SubstituteResult, SubstituteItem
+)
 from db_connection import get_connection
+from catalog import CatalogChangeSource, CatalogSnapshot, FoodCatalogCache
+from food_table import CATEGORY_NAMES, SIDE, FoodTable, category_code
+from keyword_index import KeywordIndex, MEAT_KEYWORDS, compile_keywords, keyword_set, normalize_text
+from nutrition import DIET_RULES, HEALTH_RULES, matched_nutrients
+from meal_templates import load_template_store
+from result_cache import RecommendationCache, request_profile_key, seed_for
+from metrics import stage
+from meal_solver import (
+    MAX_MEAL_ITEMS, MEAL_KCAL_BANDS, MEAL_SOLVER_BUDGET_MS, MEAL_TYPES,
+    CalorieSortedRows, CategoryRotation, iter_random_rows, solve_meal
+)
 
 
 def fetch_foods_from_db() -> List[Dict]:
     """DB에서 모든 음식 정보 조회"""
     conn = get_connection()
     try:
-        with conn.cursor() as cursor:
+        with stage("db_fetch_foods"), conn.cursor() as cursor:
             cursor.execute("""
                 SELECT id, name, calories, category, source_name
                 FROM foods
@@ -21,62 +39,191 @@ def fetch_foods_from_db() -> List[Dict]:
         conn.close()
 
 
-def filter_by_allergies(foods: List[Dict], allergies: List[str]) -> List[Dict]:
+def fetch_food_nutrients_from_db() -> List[Dict]:
+    """DB에서 음식별 영양소 함량 조회 (카탈로그 로드 시 한 번)"""
+    conn = get_connection()
+    try:
+        with stage("db_fetch_nutrients"), conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT fn.food_id, n.name AS nutrient_name, fn.value
+                FROM food_nutrients fn
+                JOIN nutrients n ON n.id = fn.nutrient_id
+            """)
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+class FoodNotFoundError(Exception):
+    """카탈로그에 없는 foodId"""
+
+
+# 갱신 시 변경된 id 구간만 다시 조회 (false면 매번 전체 재로드)
+CATALOG_INCREMENTAL_REFRESH = os.getenv('FOOD_CATALOG_INCREMENTAL_REFRESH', 'true').lower() in ('1', 'true', 'yes')
+
+# 행 단위 체크섬 (구간별 BIT_XOR로 합산하므로 행 순서와 무관)
+FOOD_ROW_CHECKSUM = "CRC32(CONCAT_WS('|', id, name, calories, category, source_name))"
+NUTRIENT_ROW_CHECKSUM = "CRC32(CONCAT_WS('|', food_id, nutrient_id, value))"
+
+
+def _id_range_clause(column: str, ranges) -> Tuple[str, List[int]]:
+    clause = " OR ".join(f"{column} BETWEEN %s AND %s" for _ in ranges)
+    return f"({clause})", [bound for id_range in ranges for bound in id_range]
+
+
+class DbCatalogSource(CatalogChangeSource):
+    """foods/food_nutrients 테이블의 변경 감지 및 id 구간 조회"""
+
+    def probe(self) -> Tuple:
+        conn = get_connection()
+        try:
+            with stage("db_probe"), conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT COUNT(*) AS row_count, COALESCE(MAX(id), 0) AS max_id,
+                           BIT_XOR({FOOD_ROW_CHECKSUM}) AS checksum
+                    FROM foods
+                    WHERE calories IS NOT NULL AND calories > 0
+                """)
+                foods = cursor.fetchone()
+                cursor.execute(f"""
+                    SELECT COUNT(*) AS row_count, BIT_XOR({NUTRIENT_ROW_CHECKSUM}) AS checksum
+                    FROM food_nutrients
+                """)
+                nutrients = cursor.fetchone()
+            return (foods['row_count'], foods['max_id'], foods['checksum'],
+                    nutrients['row_count'], nutrients['checksum'])
+        finally:
+            conn.close()
+
+    def bucket_checksums(self, bucket_size: int) -> Dict[int, Tuple]:
+        conn = get_connection()
+        try:
+            with stage("db_bucket_checksums"), conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT id DIV %s AS bucket, COUNT(*) AS row_count, BIT_XOR({FOOD_ROW_CHECKSUM}) AS checksum
+                    FROM foods
+                    WHERE calories IS NOT NULL AND calories > 0
+                    GROUP BY bucket
+                """, (bucket_size,))
+                foods = {row['bucket']: (row['row_count'], row['checksum']) for row in cursor.fetchall()}
+                cursor.execute(f"""
+                    SELECT food_id DIV %s AS bucket, COUNT(*) AS row_count, BIT_XOR({NUTRIENT_ROW_CHECKSUM}) AS checksum
+                    FROM food_nutrients
+                    GROUP BY bucket
+                """, (bucket_size,))
+                nutrients = {row['bucket']: (row['row_count'], row['checksum']) for row in cursor.fetchall()}
+            return {
+                int(bucket): foods.get(bucket, (0, 0)) + nutrients.get(bucket, (0, 0))
+                for bucket in foods.keys() | nutrients.keys()
+            }
+        finally:
+            conn.close()
+
+    def fetch_foods(self, ranges) -> List[Dict]:
+        if not ranges:
+            return []
+        clause, params = _id_range_clause("id", ranges)
+        conn = get_connection()
+        try:
+            with stage("db_fetch_foods"), conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT id, name, calories, category, source_name
+                    FROM foods
+                    WHERE calories IS NOT NULL AND calories > 0 AND {clause}
+                """, params)
+                return cursor.fetchall()
+        finally:
+            conn.close()
+
+    def fetch_food_nutrients(self, ranges) -> List[Dict]:
+        if not ranges:
+            return []
+        clause, params = _id_range_clause("fn.food_id", ranges)
+        conn = get_connection()
+        try:
+            with stage("db_fetch_nutrients"), conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT fn.food_id, n.name AS nutrient_name, fn.value
+                    FROM food_nutrients fn
+                    JOIN nutrients n ON n.id = fn.nutrient_id
+                    WHERE {clause}
+                """, params)
+                return cursor.fetchall()
+        finally:
+            conn.close()
+
+
+# 프로세스 전역 카탈로그 캐시 (요청마다 DB를 조회하지 않음)
+catalog_cache = FoodCatalogCache(
+    loader=fetch_foods_from_db,
+    nutrient_loader=fetch_food_nutrients_from_db,
+    change_source=DbCatalogSource() if CATALOG_INCREMENTAL_REFRESH else None,
+)
+
+# 조건별 추천 결과 캐시 (RECOMMEND_RESULT_CACHE_SIZE > 0일 때만 사용)
+recommendation_cache = RecommendationCache()
+
+# 미리 만든 끼니 조합 템플릿 (MEAL_TEMPLATE_PATH 설정 시, 워커 간 memory-map 공유)
+meal_template_store = load_template_store()
+
+
+def filter_by_allergies(foods: List[Dict], allergies: List[str], index: Optional[KeywordIndex] = None) -> List[Dict]:
     """알레르기 음식 제외"""
     if not allergies:
         return foods
     
-    filtered = []
-    for food in foods:
-        has_allergy = False
-        for allergy in allergies:
-            if allergy.lower() in food['name'].lower():
-                has_allergy = True
-                break
-        if not has_allergy:
-            filtered.append(food)
-    
-    return filtered
+    return _exclude_keywords(foods, allergies, index)
 
 
-def filter_by_diet(foods: List[Dict], diets: List[str]) -> List[Dict]:
+def filter_by_diet(foods: List[Dict], diets: List[str], index: Optional[KeywordIndex] = None) -> List[Dict]:
     """식단 선호도 반영 (채식 등)"""
     if not diets:
         return foods
     
     # 채식인 경우 육류 제외
     if any('채식' in diet for diet in diets):
-        meat_keywords = ['고기', '육', '소고기', '돼지', '닭', '오리', '양고기', '삼겹살', '갈비']
-        foods = [f for f in foods if not any(kw in f['name'] for kw in meat_keywords)]
+        foods = _exclude_keywords(foods, MEAT_KEYWORDS, index)
     
     return foods
 
 
-def exclude_recent_foods(foods: List[Dict], food_history: List) -> List[Dict]:
-    """최근 섭취한 음식 제외하여 다양성 확보"""
+def _exclude_keywords(foods: List[Dict], keywords, index: Optional[KeywordIndex]) -> List[Dict]:
+    """키워드가 이름에 포함된 음식 제외 (스냅샷 인덱스가 있으면 메모이제이션된 결과 사용)"""
+    if index is not None:
+        excluded = index.excluded_ids(keywords)
+        if not excluded:
+            return foods
+        return [f for f in foods if f['id'] not in excluded]
+    
+    automaton = compile_keywords(keyword_set(keywords))
+    return [f for f in foods if not automaton.matches(normalize_text(f['name']))]
+
+
+def exclude_recent_foods(foods: List[Dict], food_history: List, snapshot: Optional[CatalogSnapshot] = None) -> List[Dict]:
+    """
+    최근 섭취한 음식 제외하여 다양성 확보
+
+    음식명이 정확히 같지 않아도 ("김치찌개" / "김치찌개(돼지고기)") bigram 유사도로 매칭한다.
+    역색인은 새로 만들지 않고 스냅샷(없으면 현재 카탈로그 캐시)의 name_index를 쓰며,
+    foods가 카탈로그 일부여도 되도록 매칭된 행의 foods.id로 제외한다.
+    """
     if not food_history:
         return foods
     
-    recent_names = [h.foodName for h in food_history]
-    return [f for f in foods if f['name'] not in recent_names]
+    snapshot = snapshot or catalog_cache.get_snapshot()
+    index, ids = snapshot.name_index, snapshot.table.ids
+    excluded = set()
+    for h in food_history:
+        excluded.update(ids[index.matching_rows(h.foodName)].tolist())
+    return [f for f in foods if f['id'] not in excluded]
 
 
 def categorize_foods(foods: List[Dict]) -> Dict[str, List[Dict]]:
     """음식을 카테고리별로 분류"""
-    categories = {
-        '밥류': [],
-        '국/탕': [],
-        '반찬': []
-    }
+    categories = {name: [] for name in CATEGORY_NAMES}
     
     for food in foods:
-        category = food.get('category', '')
-        if '밥' in category:
-            categories['밥류'].append(food)
-        elif '국' in category or '탕' in category or '찌개' in category:
-            categories['국/탕'].append(food)
-        else:
-            categories['반찬'].append(food)
+        categories[CATEGORY_NAMES[category_code(food.get('category', ''))]].append(food)
     
     return categories
 
@@ -106,7 +253,7 @@ def select_meal_items(categorized: Dict[str, List[Dict]], target_kcal: int) -> L
         for dish in side_dishes:
             if current_kcal >= target_kcal:
                 break
-            if len(selected) >= 4:  # 최대 4개까지
+            if len(selected) >= MAX_MEAL_ITEMS:
                 break
             selected.append(dish)
             current_kcal += int(dish['calories'])
@@ -114,6 +261,103 @@ def select_meal_items(categorized: Dict[str, List[Dict]], target_kcal: int) -> L
     return selected
 
 
+def mask_by_allergies(mask: np.ndarray, snapshot: CatalogSnapshot, allergies: List[str]) -> np.ndarray:
+    """알레르기 음식 행을 mask에서 제외 (in-place)"""
+    if allergies:
+        mask[snapshot.keyword_index.excluded_rows(allergies)] = False
+    return mask
+
+
+def mask_by_diet(mask: np.ndarray, snapshot: CatalogSnapshot, diets: List[str]) -> np.ndarray:
+    """식단 선호도에 맞지 않는 행을 mask에서 제외 (in-place)"""
+    if diets and any('채식' in diet for diet in diets):
+        mask[snapshot.keyword_index.excluded_rows(MEAT_KEYWORDS)] = False
+    return mask
+
+
+def mask_by_health(mask: np.ndarray, snapshot: CatalogSnapshot, healths: List[str]) -> np.ndarray:
+    """건강 상태별 영양소 상한(카테고리 내 분위수)을 넘는 행을 mask에서 제외 (in-place)"""
+    for nutrient in matched_nutrients(healths, HEALTH_RULES):
+        above = snapshot.nutrients.above_limit_mask(nutrient)
+        if above is not None:
+            mask &= ~above
+    return mask
+
+
+def rank_by_diet(partition: Tuple[np.ndarray, ...], snapshot: CatalogSnapshot, diets: List[str]) -> Tuple[np.ndarray, ...]:
+    """저염식/저당식: 카테고리마다 해당 영양소가 낮은 음식만 후보로 유지"""
+    for nutrient in matched_nutrients(diets, DIET_RULES):
+        partition = tuple(
+            snapshot.nutrients.keep_lowest(nutrient, code, rows)
+            for code, rows in enumerate(partition)
+        )
+    return partition
+
+
+def mask_recent_foods(mask: np.ndarray, snapshot: CatalogSnapshot, food_history: List) -> np.ndarray:
+    """최근 섭취한 음식과 이름이 비슷한 행을 mask에서 제외 (in-place, 비용은 기록 수에 비례)"""
+    for h in food_history:
+        mask[snapshot.name_index.matching_rows(h.foodName)] = False
+    return mask
+
+
+def select_meal_rows(table: FoodTable, partition: Tuple[np.ndarray, ...], target_kcal: int,
+                     exclude_ids: Optional[Set[int]] = None, rng: Optional[random.Random] = None) -> List[int]:
+    """
+    끼니별 음식 선택 (행 번호 기반)
+
+    select_meal_items와 같은 규칙이지만 카테고리 분할은 그대로 두고
+    이미 고른 음식은 exclude_ids(foods.id)로 건너뛴다.
+    """
+    exclude_ids = exclude_ids or set()
+    rice_rows, soup_rows, side_rows = partition
+    selected = []
+    current_kcal = 0
+    
+    # 1. 밥류 1개 선택
+    rice = next(iter_random_rows(rice_rows, table.ids, exclude_ids, rng), None)
+    if rice is not None:
+        selected.append(rice)
+        current_kcal += int(table.calories[rice])
+    
+    # 2. 국/탕 1개 선택
+    soup = next(iter_random_rows(soup_rows, table.ids, exclude_ids, rng), None)
+    if soup is not None:
+        selected.append(soup)
+        current_kcal += int(table.calories[soup])
+    
+    # 3. 반찬 추가 (목표 칼로리에 맞춰, 최대 MAX_MEAL_ITEMS개)
+    for dish in iter_random_rows(side_rows, table.ids, exclude_ids, rng):
+        if current_kcal >= target_kcal:
+            break
+        if len(selected) >= MAX_MEAL_ITEMS:
+            break
+        selected.append(dish)
+        current_kcal += int(table.calories[dish])
+    
+    return selected
+
+
+def select_meal(table: FoodTable, partition: Tuple[np.ndarray, ...], sides: CalorieSortedRows,
+                meal_type: str, exclude_ids: Set[int], deadline: float,
+                rng: Optional[random.Random] = None, allowed: Optional[np.ndarray] = None) -> List[int]:
+    """
+    끼니 칼로리 구간에 맞춰 선택
+
+    템플릿 저장소가 있으면 후보(allowed)에 맞는 미리 만든 조합을 먼저 뽑고, 없으면 solver,
+    시간 예산 안에 못 찾으면 기존 greedy 선택으로 대체한다.
+    """
+    band = MEAL_KCAL_BANDS[meal_type]
+    if meal_template_store is not None and allowed is not None:
+        rows = meal_template_store.sample(table, meal_type, allowed, exclude_ids, rng)
+        if rows is not None:
+            return rows
+    rows = solve_meal(table, partition, sides, band, exclude_ids, deadline, rng)
+    if rows is None:
+        rows = select_meal_rows(table, partition, target_kcal=sum(band) // 2, exclude_ids=exclude_ids, rng=rng)
+    return rows
+
+
 def build_meal_section(meal_type: str, foods: List[Dict]) -> MealSection:
     """MealSection 생성"""
     items = []
@@ -137,50 +381,198 @@ def build_meal_section(meal_type: str, foods: List[Dict]) -> MealSection:
     )
 
 
-def generate_food_recommendation(request: RecommendRequest) -> RecommendResponse:
+def profile_key(request: RecommendRequest) -> Tuple:
+    """요청의 알레르기/건강 상태/식단 조건 (같은 키면 profile_mask 결과를 공유할 수 있음)"""
+    return (
+        tuple(sorted(request.allergies)),
+        tuple(sorted(request.healths)),
+        tuple(sorted(request.diets)),
+    )
+
+
+def profile_mask(snapshot: CatalogSnapshot, request: RecommendRequest) -> np.ndarray:
+    """알레르기/건강 상태/식단 조건만 반영한 후보 mask"""
+    mask = snapshot.table.all_rows_mask()
+    with stage("filter_allergies"):
+        mask_by_allergies(mask, snapshot, request.allergies)
+    with stage("filter_health"):
+        mask_by_health(mask, snapshot, request.healths)
+    with stage("filter_diet"):
+        mask_by_diet(mask, snapshot, request.diets)
+    return mask
+
+
+def build_candidates(request: RecommendRequest, snapshot: CatalogSnapshot,
+                     base_mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, ...]:
+    """요청 조건으로 후보를 필터링하고 카테고리별로 분할"""
+    table = snapshot.table
+    
+    # 리스트 복사 없이 행 mask 결합
+    mask = profile_mask(snapshot, request) if base_mask is None else base_mask.copy()
+    with stage("filter_recent"):
+        mask_recent_foods(mask, snapshot, request.foodHistory)
+    
+    # 카테고리별 분류 (요청당 한 번) 후 식단 선호도 영양소 순위 반영
+    with stage("categorize"):
+        partition = table.partition(mask)
+    with stage("rank_diet"):
+        return rank_by_diet(partition, snapshot, request.diets)
+
+
+def select_day_meals(table: FoodTable, partition: Tuple[np.ndarray, ...], sides: CalorieSortedRows,
+                     used_ids: Set[int], rng: Optional[random.Random] = None) -> List[List[int]]:
+    """하루 세 끼 선택 (칼로리 구간 solver, 이미 고른 음식은 used_ids로 제외하여 중복 방지)"""
+    deadline = time.perf_counter() + MEAL_SOLVER_BUDGET_MS / 1000
+    allowed = None
+    if meal_template_store is not None:
+        allowed = np.zeros(len(table), dtype=bool)
+        for rows in partition:
+            allowed[rows] = True
+    meals = []
+    for meal_type in MEAL_TYPES:
+        with stage(f"select_{meal_type.lower()}"):
+            rows = select_meal(table, partition, sides, meal_type, used_ids, deadline, rng, allowed)
+        used_ids.update(table.ids[rows].tolist())
+        meals.append(rows)
+    return meals
+
+
+def build_result(table: FoodTable, meals: List[List[int]], plan_date: date) -> RecommendResult:
+    """선택된 행으로 RecommendResult 생성 (선택된 행만 dict로 변환)"""
+    sections = [
+        build_meal_section(meal_type, table.rows(rows))
+        for meal_type, rows in zip(MEAL_TYPES, meals)
+    ]
+    return RecommendResult(
+        planId=random.randint(1000, 9999),
+        planDate=str(plan_date),
+        sections=sections
+    )
+
+
+def generate_food_recommendation(request: RecommendRequest, snapshot: Optional[CatalogSnapshot] = None,
+                                 base_mask: Optional[np.ndarray] = None) -> RecommendResponse:
     """
     유저 정보를 기반으로 추천 식단을 생성하는 비즈니스 로직
+
+    snapshot/base_mask를 넘기면 배치 처리처럼 같은 스냅샷과 조건별 필터 결과를 재사용한다.
+    결과 캐시가 켜져 있으면 같은 조건의 요청은 필터링/선택 없이 planId/planDate만 새로 찍는다.
     """
     
-    # 1. DB에서 음식 조회
-    foods = fetch_foods_from_db()
+    # 1. 캐시된 카탈로그 스냅샷 조회
+    if snapshot is None:
+        with stage("catalog_snapshot"):
+            snapshot = catalog_cache.get_snapshot()
+    table = snapshot.table
     
-    # 2. 필터링
-    foods = filter_by_allergies(foods, request.allergies)
-    foods = filter_by_diet(foods, request.diets)
-    foods = exclude_recent_foods(foods, request.foodHistory)
+    # 같은 조건의 결과가 있으면 재사용
+    key, rng = None, None
+    if recommendation_cache.enabled:
+        with stage("result_cache_lookup"):
+            key = request_profile_key(request, snapshot.version)
+            cached = recommendation_cache.get(key)
+        if cached is not None:
+            with stage("build_response"):
+                return _recommend_response(cached.model_copy(update={
+                    "planId": random.randint(1000, 9999),
+                    "planDate": str(date.today()),
+                }))
+        # 조건별 고정 seed로 캐시된 식단이 재현 가능하도록 함
+        rng = random.Random(seed_for(key))
     
-    # 3. 카테고리별 분류
-    categorized = categorize_foods(foods)
+    # 2. 필터링 및 카테고리별 분류
+    partition = build_candidates(request, snapshot, base_mask)
     
-    # 4. 끼니별 선택
-    breakfast_items = select_meal_items(categorized, target_kcal=500)
+    # 3. 끼니별 선택
+    with stage("sort_sides"):
+        sides = CalorieSortedRows(table, partition[SIDE])
+    meals = select_day_meals(table, partition, sides, set(), rng)
     
-    # 선택된 음식 제외하고 다시 분류 (중복 방지)
-    remaining_foods = [f for f in foods if f not in breakfast_items]
-    categorized_lunch = categorize_foods(remaining_foods)
-    lunch_items = select_meal_items(categorized_lunch, target_kcal=600)
-    
-    remaining_foods = [f for f in remaining_foods if f not in lunch_items]
-    categorized_dinner = categorize_foods(remaining_foods)
-    dinner_items = select_meal_items(categorized_dinner, target_kcal=550)
+    # 4. Response 생성
+    with stage("build_response"):
+        result = build_result(table, meals, date.today())
+        if key is not None:
+            recommendation_cache.put(key, result)
+        return _recommend_response(result)
+
+
+def _recommend_response(result: RecommendResult) -> RecommendResponse:
+    return RecommendResponse(
+        isSuccess=True,
+        code="MEALPLAN_200",
+        message="AI 추천 식단 생성 요청 완료",
+        result=result
+    )
+
+
+def generate_multi_day_recommendation(request: MultiDayRecommendRequest) -> MultiDayRecommendResponse:
+    """
+    여러 날 식단을 한 번에 생성
+
+    필터링/분류는 한 번만 하고, 날마다 선택 단계만 반복한다.
+    이미 고른 음식은 다음 날에도 제외하며, 후보가 부족해진 카테고리만 다시 순환한다.
+    """
+    with stage("catalog_snapshot"):
+        snapshot = catalog_cache.get_snapshot()
+    table = snapshot.table
     
-    # 5. MealSection 생성
-    breakfast = build_meal_section("BREAKFAST", breakfast_items)
-    lunch = build_meal_section("LUNCH", lunch_items)
-    dinner = build_meal_section("DINNER", dinner_items)
+    partition = build_candidates(request, snapshot)
+    sides = CalorieSortedRows(table, partition[SIDE])
+    rotation = CategoryRotation(partition)
     
-    # 6. Response 생성
-    result = RecommendResult(
-        planId=random.randint(1000, 9999),
-        planDate=str(date.today()),
-        sections=[breakfast, lunch, dinner]
-    )
+    start = date.today()
+    results = []
+    for day in range(request.days):
+        rotation.start_day()
+        meals = select_day_meals(table, partition, sides, rotation.used_ids)
+        for rows in meals:
+            rotation.record(table, rows)
+        results.append(build_result(table, meals, start + timedelta(days=day)))
     
-    return RecommendResponse(
+    return MultiDayRecommendResponse(
         isSuccess=True,
         code="MEALPLAN_200",
         message="AI 추천 식단 생성 요청 완료",
-        result=result
+        result=results
     )
 
+
+def generate_substitutes(request: SubstituteRequest) -> SubstituteResponse:
+    """
+    foodId와 카테고리/칼로리/영양소 구성이 가장 비슷한 음식 k개 (DB 조회 없음)
+
+    요청의 알레르기/건강 상태/식단 조건과 최근 섭취 음식, excludeFoodIds(같은 식단의 다른 음식 등)는
+    후보에서 제외한다.
+    """
+    with stage("catalog_snapshot"):
+        snapshot = catalog_cache.get_snapshot()
+    table = snapshot.table
+    
+    row = int(table.lookup_ids([request.foodId])[0])
+    if row < 0:
+        raise FoodNotFoundError(f"음식을 찾을 수 없습니다: {request.foodId}")
+    
+    mask = profile_mask(snapshot, request)
+    mask_recent_foods(mask, snapshot, request.foodHistory)
+    mask[table.rows_for_ids(request.excludeFoodIds)] = False
+    
+    with stage("substitute_search"):
+        rows, distances = snapshot.vector_index.nearest(row, request.k, mask)
+    
+    candidates = []
+    for food, distance in zip(table.rows(rows), distances.tolist()):
+        candidates.append(SubstituteItem(
+            foodId=food['id'],
+            name=food['name'],
+            portionLabel=food.get('source_name', '100g'),
+            estCalories=int(food['calories']),
+            foodCategory=food.get('category', '기타'),
+            similarity=round(1 / (1 + distance), 4)
+        ))
+    
+    return SubstituteResponse(
+        isSuccess=True,
+        code="MEALPLAN_200",
+        message="대체 음식 조회 완료",
+        result=SubstituteResult(foodId=request.foodId, candidates=candidates)
+    )
@@ -0,0 +1,59 @@
+from typing import Tuple
+import numpy as np
+
+from food_table import CATEGORY_NAMES, FoodTable
+from nutrition import NutrientMatrix
+
+
+# 특징 묶음별 가중치 (카테고리가 다르면 칼로리/영양소가 비슷해도 멀게)
+CATEGORY_WEIGHT = 3.0
+CALORIE_WEIGHT = 1.0
+NUTRIENT_WEIGHT = 1.0
+
+
+def _standardize(values: np.ndarray) -> np.ndarray:
+    """열마다 평균 0, 표준편차 1로 변환 (값이 없는 칸은 평균으로 간주)"""
+    with np.errstate(invalid='ignore'):
+        mean = np.nanmean(values, axis=0) if len(values) else np.zeros(values.shape[1])
+        std = np.nanstd(values, axis=0) if len(values) else np.ones(values.shape[1])
+    mean = np.nan_to_num(mean)
+    std = np.where(np.isnan(std) | (std == 0), 1.0, std)
+    return np.nan_to_num((values - mean) / std)
+
+
+class FoodVectorIndex:
+    """
+    음식별 특징 벡터 (카테고리 one-hot, 칼로리, 영양소) 최근접 이웃 인덱스
+
+    칼로리/영양소는 치우친 분포라 log1p 후 표준화하고, 행렬과 행별 제곱 norm을 미리 계산해 두어
+    질의 하나는 행렬-벡터 곱 한 번과 argpartition으로 끝난다.
+    """
+
+    def __init__(self, table: FoodTable, nutrients: NutrientMatrix):
+        n = len(table)
+        category = np.zeros((n, len(CATEGORY_NAMES)), dtype=np.float32)
+        category[np.arange(n), table.category_code] = CATEGORY_WEIGHT
+
+        calories = _standardize(np.log1p(table.calories.astype(np.float64))[:, None]) * CALORIE_WEIGHT
+
+        nutrient_values = np.log1p(np.clip(nutrients.values.astype(np.float64), 0, None))
+        # 영양소 수와 관계없이 영양소 묶음 전체의 비중이 NUTRIENT_WEIGHT가 되도록 나눔
+        scale = NUTRIENT_WEIGHT / np.sqrt(max(nutrient_values.shape[1], 1))
+        nutrient_values = _standardize(nutrient_values) * scale
+
+        self.vectors = np.hstack([category, calories, nutrient_values]).astype(np.float32)
+        self.sq_norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+
+    def nearest(self, row: int, k: int, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """row와 가장 가까운 mask 안의 행 k개와 거리 (가까운 순)"""
+        query = self.vectors[row]
+        dist = self.sq_norms - 2 * (self.vectors @ query) + self.sq_norms[row]
+        dist[~mask] = np.inf
+        dist[row] = np.inf
+
+        k = min(k, int(np.count_nonzero(np.isfinite(dist))))
+        if k <= 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(dist, k - 1)[:k]
+        top = top[np.argsort(dist[top], kind='stable')]
+        return top, np.sqrt(np.maximum(dist[top], 0))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 서비스 모듈은 food_recommend 디렉터리 기준으로 import 한다 (uvicorn app:app과 동일)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+import catalog
+from catalog import CatalogChangeSource, CatalogSnapshot, FoodCatalogCache
+from food_table import FoodTable
+from nutrition import NutrientMatrix
+
+FOODS = [
+    {'id': 1, 'name': '김치찌개', 'calories': 250, 'category': '찌개 및 전골류', 'source_name': '1인분'},
+    {'id': 2, 'name': '현미밥', 'calories': 300, 'category': '밥류', 'source_name': '1공기'},
+]
+
+
+def test_name_index_stats_does_not_build_name_index():
+    snapshot = CatalogSnapshot(1, FOODS)
+
+    assert snapshot.name_index_stats() is None
+
+    snapshot.name_index
+    assert snapshot.name_index_stats()["names"] == 2
+
+
+def test_stats_reports_current_snapshot():
+    cache = FoodCatalogCache(loader=lambda: FOODS, ttl_seconds=0)
+
+    snapshot = cache.refresh()
+
+    stats = cache.stats()
+    assert stats["version"] == snapshot.version
+    assert stats["food_count"] == 2
+    assert stats["name_index"]["names"] == 2
+
+
+def test_load_file_prebuilds_indexes(monkeypatch):
+    table = FoodTable(FOODS)
+    fake_file = SimpleNamespace(
+        table=table, nutrients=NutrientMatrix(table, ()), bucket_size=1000,
+        probe=None, buckets={}, version='20261018000000',
+    )
+    monkeypatch.setattr(catalog, 'CatalogFile', lambda path: fake_file)
+    cache = FoodCatalogCache(loader=lambda: FOODS, ttl_seconds=0)
+
+    snapshot = cache.load_file('catalog.npz')
+
+    assert snapshot.name_index_stats() is not None
+    assert snapshot._vector_index is not None
+    assert cache.stats()["name_index"]["names"] == 2
+
+
+def test_refresh_prebuilds_indexes():
+    cache = FoodCatalogCache(loader=lambda: FOODS, ttl_seconds=0)
+
+    snapshot = cache.refresh()
+
+    assert snapshot.name_index_stats() is not None
+    assert snapshot._vector_index is not None
+
+
+def test_change_source_must_implement_every_method():
+    class ProbeOnly(CatalogChangeSource):
+        def probe(self):
+            return ()
+
+    with pytest.raises(TypeError):
+        ProbeOnly()
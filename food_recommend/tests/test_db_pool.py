@@ -0,0 +1,127 @@
+"""
+ConnectionPool 동작 확인 (MySQL 대신 ping/rollback/close만 흉내 내는 가짜 연결 사용)
+"""
+import threading
+import time
+
+import pytest
+
+from db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+        self.rollbacks = 0
+        self.fail_rollback = False
+
+    def ping(self, reconnect=True):
+        if not self.alive:
+            raise ConnectionError("MySQL server has gone away")
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise ConnectionError("Lost connection to MySQL server")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeFactory:
+    def __init__(self):
+        self.connections = []
+
+    def __call__(self):
+        conn = FakeConnection()
+        self.connections.append(conn)
+        return conn
+
+
+def make_pool(**kwargs):
+    factory = FakeFactory()
+    options = dict(min_size=0, max_size=2, timeout=1, idle_timeout=0, ping_interval=0)
+    options.update(kwargs)
+    return ConnectionPool(factory, **options), factory
+
+
+def test_warm_prefills_min_size():
+    pool, factory = make_pool(min_size=2, max_size=4)
+
+    assert pool.warm() == 2
+    assert pool.warm() == 0
+    assert pool.metrics()["idle"] == 2
+
+    conn = pool.acquire()
+    conn.close()
+    assert len(factory.connections) == 2
+
+
+def test_checkout_pings_and_replaces_dead_connection():
+    pool, factory = make_pool()
+    conn = pool.acquire()
+    first = factory.connections[0]
+    conn.close()
+
+    first.alive = False
+    conn = pool.acquire()
+
+    assert first.closed
+    assert len(factory.connections) == 2
+    assert pool.metrics()["health_check_failures"] == 1
+    assert pool.metrics()["size"] == 1
+    conn.close()
+
+
+def test_release_rolls_back_and_discards_broken_connection():
+    pool, factory = make_pool()
+    conn = pool.acquire()
+    conn.close()
+    assert factory.connections[0].rollbacks == 1
+    assert pool.metrics()["idle"] == 1
+
+    conn = pool.acquire()
+    factory.connections[0].fail_rollback = True
+    conn.close()
+
+    assert factory.connections[0].closed
+    assert pool.metrics()["size"] == 0
+    # 반납한 연결은 다시 쓸 수 없음
+    with pytest.raises(Exception):
+        conn.cursor()
+
+
+def test_exhausted_pool_times_out_and_wakes_waiter():
+    pool, _ = make_pool(max_size=1, timeout=0.05)
+    held = pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert pool.metrics()["timeouts"] == 1
+
+    pool.timeout = 2
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    held.close()
+    waiter.join(timeout=2)
+
+    assert len(acquired) == 1
+    assert pool.metrics()["waits"] == 1
+    acquired[0].close()
+
+
+def test_reap_idle_keeps_min_size():
+    pool, factory = make_pool(min_size=1, max_size=3)
+    conns = [pool.acquire() for _ in range(3)]
+    for conn in conns:
+        conn.close()
+
+    pool.idle_timeout = 0.01
+    time.sleep(0.02)
+
+    assert pool.reap_idle() == 2
+    assert pool.metrics()["size"] == 1
+    assert sum(conn.closed for conn in factory.connections) == 2
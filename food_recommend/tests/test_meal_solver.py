@@ -0,0 +1,51 @@
+import random
+import threading
+from collections import Counter
+
+import numpy as np
+
+from meal_solver import RANDOM_ROWS_SHUFFLE_RATIO, iter_random_rows, solver_fallbacks
+from metrics import render_prometheus
+
+
+def test_iter_random_rows_yields_each_allowed_row_once():
+    rows = np.arange(100, 1100, dtype=np.intp)
+    ids = np.arange(2000, dtype=np.int64) * 10
+    exclude_ids = {int(ids[row]) for row in rows[::7]}
+    rng = random.Random(7)
+
+    yielded = list(iter_random_rows(rows, ids, exclude_ids, rng))
+
+    assert len(yielded) == len(set(yielded))
+    assert set(yielded) == {int(row) for row in rows if int(ids[row]) not in exclude_ids}
+
+
+def test_iter_random_rows_tail_after_shuffle_is_uniform():
+    # 셔플 전환 이후 위치에서도 각 행이 고르게 나오는지 (마지막 위치의 행 분포)
+    rows = np.arange(10, dtype=np.intp)
+    ids = np.arange(10, dtype=np.int64)
+    rng = random.Random(11)
+    runs = 20000
+    last = Counter(list(iter_random_rows(rows, ids, set(), rng))[-1] for _ in range(runs))
+
+    assert RANDOM_ROWS_SHUFFLE_RATIO < 1
+    assert set(last) == set(range(10))
+    for count in last.values():
+        assert abs(count / runs - 0.1) <= 0.015
+
+
+def test_solver_counters_are_thread_safe():
+    before = solver_fallbacks.value
+
+    def bump():
+        for _ in range(10000):
+            solver_fallbacks.inc()
+
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert solver_fallbacks.value == before + 80000
+    assert 'food_recommend_events_total{event="meal_solver_fallback"}' in render_prometheus()
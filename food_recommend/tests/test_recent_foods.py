@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import name_index
+import service
+from catalog import CatalogSnapshot
+from models import FoodHistory
+
+FOODS = [
+    {'id': 10, 'name': '김치찌개(돼지고기)', 'calories': 250, 'category': '찌개 및 전골류', 'source_name': '1인분'},
+    {'id': 20, 'name': '된장국', 'calories': 80, 'category': '국 및 탕류', 'source_name': '1그릇'},
+    {'id': 30, 'name': '돼지김치찌개', 'calories': 280, 'category': '찌개 및 전골류', 'source_name': '1인분'},
+    {'id': 40, 'name': '시금치나물', 'calories': 40, 'category': '나물·숙채류', 'source_name': '100g'},
+]
+
+
+def history(*names):
+    return [FoodHistory(mealType='LUNCH', foodName=name, intakePercent=100, createdAt=datetime.now())
+            for name in names]
+
+
+def test_exclude_recent_foods_reuses_snapshot_index_for_subset(monkeypatch):
+    snapshot = CatalogSnapshot(1, FOODS)
+    snapshot.name_index
+
+    def fail(*args, **kwargs):
+        raise AssertionError("역색인을 새로 만들면 안 됨")
+
+    monkeypatch.setattr(name_index.NameMatchIndex, '__init__', fail)
+
+    # 알레르기 필터 등을 거친 일부 목록 (행 순서가 카탈로그와 다름)
+    subset = [FOODS[3], FOODS[2], FOODS[1]]
+    kept = service.exclude_recent_foods(subset, history('김치찌개'), snapshot)
+
+    assert [f['id'] for f in kept] == [40, 20]
+
+
+def test_exclude_recent_foods_falls_back_to_catalog_snapshot(monkeypatch):
+    snapshot = CatalogSnapshot(1, FOODS)
+    monkeypatch.setattr(service.catalog_cache, 'get_snapshot', lambda: snapshot)
+
+    kept = service.exclude_recent_foods(FOODS, history('된장국'))
+
+    assert [f['id'] for f in kept] == [10, 30, 40]
@@ -0,0 +1,111 @@
+"""
+select_meal_rows(카테고리 분할 1회 + exclude_ids)가 기존 방식
+(끼니마다 남은 음식을 다시 분류하는 select_meal_items)과 같은 분포로 고르는지 확인
+
+두 구현을 같은 고정 카탈로그로 RUNS번씩 돌려 끼니별 음식/카테고리 등장 비율을 비교한다.
+표본 비율의 표준편차는 최대 sqrt(0.25 / RUNS) ≈ 0.0035라 두 구현 차이의 표준편차는 약 0.005이고,
+허용 오차 TOLERANCE = 0.02는 그 4배 수준이다 (시드를 고정해 결과는 항상 같다).
+"""
+import random
+from collections import Counter
+from typing import Dict, List
+
+import pytest
+
+from food_table import CATEGORY_NAMES, FoodTable, category_code
+from service import categorize_foods, select_meal_items, select_meal_rows
+
+RUNS = 20000
+TOLERANCE = 0.02
+
+# (끼니, 기존 목표 칼로리) - 기존 generate_food_recommendation과 같은 순서
+MEAL_TARGETS = (('BREAKFAST', 500), ('LUNCH', 600), ('DINNER', 550))
+
+
+def make_foods(soups: int) -> List[Dict]:
+    foods = []
+    for i, kcal in enumerate((280, 300, 310, 350)):
+        foods.append({'name': f'밥{i}', 'calories': kcal, 'category': '밥류'})
+    for i, kcal in enumerate((90, 120, 150)[:soups]):
+        foods.append({'name': f'국{i}', 'calories': kcal, 'category': '국 및 탕류'})
+    for i, kcal in enumerate((30, 45, 60, 80, 95, 110, 140, 180, 220, 260)):
+        foods.append({'name': f'반찬{i}', 'calories': kcal, 'category': '나물류'})
+    for food_id, food in enumerate(foods, start=1):
+        food['id'] = food_id
+        food['source_name'] = '1인분'
+    return foods
+
+
+def legacy_day(foods: List[Dict]) -> List[List[int]]:
+    """기존 구현: 끼니마다 남은 음식 목록을 만들어 다시 분류 (전역 random 사용)"""
+    meals = []
+    remaining = foods
+    for _, target in MEAL_TARGETS:
+        items = select_meal_items(categorize_foods(remaining), target_kcal=target)
+        meals.append([f['id'] for f in items])
+        remaining = [f for f in remaining if f not in items]
+    return meals
+
+
+def row_based_day(table: FoodTable, partition, rng: random.Random) -> List[List[int]]:
+    """새 구현: 분할은 한 번만 하고 고른 음식은 exclude_ids로 건너뜀"""
+    meals = []
+    exclude_ids = set()
+    for _, target in MEAL_TARGETS:
+        rows = select_meal_rows(table, partition, target_kcal=target, exclude_ids=exclude_ids, rng=rng)
+        ids = [int(table.ids[row]) for row in rows]
+        exclude_ids.update(ids)
+        meals.append(ids)
+    return meals
+
+
+def frequencies(days: List[List[List[int]]], foods: List[Dict]):
+    """끼니별 (음식 id 등장 비율, 카테고리별 음식 수 분포 비율)"""
+    category_of = {f['id']: CATEGORY_NAMES[category_code(f['category'])] for f in foods}
+    food_freq, category_freq = Counter(), Counter()
+    for day in days:
+        for (meal, _), ids in zip(MEAL_TARGETS, day):
+            for food_id in ids:
+                food_freq[(meal, food_id)] += 1
+            counts = Counter(category_of[food_id] for food_id in ids)
+            for name in CATEGORY_NAMES:
+                category_freq[(meal, name, counts[name])] += 1
+    runs = len(days)
+    return (
+        {key: count / runs for key, count in food_freq.items()},
+        {key: count / runs for key, count in category_freq.items()},
+    )
+
+
+def assert_close(expected: Dict, actual: Dict):
+    for key in set(expected) | set(actual):
+        diff = abs(expected.get(key, 0.0) - actual.get(key, 0.0))
+        assert diff <= TOLERANCE, f"{key}: 기존 {expected.get(key, 0.0):.4f} / 새 구현 {actual.get(key, 0.0):.4f}"
+
+
+@pytest.mark.parametrize('soups', [3, 2])
+def test_row_based_selection_matches_legacy_distribution(soups):
+    # soups=2면 저녁에는 국/탕이 남지 않는 경우까지 비교
+    foods = make_foods(soups)
+    table = FoodTable(foods)
+    partition = table.partition(table.all_rows_mask())
+
+    random.seed(1234)
+    legacy = [legacy_day(foods) for _ in range(RUNS)]
+    rng = random.Random(5678)
+    row_based = [row_based_day(table, partition, rng) for _ in range(RUNS)]
+
+    legacy_food, legacy_category = frequencies(legacy, foods)
+    row_food, row_category = frequencies(row_based, foods)
+    assert_close(legacy_food, row_food)
+    assert_close(legacy_category, row_category)
+
+
+def test_row_based_selection_never_repeats_within_day():
+    foods = make_foods(3)
+    table = FoodTable(foods)
+    partition = table.partition(table.all_rows_mask())
+    rng = random.Random(42)
+    for _ in range(1000):
+        ids = [food_id for meal in row_based_day(table, partition, rng) for food_id in meal]
+        assert len(ids) == len(set(ids))